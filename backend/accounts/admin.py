@@ -1,9 +1,15 @@
 from django.contrib import admin
 
+from core.paginators import EstimatedCountPaginator
+
 from .models import UserProfile
 
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "phone", "default_shipping_city", "updated_at")
+    list_select_related = ("user",)
     search_fields = ("user__username", "user__email", "phone")
+    autocomplete_fields = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
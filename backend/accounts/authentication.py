@@ -0,0 +1,119 @@
+"""
+JWT authentication backed by a cached user snapshot.
+
+simplejwt's ``JWTAuthentication`` loads the user row on every request, and
+``UserSerializer`` then loads the profile. ``CachedJWTAuthentication`` keeps the
+fields API views need (``SNAPSHOT_USER_FIELDS`` plus the profile) in the cache
+under ``auth:user:<id>:v<token_version>``; a miss costs one
+``select_related("profile")`` query. Users rebuilt from a snapshot have the
+remaining fields (password, last_login, ...) deferred, so they load on access
+and ``save()`` only writes snapshot fields.
+
+``token_version`` is a ``UserProfile`` counter embedded in issued tokens and
+bumped on password change: tokens carrying an older version are rejected.
+``accounts.signals`` drops a user's snapshot whenever the user or profile is
+saved.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import UserProfile
+
+User = get_user_model()
+
+TOKEN_VERSION_CLAIM = "ver"
+USER_SNAPSHOT = {
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+}
+# In model field order, as ``Model.from_db`` expects for partial rows.
+SNAPSHOT_USER_FIELDS = tuple(
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.attname in USER_SNAPSHOT
+)
+SNAPSHOT_PROFILE_FIELDS = tuple(
+    field.attname for field in UserProfile._meta.concrete_fields
+)
+
+
+def snapshot_key(user_id, version: int) -> str:
+    return f"auth:user:{user_id}:v{version}"
+
+
+def token_version(user) -> int:
+    try:
+        return user.profile.token_version
+    except ObjectDoesNotExist:
+        return 0
+
+
+def make_snapshot(user) -> dict:
+    try:
+        profile = user.profile
+    except ObjectDoesNotExist:
+        profile = None
+    return {
+        "user": [getattr(user, name) for name in SNAPSHOT_USER_FIELDS],
+        "profile": (
+            [getattr(profile, name) for name in SNAPSHOT_PROFILE_FIELDS]
+            if profile is not None
+            else None
+        ),
+    }
+
+
+def user_from_snapshot(snapshot: dict):
+    user = User.from_db("default", SNAPSHOT_USER_FIELDS, snapshot["user"])
+    if snapshot["profile"] is not None:
+        user.profile = UserProfile.from_db(
+            "default", SNAPSHOT_PROFILE_FIELDS, snapshot["profile"]
+        )
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from exc
+        version = validated_token.get(TOKEN_VERSION_CLAIM, 0)
+        key = snapshot_key(user_id, version)
+
+        snapshot = cache.get(key)
+        if snapshot is not None:
+            return user_from_snapshot(snapshot)
+
+        user = (
+            User.objects.select_related("profile")
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .first()
+        )
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if token_version(user) != version:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        cache.set(key, make_snapshot(user), settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,93 @@
+"""
+Login by username or e-mail.
+
+``UsernameOrEmailBackend`` resolves the identifier with one query: an exact
+``username`` match (unique index) or, when the identifier looks like an e-mail,
+an ``UPPER(email)`` match (expression index). A username match wins over an
+e-mail match, so a user whose username happens to be someone else's address
+keeps logging in as themselves. The password is checked on the fetched user
+object; nothing is looked up twice.
+
+``touch_last_login`` replaces simplejwt's ``UPDATE_LAST_LOGIN``, which saved the
+whole user row on every token request: it writes at most once per
+``LAST_LOGIN_UPDATE_INTERVAL`` seconds per user, with a filtered ``UPDATE``.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+
+from . import hashers
+from .utils import email_match, with_email_upper
+
+UserModel = get_user_model()
+
+
+def login_queryset(identifier: str):
+    """Users matching ``identifier`` as a username or e-mail, best match first."""
+    # The profile carries the token version put into issued JWTs.
+    queryset = UserModel._default_manager.select_related("profile")
+    if "@" not in identifier:
+        return queryset.filter(username=identifier).order_by("pk")
+    return (
+        with_email_upper(queryset)
+        .filter(Q(username=identifier) | email_match(identifier))
+        .order_by(Case(When(username=identifier, then=Value(0)), default=1), "pk")
+    )
+
+
+def get_login_user(identifier: str):
+    return login_queryset(identifier).first()
+
+
+class UsernameOrEmailBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = get_login_user(username)
+        if user is None:
+            # Hash anyway so unknown identifiers take as long as wrong passwords.
+            hashers.make_password(password)
+            return None
+        if hashers.check_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = await login_queryset(username).afirst()
+        if user is None:
+            await hashers.amake_password(password)
+            return None
+        if await hashers.acheck_password(user, password) and self.user_can_authenticate(
+            user
+        ):
+            return user
+        return None
+
+
+def touch_last_login(user) -> bool:
+    """Record a login unless one was recorded within the configured interval."""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.LAST_LOGIN_UPDATE_INTERVAL)
+    if user.last_login is not None and user.last_login > cutoff:
+        return False
+    # The filter keeps concurrent logins of the same user from all writing.
+    updated = (
+        UserModel._default_manager.filter(pk=user.pk)
+        .filter(Q(last_login__isnull=True) | Q(last_login__lte=cutoff))
+        .update(last_login=now)
+    )
+    user.last_login = now
+    return bool(updated)
@@ -0,0 +1,107 @@
+"""
+Password hashers with tunable cost, and a bounded pool to run them in.
+
+The hasher classes keep Django's algorithm names, so existing hashes verify
+unchanged. ``must_update`` compares the stored parameters with the current
+settings: after ``DJANGO_PASSWORD_HASHER`` or a cost setting changes, each user
+is rehashed transparently on their next successful login.
+
+Hashing is CPU-bound (and for argon2/scrypt memory-hard), so ``check_password``
+and ``make_password`` run it in a process-wide pool of
+``PASSWORD_HASHING_WORKERS`` threads. A login burst then queues instead of
+oversubscribing the CPU, and async callers (``acheck_password``, the backend's
+``aauthenticate``) await the pool rather than blocking the event loop as
+``AbstractBaseUser.acheck_password`` does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from core.executors import BackgroundExecutor
+
+_executor = BackgroundExecutor("password-hashing", "PASSWORD_HASHING_WORKERS")
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self) -> int:
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self) -> int:
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self) -> int:
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self) -> int:
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self) -> int:
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self) -> int:
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self) -> int:
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+def _submit(fn, *args) -> Future:
+    return _executor.submit(fn, *args)
+
+
+def make_password(password: str | None) -> str:
+    return _submit(hashers.make_password, password).result()
+
+
+async def amake_password(password: str | None) -> str:
+    return await asyncio.wrap_future(_submit(hashers.make_password, password))
+
+
+def set_password(user, password: str) -> None:
+    """``user.set_password`` with the hashing done in the pool."""
+    user.password = make_password(password)
+    user._password = password
+
+
+def _upgrade(user, encoded: str) -> None:
+    user.password = encoded
+    # A hash upgrade is not a password change (see AbstractBaseUser).
+    user._password = None
+
+
+def check_password(user, password: str) -> bool:
+    """``user.check_password`` with hashing in the pool; rehashes if outdated."""
+    is_correct, must_update = _submit(
+        hashers.verify_password, password, user.password
+    ).result()
+    if is_correct and must_update:
+        _upgrade(user, make_password(password))
+        user.save(update_fields=["password"])
+    return is_correct
+
+
+async def acheck_password(user, password: str) -> bool:
+    """Async ``check_password`` that does not block the event loop."""
+    is_correct, must_update = await asyncio.wrap_future(
+        _submit(hashers.verify_password, password, user.password)
+    )
+    if is_correct and must_update:
+        _upgrade(user, await amake_password(password))
+        await user.asave(update_fields=["password"])
+    return is_correct
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ...token import UsernameOrEmailTokenObtainPairSerializer
+
+USERNAME_PREFIX = "bench-login-"
+PASSWORD = "bench-Login-pass-1"
+
+
+class Command(BaseCommand):
+    help = (
+        "Имитирует всплеск входов (POST /api/auth/login/): параллельно выдаёт "
+        "JWT по логину или e-mail и печатает входы/с (всего и на ядро), задержки "
+        "и число запросов для каждого хешера паролей."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=50,
+            help="Сколько временных пользователей создать.",
+        )
+        parser.add_argument(
+            "--logins",
+            type=int,
+            default=200,
+            help="Сколько входов выполнить.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Число параллельных потоков.",
+        )
+        parser.add_argument(
+            "--by",
+            choices=("username", "email"),
+            default="email",
+            help="Чем входить: логином или e-mail.",
+        )
+        parser.add_argument(
+            "--hashers",
+            nargs="+",
+            choices=sorted(settings.PASSWORD_HASHER_CHOICES),
+            default=[settings.PASSWORD_HASHER],
+            help="Какие хешеры сравнить (параметры берутся из настроек).",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(options["concurrency"], 1)
+        cores = min(concurrency, settings.PASSWORD_HASHING_WORKERS, os.cpu_count() or 1)
+        self.stdout.write(f"hashing on {cores} core(s)")
+        for name in options["hashers"]:
+            preferred = settings.PASSWORD_HASHER_CHOICES[name]
+            with override_settings(
+                PASSWORD_HASHERS=[
+                    preferred,
+                    *(p for p in settings.PASSWORD_HASHERS if p != preferred),
+                ]
+            ):
+                try:
+                    hashers.make_password(PASSWORD)
+                except ValueError as exc:  # argon2-cffi is not installed
+                    self.stdout.write(self.style.WARNING(f"{name}: {exc}"))
+                    continue
+                self._run(name, options, concurrency, cores)
+
+    def _run(self, name: str, options, concurrency: int, cores: int) -> None:
+        users = self._create_users(max(options["users"], 1))
+        try:
+            identifiers = [
+                # Upper-cased to exercise the case-insensitive lookup.
+                user.email.upper() if options["by"] == "email" else user.username
+                for user in users
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                self._login(identifiers[0])
+
+            logins = max(options["logins"], 1)
+            sequence = [identifiers[i % len(identifiers)] for i in range(logins)]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                latencies = sorted(pool.map(self._timed_login, sequence))
+            elapsed = time.perf_counter() - started
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            rate = logins / elapsed
+            self.stdout.write(
+                f"{name}: {logins} logins by {options['by']} in {elapsed:.2f} s | "
+                f"{rate:.1f} logins/s | {rate / cores:.1f} logins/s/core | "
+                f"p50 {statistics.median(latencies) * 1000:.1f} ms | "
+                f"p95 {p95 * 1000:.1f} ms | "
+                f"{len(queries.captured_queries)} queries/login"
+            )
+        finally:
+            get_user_model().objects.filter(
+                username__startswith=USERNAME_PREFIX
+            ).delete()
+
+    def _create_users(self, count: int):
+        user_model = get_user_model()
+        user_model.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        template = user_model()
+        template.set_password(PASSWORD)
+        return user_model.objects.bulk_create(
+            user_model(
+                username=f"{USERNAME_PREFIX}{index}",
+                email=f"{USERNAME_PREFIX}{index}@Example.com",
+                password=template.password,
+            )
+            for index in range(count)
+        )
+
+    @staticmethod
+    def _login(identifier: str) -> None:
+        serializer = UsernameOrEmailTokenObtainPairSerializer(
+            data={"username": identifier, "password": PASSWORD}
+        )
+        serializer.is_valid(raise_exception=True)
+
+    def _timed_login(self, identifier: str) -> float:
+        close_old_connections()
+        try:
+            started = time.perf_counter()
+            self._login(identifier)
+            return time.perf_counter() - started
+        finally:
+            connection.close()
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+INDEX_NAME = "accounts_user_email_upper_idx"
+
+
+def _user_model(apps):
+    return apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+
+
+def _index():
+    return models.Index(Upper("email"), name=INDEX_NAME)
+
+
+def add_index(apps, schema_editor):
+    schema_editor.add_index(_user_model(apps), _index())
+
+
+def remove_index(apps, schema_editor):
+    schema_editor.remove_index(_user_model(apps), _index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_user_email_upper_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="token_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
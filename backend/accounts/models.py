@@ -14,6 +14,8 @@ class UserProfile(models.Model):
     default_shipping_city = models.CharField(max_length=100, blank=True)
     default_shipping_postcode = models.CharField(max_length=20, blank=True)
     default_shipping_country = models.CharField(max_length=100, blank=True)
+    # Carried in JWTs; bumped on password change to revoke older tokens.
+    token_version = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
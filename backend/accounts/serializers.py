@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 
+from . import hashers
 from .models import UserProfile
 
 User = get_user_model()
@@ -54,7 +55,11 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         instance.save(update_fields=list(validated_data.keys()))
 
         if profile_data:
-            profile, _ = UserProfile.objects.get_or_create(user=instance)
+            # Reuse the loaded profile so ``instance`` reflects the update.
+            try:
+                profile = instance.profile
+            except UserProfile.DoesNotExist:
+                profile = UserProfile(user=instance)
             for attr, value in profile_data.items():
                 setattr(profile, attr, value)
             profile.save()
@@ -86,8 +91,8 @@ class RegisterSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data.pop("password_confirm")
         password = validated_data.pop("password")
-        user = User.objects.create(**validated_data)
-        user.set_password(password)
+        user = User(**validated_data)
+        hashers.set_password(user, password)
         user.save()
         UserProfile.objects.get_or_create(user=user)
         return user
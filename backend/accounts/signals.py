@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 
+from .authentication import snapshot_key, token_version
 from .models import UserProfile
 
 User = get_user_model()
@@ -13,3 +16,28 @@ User = get_user_model()
 def create_user_profile(sender, instance: User, created: bool, **kwargs):
     if created:
         UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts_user_snapshot_saved")
+def drop_user_snapshot(sender, instance: User, created: bool, **kwargs):
+    if created:
+        return
+    version = token_version(instance)
+    # ``_password`` is set by set_password() until the save completes.
+    if getattr(instance, "_password", None) is not None:
+        profile, _ = UserProfile.objects.get_or_create(user=instance)
+        UserProfile.objects.filter(pk=profile.pk).update(
+            token_version=F("token_version") + 1
+        )
+        profile.refresh_from_db(fields=["token_version"])
+    cache.delete(snapshot_key(instance.pk, version))
+
+
+@receiver(pre_delete, sender=User, dispatch_uid="accounts_user_snapshot_deleted")
+def drop_deleted_user_snapshot(sender, instance: User, **kwargs):
+    cache.delete(snapshot_key(instance.pk, token_version(instance)))
+
+
+@receiver(post_save, sender=UserProfile, dispatch_uid="accounts_profile_snapshot")
+def drop_profile_snapshot(sender, instance: UserProfile, **kwargs):
+    cache.delete(snapshot_key(instance.user_id, instance.token_version))
@@ -1,26 +1,28 @@
-from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from .authentication import TOKEN_VERSION_CLAIM, token_version
+from .backends import touch_last_login
+
 
 class UsernameOrEmailTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    The ``username`` field accepts a username or an e-mail address.
+
+    Resolution happens in ``accounts.backends.UsernameOrEmailBackend``, which
+    ``authenticate()`` reaches through ``AUTHENTICATION_BACKENDS``.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[TOKEN_VERSION_CLAIM] = token_version(user)
+        return token
+
     def validate(self, attrs):
-        username = attrs.get("username")
-        if username:
-            user_model = get_user_model()
-            try:
-                user = user_model.objects.get(username=username)
-            except user_model.DoesNotExist:
-                if "@" in username:
-                    try:
-                        user = user_model.objects.get(email__iexact=username)
-                    except user_model.DoesNotExist:
-                        user = None
-                else:
-                    user = None
-            if user is not None:
-                attrs[self.username_field] = getattr(user, self.username_field)
-        return super().validate(attrs)
+        data = super().validate(attrs)
+        touch_last_login(self.user)
+        return data
 
 
 class UsernameOrEmailTokenObtainPairView(TokenObtainPairView):
@@ -0,0 +1,33 @@
+"""
+Case-insensitive e-mail lookups.
+
+``email__iexact`` compiles to ``UPPER(email::text) = UPPER(%s)`` on PostgreSQL
+and to ``LIKE`` on SQLite; neither can use a plain index on ``email``. These
+helpers compare ``UPPER(email)`` instead, which matches the expression index
+added by ``accounts.0002_user_email_upper_index``.
+"""
+
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet, Value
+from django.db.models.functions import Upper
+
+
+def email_match(email: str) -> Q:
+    """Condition on the ``email_upper`` alias added by ``with_email_upper``."""
+    return Q(email_upper=Upper(Value(email)))
+
+
+def with_email_upper(queryset: QuerySet) -> QuerySet:
+    return queryset.alias(email_upper=Upper("email"))
+
+
+def filter_by_email(queryset: QuerySet, email: str) -> QuerySet:
+    return with_email_upper(queryset).filter(email_match(email))
+
+
+def get_user_by_email(email: str, **filters):
+    """First user whose e-mail matches ``email`` case-insensitively, or ``None``."""
+    queryset = get_user_model().objects.filter(**filters)
+    return filter_by_email(queryset, email).order_by("pk").first()
@@ -9,6 +9,7 @@ from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from rest_framework import generics, permissions, response, status
 from rest_framework.views import APIView
 
+from . import hashers
 from .serializers import (
     PasswordResetConfirmSerializer,
     PasswordResetRequestSerializer,
@@ -16,6 +17,7 @@ from .serializers import (
     UserSerializer,
     UserUpdateSerializer,
 )
+from .utils import get_user_by_email
 
 User = get_user_model()
 
@@ -28,19 +30,30 @@ class RegisterView(generics.CreateAPIView):
 class MeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_user(self):
+        """
+        ``request.user`` with its profile loaded in the same query.
+
+        JWT requests already get one from ``CachedJWTAuthentication``; session
+        users are reloaded with ``select_related("profile")``.
+        """
+        user = self.request.user
+        if not User.profile.related.is_cached(user):
+            user = User.objects.select_related("profile").get(pk=user.pk)
+        return user
+
     def get(self, request):
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(self.get_user())
         return response.Response(serializer.data)
 
     def patch(self, request):
+        user = self.get_user()
         serializer = UserUpdateSerializer(
-            instance=request.user, data=request.data, partial=True
+            instance=user, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        return response.Response(
-            UserSerializer(request.user).data, status=status.HTTP_200_OK
-        )
+        return response.Response(UserSerializer(user).data, status=status.HTTP_200_OK)
 
 
 class PasswordResetRequestView(APIView):
@@ -51,7 +64,7 @@ class PasswordResetRequestView(APIView):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data["email"]
-        user = User.objects.filter(email__iexact=email, is_active=True).first()
+        user = get_user_by_email(email, is_active=True)
         if user:
             token_generator = PasswordResetTokenGenerator()
             token = token_generator.make_token(user)
@@ -103,7 +116,7 @@ class PasswordResetConfirmView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user.set_password(password)
+        hashers.set_password(user, password)
         user.save(update_fields=["password"])
         return response.Response(
             {"detail": "Password updated successfully."}, status=status.HTTP_200_OK
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from functools import partial
+
 from django.conf import settings
 from django.db import models
 from django.utils import timezone
-from django.utils.text import slugify
 from taggit.managers import TaggableManager
 
+from core.slugs import save_with_unique_slug
+
 
 class PostQuerySet(models.QuerySet):
     def published(self):
@@ -45,16 +48,6 @@ class Post(models.Model):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = (
-                slugify(self.title, allow_unicode=True) or f"post-{self.pk or ''}"
-            )
-            slug = base_slug
-            counter = 1
-            while Post.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                counter += 1
-                slug = f"{base_slug}-{counter}"
-            self.slug = slug
         if not self.meta_title:
             self.meta_title = self.title
         if not self.meta_description:
@@ -64,7 +57,12 @@ class Post(models.Model):
             )
         if self.is_published and not self.published_at:
             self.published_at = timezone.now()
-        super().save(*args, **kwargs)
+        save_with_unique_slug(
+            self,
+            partial(super().save, *args, **kwargs),
+            source=self.title,
+            fallback="post",
+        )
 
     @property
     def canonical_url(self) -> str:
@@ -2,10 +2,12 @@
 
 from rest_framework import serializers
 
+from core.serializers import CachedFieldsModelSerializer
+
 from .models import Post
 
 
-class PostListSerializer(serializers.ModelSerializer):
+class PostListSerializer(CachedFieldsModelSerializer):
     tags = serializers.SlugRelatedField(many=True, read_only=True, slug_field="name")
 
     class Meta:
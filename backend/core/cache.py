@@ -0,0 +1,32 @@
+"""
+Cache backend that reports hits and misses to the request metrics.
+"""
+
+from __future__ import annotations
+
+from django_redis.cache import RedisCache, omit_exception
+
+from .metrics import record_cache_lookup
+
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    @omit_exception(return_value=_MISSING)
+    def _lookup(self, key, version, client):
+        # Ignored connection errors come back as ``_MISSING`` and count as misses.
+        return self.client.get(key, default=_MISSING, version=version, client=client)
+
+    def get(self, key, default=None, version=None, client=None):
+        value = self._lookup(key, version, client)
+        if value is _MISSING:
+            record_cache_lookup(misses=1)
+            return default
+        record_cache_lookup(hits=1)
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        values = super().get_many(keys, version=version, client=client) or {}
+        record_cache_lookup(hits=len(values), misses=len(keys) - len(values))
+        return values
@@ -0,0 +1,52 @@
+"""
+Process-wide thread pools for work moved off the request path.
+
+``BackgroundExecutor`` starts its ``ThreadPoolExecutor`` on the first submit
+(under a lock, so racing requests share one pool) and sizes it from a number or
+from the name of a setting read at that moment. With ``database=True`` each job
+closes stale connections before and after it runs, as a request would.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class BackgroundExecutor:
+    def __init__(
+        self, name: str, max_workers: int | str = 1, *, database: bool = False
+    ) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.database = database
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = self.max_workers
+                    if isinstance(workers, str):
+                        workers = getattr(settings, workers)
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix=self.name
+                    )
+        return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        if self.database:
+            return self._get().submit(_with_connections, fn, *args)
+        return self._get().submit(fn, *args)
+
+
+def _with_connections(fn, *args):
+    close_old_connections()
+    try:
+        return fn(*args)
+    finally:
+        close_old_connections()
@@ -0,0 +1,178 @@
+"""
+In-process request metrics.
+
+``RequestMetricsMiddleware`` collects per-request timings into a ``RequestStats``
+object stored in a context variable, and aggregates them into histograms keyed by
+route. The aggregate is exposed in the Prometheus text format by ``render_metrics``.
+Each worker process keeps its own registry, so scrape every worker (or sum them).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+@dataclass
+class RequestStats:
+    started_at: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    render_time: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+
+_current_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_stats() -> RequestStats | None:
+    return _current_stats.get()
+
+
+def start_request() -> tuple[RequestStats, object]:
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def finish_request(token) -> None:
+    _current_stats.reset(token)
+
+
+def record_cache_lookup(*, hits: int = 0, misses: int = 0) -> None:
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.cache_hits += hits
+    stats.cache_misses += misses
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` hook counting queries and their duration."""
+
+    def __init__(self, stats: RequestStats) -> None:
+        self.stats = stats
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.stats.db_queries += 1
+            self.stats.db_time += time.perf_counter() - start
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.samples = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.samples += 1
+
+
+class MetricsRegistry:
+    """Thread-safe histograms and counters labelled by (route, method)."""
+
+    histograms = {
+        "shopster_request_duration_seconds": DURATION_BUCKETS,
+        "shopster_request_db_duration_seconds": DURATION_BUCKETS,
+        "shopster_request_render_duration_seconds": DURATION_BUCKETS,
+        "shopster_request_db_queries": QUERY_COUNT_BUCKETS,
+    }
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str, str], Histogram] = {}
+        self._counters: dict[tuple[str, tuple[tuple[str, str], ...]], int] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def observe(self, route: str, method: str, status: int, stats: RequestStats):
+        values = {
+            "shopster_request_duration_seconds": stats.elapsed,
+            "shopster_request_db_duration_seconds": stats.db_time,
+            "shopster_request_render_duration_seconds": stats.render_time,
+            "shopster_request_db_queries": stats.db_queries,
+        }
+        labels = (("route", route), ("method", method))
+        with self._lock:
+            for name, value in values.items():
+                key = (name, route, method)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self.histograms[name])
+                histogram.observe(value)
+            self._increment(
+                "shopster_requests_total", labels + (("status", str(status)),), 1
+            )
+            self._increment("shopster_cache_hits_total", labels, stats.cache_hits)
+            self._increment("shopster_cache_misses_total", labels, stats.cache_misses)
+
+    def _increment(self, name: str, labels: tuple[tuple[str, str], ...], value: int):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name in self.histograms:
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, route, method), histogram in sorted(
+                    self._histograms.items()
+                ):
+                    if metric != name:
+                        continue
+                    labels = f'route="{_escape(route)}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip(
+                        histogram.buckets, histogram.counts, strict=False
+                    ):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="+Inf"}} {histogram.samples}'
+                    )
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.samples}")
+            counter_names = sorted({name for name, _ in self._counters})
+            for name in counter_names:
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric != name:
+                        continue
+                    rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                    lines.append(f"{name}{{{rendered}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+def render_metrics() -> str:
+    return registry.render()
@@ -1,5 +1,16 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
 from django.utils import translation
 
+from .metrics import QueryTimer, current_stats, finish_request, registry, start_request
+from .slow_queries import SlowQueryRecorder
+
+request_logger = logging.getLogger("shopster.requests")
+
 
 class AdminEnglishMiddleware:
     """
@@ -20,3 +31,85 @@ class AdminEnglishMiddleware:
             return response
 
         return self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record wall time, DB queries, cache lookups and render time for each request.
+
+    The numbers are returned in a ``Server-Timing`` header, written as a structured
+    log line to the ``shopster.requests`` logger and aggregated per route for the
+    ``/metrics`` endpoint.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats, token = start_request()
+        try:
+            with connection.execute_wrapper(QueryTimer(stats)):
+                response = self.get_response(request)
+        finally:
+            finish_request(token)
+
+        elapsed = stats.elapsed
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match and match.view_name else "unmatched"
+        if route != "metrics":
+            registry.observe(route, request.method, response.status_code, stats)
+
+        response["Server-Timing"] = ", ".join(
+            (
+                f"total;dur={elapsed * 1000:.1f}",
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.db_queries} queries"',
+                f"render;dur={stats.render_time * 1000:.1f}",
+                f'cache;desc="{stats.cache_hits} hits, {stats.cache_misses} misses"',
+            )
+        )
+        payload = {
+            "method": request.method,
+            "route": route,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 1),
+            "db_queries": stats.db_queries,
+            "db_ms": round(stats.db_time * 1000, 1),
+            "render_ms": round(stats.render_time * 1000, 1),
+            "cache_hits": stats.cache_hits,
+            "cache_misses": stats.cache_misses,
+        }
+        request_logger.info(
+            " ".join(f"{key}={value}" for key, value in payload.items()),
+            extra={"request_metrics": payload},
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        stats = current_stats()
+        if stats is None:
+            return response
+        render_started = time.perf_counter()
+
+        def record_render_time(rendered_response):
+            stats.render_time += time.perf_counter() - render_started
+
+        response.add_post_render_callback(record_render_time)
+        return response
+
+
+class SlowQueryLogMiddleware:
+    """
+    Record queries slower than ``SLOW_QUERY_THRESHOLD_MS`` in the slow query log.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SLOW_QUERY_LOG_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with connection.execute_wrapper(SlowQueryRecorder(request)):
+            return self.get_response(request)
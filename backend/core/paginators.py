@@ -0,0 +1,53 @@
+"""
+Admin changelist paginator that estimates the size of large tables.
+
+Django paginates a changelist with ``SELECT COUNT(*)``, which on PostgreSQL
+scans the whole table on every page view. ``EstimatedCountPaginator`` answers
+unfiltered changelists from the planner statistics in ``pg_class.reltuples``
+and only counts exactly below ``ADMIN_ESTIMATED_COUNT_THRESHOLD`` rows, for
+filtered or searched lists and on other databases. Pair it with
+``show_full_result_count = False`` so the admin does not run the unfiltered
+count a second time.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset) -> int | None:
+    """Planner estimate of an unfiltered queryset's rows, if one is available."""
+    if not isinstance(queryset, QuerySet):
+        return None
+    query = queryset.query
+    if query.where or query.distinct or query.combinator:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 until the table has been vacuumed or analyzed.
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self) -> int:
+        estimate = estimated_count(self.object_list)
+        if (
+            estimate is not None
+            and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        ):
+            return estimate
+        return super().count
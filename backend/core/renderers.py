@@ -0,0 +1,73 @@
+"""
+orjson-backed DRF renderer.
+
+Produces compact output that decodes to the same data as ``rest_framework``'s
+``JSONRenderer`` (floats may be spelled differently, e.g. ``0.00001`` instead of
+``1e-05``): values orjson does not handle natively (datetimes, ``Decimal``, lazy
+strings, querysets) are passed to DRF's ``JSONEncoder.default``. Pretty-printed
+responses and payloads orjson cannot encode fall back to the stdlib renderer.
+orjson writes NaN and infinities as ``null``; payloads holding them also fall
+back, so they raise (or render) exactly as with ``JSONRenderer``.
+"""
+
+from __future__ import annotations
+
+import math
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+
+def _has_non_finite(data) -> bool:
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, Decimal):
+            if not value.is_finite():
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self._encoder.default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Non-finite numbers come out as ``null``; only then is the payload walked.
+        if b"null" in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Match JSONRenderer, which escapes these to keep output a JavaScript subset.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,106 @@
+"""
+Shared serializer base classes.
+"""
+
+from __future__ import annotations
+
+import copy
+
+from django.conf import settings
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject, RelatedField
+
+
+class CachedFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ``ModelSerializer`` that resolves its field plan once per class.
+
+    DRF introspects the model and builds every field on each instantiation. Here
+    the first instance records the class and constructor arguments of each
+    generated field and later instances rebuild fields straight from that plan.
+    Declared fields are still deep-copied, exactly as DRF does. Plain model
+    columns are read with ``getattr`` in ``to_representation`` instead of the
+    generic ``Field.get_attribute`` lookup.
+
+    The cache can be disabled with ``SERIALIZER_FIELD_PLAN_CACHE = False``.
+    """
+
+    _field_plans: dict[type, list[tuple[str, type | None, tuple, dict]]] = {}
+
+    def get_fields(self):
+        if not getattr(settings, "SERIALIZER_FIELD_PLAN_CACHE", True):
+            return super().get_fields()
+        plan = self._field_plans.get(type(self))
+        if plan is None:
+            fields = super().get_fields()
+            self._field_plans[type(self)] = [
+                (
+                    (name, None, (), {})
+                    if name in self._declared_fields
+                    else (name, type(field), field._args, field._kwargs)
+                )
+                for name, field in fields.items()
+            ]
+            return fields
+
+        declared_fields = copy.deepcopy(self._declared_fields)
+        return {
+            name: (
+                declared_fields[name]
+                if field_class is None
+                else field_class(*args, **kwargs)
+            )
+            for name, field_class, args, kwargs in plan
+        }
+
+    def _representation_plan(self) -> list[tuple[object, str | None]]:
+        plan = self.__dict__.get("_cached_representation_plan")
+        if plan is None:
+            model = self.Meta.model
+            columns = {
+                field.attname
+                for field in model._meta.concrete_fields
+                if not field.is_relation
+            }
+            plan = [
+                (
+                    field,
+                    (
+                        field.source_attrs[0]
+                        if len(field.source_attrs) == 1
+                        and field.source_attrs[0] in columns
+                        and not isinstance(
+                            field, (serializers.BaseSerializer, RelatedField)
+                        )
+                        else None
+                    ),
+                )
+                for field in self._readable_fields
+            ]
+            self.__dict__["_cached_representation_plan"] = plan
+        return plan
+
+    def to_representation(self, instance):
+        if not isinstance(instance, models.Model) or not getattr(
+            settings, "SERIALIZER_FIELD_PLAN_CACHE", True
+        ):
+            return super().to_representation(instance)
+        ret = {}
+        for field, attname in self._representation_plan():
+            if attname is not None:
+                attribute = getattr(instance, attname)
+            else:
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+            check_for_none = (
+                attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            )
+            if check_for_none is None:
+                ret[field.field_name] = None
+            else:
+                ret[field.field_name] = field.to_representation(attribute)
+        return ret
@@ -64,6 +64,8 @@ if DEBUG:
     ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestMetricsMiddleware",
+    "core.middleware.SlowQueryLogMiddleware",
     "core.middleware.AdminEnglishMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
@@ -77,7 +79,7 @@ MIDDLEWARE = [
 ]
 
 if DEBUG:
-    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+    MIDDLEWARE.insert(3, "debug_toolbar.middleware.DebugToolbarMiddleware")
     INTERNAL_IPS = ["127.0.0.1", "localhost"]
 
 ROOT_URLCONF = "core.urls"
@@ -130,6 +132,51 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Username or e-mail in one indexed query (accounts/backends.py); the subclass
+# keeps ModelBackend's permission checks for the admin.
+AUTHENTICATION_BACKENDS = ["accounts.backends.UsernameOrEmailBackend"]
+
+# Preferred hasher (pbkdf2, scrypt or argon2; argon2 needs argon2-cffi). The
+# others stay installed so existing hashes verify and are upgraded on login.
+PASSWORD_HASHER_CHOICES = {
+    "pbkdf2": "accounts.hashers.PBKDF2PasswordHasher",
+    "scrypt": "accounts.hashers.ScryptPasswordHasher",
+    "argon2": "accounts.hashers.Argon2PasswordHasher",
+}
+PASSWORD_HASHER = os.getenv("DJANGO_PASSWORD_HASHER", "scrypt").strip().lower()
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CHOICES[PASSWORD_HASHER],
+    *(
+        path
+        for name, path in PASSWORD_HASHER_CHOICES.items()
+        if name != PASSWORD_HASHER
+    ),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.getenv("DJANGO_PASSWORD_PBKDF2_ITERATIONS", "1000000")
+)
+PASSWORD_SCRYPT_WORK_FACTOR = int(
+    os.getenv("DJANGO_PASSWORD_SCRYPT_WORK_FACTOR", "16384")
+)
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv("DJANGO_PASSWORD_SCRYPT_BLOCK_SIZE", "8"))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv("DJANGO_PASSWORD_SCRYPT_PARALLELISM", "1"))
+# argon2id, memory cost in KiB (defaults: OWASP's 19 MiB, t=2, p=1).
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("DJANGO_PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.getenv("DJANGO_PASSWORD_ARGON2_MEMORY_COST", "19456")
+)
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("DJANGO_PASSWORD_ARGON2_PARALLELISM", "1"))
+# Concurrent hashes per process (accounts/hashers.py).
+PASSWORD_HASHING_WORKERS = int(
+    os.getenv("DJANGO_PASSWORD_HASHING_WORKERS") or os.cpu_count() or 1
+)
+# Lifetime of the cached user snapshot behind JWT-authenticated requests.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("DJANGO_AUTH_USER_CACHE_TIMEOUT", "300"))
+# JWT logins write ``last_login`` at most once per interval per user.
+LAST_LOGIN_UPDATE_INTERVAL = int(os.getenv("DJANGO_LAST_LOGIN_UPDATE_INTERVAL", "300"))
+
 
 LANGUAGE_CODE = os.getenv("DJANGO_LANGUAGE_CODE", "ru-ru")
 TIME_ZONE = os.getenv("DJANGO_TIME_ZONE", "Europe/Moscow")
@@ -143,6 +190,61 @@ MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+IMAGE_DERIVATIVES_ENABLED = getenv_bool("DJANGO_IMAGE_DERIVATIVES", True)
+IMAGE_DERIVATIVES_ASYNC = getenv_bool("DJANGO_IMAGE_DERIVATIVES_ASYNC", True)
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv("DJANGO_IMAGE_DERIVATIVE_WORKERS", "2"))
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 960, 1280)
+IMAGE_DERIVATIVE_FORMATS = ("avif", "webp", "jpeg")
+IMAGE_DERIVATIVE_QUALITY = int(os.getenv("DJANGO_IMAGE_DERIVATIVE_QUALITY", "80"))
+
+# On-demand thumbnails served from /media/thumbs/<w>x<h>/<path>.
+THUMBNAIL_SIZES = {(96, 96), (160, 160), (320, 240), (320, 320), (640, 480)}
+THUMBNAIL_CACHE_DIR = os.getenv(
+    "DJANGO_THUMBNAIL_CACHE_DIR", str(MEDIA_ROOT / "thumbs-cache")
+)
+THUMBNAIL_CACHE_MAX_BYTES = int(
+    os.getenv("DJANGO_THUMBNAIL_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+THUMBNAIL_MAX_CONCURRENT_RESIZES = int(
+    os.getenv("DJANGO_THUMBNAIL_MAX_CONCURRENT_RESIZES", "2")
+)
+THUMBNAIL_RESIZE_WAIT_SECONDS = float(
+    os.getenv("DJANGO_THUMBNAIL_RESIZE_WAIT_SECONDS", "5")
+)
+THUMBNAIL_MAX_AGE = 60 * 60 * 24 * 30
+# Internal nginx location aliased to THUMBNAIL_CACHE_DIR; empty serves via Django.
+THUMBNAIL_ACCEL_REDIRECT_PREFIX = os.getenv("DJANGO_THUMBNAIL_ACCEL_REDIRECT", "")
+
+# Catalog import/export (shop.catalog_io).
+PRODUCT_IMPORT_CHUNK_SIZE = int(os.getenv("DJANGO_PRODUCT_IMPORT_CHUNK_SIZE", "1000"))
+PRODUCT_IMPORT_ASYNC = getenv_bool("DJANGO_PRODUCT_IMPORT_ASYNC", True)
+PRODUCT_BULK_UPDATE_MAX_ROWS = int(
+    os.getenv("DJANGO_PRODUCT_BULK_UPDATE_MAX_ROWS", "10000")
+)
+# Staff order export (shop.order_export).
+ORDER_EXPORT_CHUNK_SIZE = int(os.getenv("DJANGO_ORDER_EXPORT_CHUNK_SIZE", "2000"))
+# Cached public review feed pages (shop/review_feed.py).
+REVIEW_FEED_CACHE_TIMEOUT = int(os.getenv("DJANGO_REVIEW_FEED_CACHE_TIMEOUT", "600"))
+REVIEW_BULK_MODERATION_MAX_IDS = int(
+    os.getenv("DJANGO_REVIEW_BULK_MODERATION_MAX_IDS", "10000")
+)
+# Category tree with product counts (shop/navigation.py).
+CATEGORY_NAVIGATION_CACHE_TIMEOUT = int(
+    os.getenv("DJANGO_CATEGORY_NAVIGATION_CACHE_TIMEOUT", "900")
+)
+# Per-user purchased product ids (shop/purchases.py).
+VERIFIED_PURCHASE_CACHE_TIMEOUT = int(
+    os.getenv("DJANGO_VERIFIED_PURCHASE_CACHE_TIMEOUT", "3600")
+)
+# Admin actions over more rows run as background jobs (shop/jobs.py).
+ADMIN_JOB_INLINE_MAX_ROWS = int(os.getenv("DJANGO_ADMIN_JOB_INLINE_MAX_ROWS", "2000"))
+ADMIN_JOB_POLL_INTERVAL = float(os.getenv("DJANGO_ADMIN_JOB_POLL_INTERVAL", "2"))
+ADMIN_JOB_STALE_AFTER = int(os.getenv("DJANGO_ADMIN_JOB_STALE_AFTER", "300"))
+# Unfiltered admin changelists above this size use pg_class.reltuples estimates.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(
+    os.getenv("DJANGO_ADMIN_ESTIMATED_COUNT_THRESHOLD", "100000")
+)
+
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
@@ -158,9 +260,26 @@ WHITENOISE_USE_FINDERS = True
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+API_JSON_BACKEND = os.getenv("DJANGO_API_JSON_BACKEND", "orjson").strip().lower()
+if API_JSON_BACKEND == "orjson":
+    API_JSON_RENDERER = "core.renderers.ORJSONRenderer"
+    API_JSON_PARSER = "core.parsers.ORJSONParser"
+else:
+    API_JSON_RENDERER = "rest_framework.renderers.JSONRenderer"
+    API_JSON_PARSER = "rest_framework.parsers.JSONParser"
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        API_JSON_RENDERER,
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        API_JSON_PARSER,
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -175,6 +294,8 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+SERIALIZER_FIELD_PLAN_CACHE = getenv_bool("DJANGO_SERIALIZER_FIELD_PLAN_CACHE", True)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Shopster API",
     "DESCRIPTION": "Headless commerce platform API surface.",
@@ -191,7 +312,7 @@ DJANGO_REDIS_IGNORE_EXCEPTIONS = getenv_bool("DJANGO_CACHE_IGNORE_EXCEPTIONS", T
 
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "core.cache.InstrumentedRedisCache",
         "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
@@ -201,6 +322,39 @@ CACHES = {
     }
 }
 
+REQUEST_METRICS_ENABLED = getenv_bool("DJANGO_REQUEST_METRICS", True)
+REQUEST_METRICS_LOG_LEVEL = os.getenv("DJANGO_REQUEST_METRICS_LOG_LEVEL", "INFO")
+METRICS_TOKEN = os.getenv("DJANGO_METRICS_TOKEN", "")
+
+SLOW_QUERY_LOG_ENABLED = getenv_bool("DJANGO_SLOW_QUERY_LOG", False)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("DJANGO_SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(
+    os.getenv("DJANGO_SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.0")
+)
+SLOW_QUERY_LOG_SIZE = int(os.getenv("DJANGO_SLOW_QUERY_LOG_SIZE", "200"))
+# Staff with this permission see the admin menu link and the page itself.
+SLOW_QUERY_VIEW_PERMISSION = "auth.view_user"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "shopster.requests": {
+            "handlers": ["console"],
+            "level": REQUEST_METRICS_LOG_LEVEL,
+            "propagate": False,
+        },
+        "shopster.slow_queries": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
 
 CSRF_TRUSTED_ORIGINS = [
     origin.strip()
@@ -234,7 +388,8 @@ SIMPLE_JWT = {
     ),
     "ROTATE_REFRESH_TOKENS": False,
     "BLACKLIST_AFTER_ROTATION": False,
-    "UPDATE_LAST_LOGIN": True,
+    # Throttled by accounts.backends.touch_last_login instead.
+    "UPDATE_LAST_LOGIN": False,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
@@ -286,6 +441,11 @@ JAZZMIN_SETTINGS = {
         {"name": "Dashboard", "url": "admin:index", "permissions": ["auth.view_user"]},
         {"app": "shop", "name": "Catalog"},
         {"model": "auth.User", "name": "Users"},
+        {
+            "name": "Slow queries",
+            "url": "admin-slow-queries",
+            "permissions": [SLOW_QUERY_VIEW_PERMISSION],
+        },
         {"name": "Site", "url": FRONTEND_SITE_URL, "new_window": True},
     ],
     # Per-app/model icons
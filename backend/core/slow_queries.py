@@ -0,0 +1,160 @@
+"""
+Slow query log.
+
+``SlowQueryLogMiddleware`` installs ``SlowQueryRecorder`` as a database execute
+wrapper for every request. Queries slower than ``SLOW_QUERY_THRESHOLD_MS`` are
+logged to ``shopster.slow_queries`` and kept in a bounded in-memory ring buffer
+(one per worker process) that staff can browse at ``/admin/slow-queries/``.
+A sample of slow ``SELECT`` statements is re-run with
+``EXPLAIN (ANALYZE, BUFFERS)`` on PostgreSQL so the plan is stored alongside.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger("shopster.slow_queries")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_explaining = threading.local()
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse literals and placeholder lists so similar queries group together."""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    normalized_sql: str
+    duration_ms: float
+    route: str
+    call_site: list[str]
+    plan: str = ""
+    recorded_at: datetime = field(default_factory=timezone.now)
+
+
+class SlowQueryLog:
+    """Bounded, thread-safe ring buffer of the most recent slow queries."""
+
+    def __init__(self, size: int) -> None:
+        self._lock = threading.Lock()
+        self._entries: deque[SlowQuery] = deque(maxlen=size)
+
+    def add(self, entry: SlowQuery) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(getattr(settings, "SLOW_QUERY_LOG_SIZE", 200))
+
+
+def _call_site(depth: int = 3) -> list[str]:
+    base_dir = Path(settings.BASE_DIR).resolve()
+    this_file = Path(__file__).resolve()
+    frames: list[str] = []
+    for frame in reversed(traceback.extract_stack()):
+        path = Path(frame.filename).resolve()
+        if path == this_file or base_dir not in path.parents:
+            continue
+        if "site-packages" in path.parts:
+            continue
+        frames.append(f"{path.relative_to(base_dir)}:{frame.lineno} in {frame.name}")
+        if len(frames) >= depth:
+            break
+    return frames
+
+
+class SlowQueryRecorder:
+    """``connection.execute_wrapper`` hook that records queries over the threshold."""
+
+    def __init__(self, request=None) -> None:
+        self.request = request
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.explain_rate = settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_explaining, "active", False):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                self._record(sql, params, many, context, duration)
+
+    def _route(self) -> str:
+        if self.request is None:
+            return ""
+        match = getattr(self.request, "resolver_match", None)
+        if match and match.view_name:
+            return match.view_name
+        return self.request.path
+
+    def _record(self, sql, params, many, context, duration: float) -> None:
+        entry = SlowQuery(
+            sql=sql,
+            normalized_sql=normalize_sql(sql),
+            duration_ms=round(duration * 1000, 2),
+            route=self._route(),
+            call_site=_call_site(),
+        )
+        if not many and self.explain_rate and random.random() < self.explain_rate:
+            entry.plan = self._explain(context["connection"], sql, params)
+        slow_query_log.add(entry)
+        logger.warning(
+            "slow query %.1fms route=%s at=%s sql=%s",
+            entry.duration_ms,
+            entry.route or "-",
+            entry.call_site[0] if entry.call_site else "-",
+            entry.normalized_sql,
+        )
+
+    def _explain(self, connection, sql: str, params) -> str:
+        if connection.vendor != "postgresql":
+            return ""
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return ""
+        _explaining.active = True
+        try:
+            # The savepoint keeps a failing EXPLAIN from aborting the transaction.
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+                    return "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as exc:  # pragma: no cover - depends on the query
+            logger.debug("EXPLAIN failed for slow query: %s", exc)
+            return ""
+        finally:
+            _explaining.active = False
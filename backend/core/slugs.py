@@ -0,0 +1,132 @@
+"""
+Unique slug allocation shared by ``Category``, ``Product`` and ``Post``.
+
+``allocate_slug`` loads every existing ``<base>`` / ``<base>-<n>`` slug with one
+prefix query (index-backed: Django adds a ``*_like`` pattern index for unique
+slug columns on PostgreSQL) and picks the first free suffix in memory, instead
+of probing ``exists()`` once per counter value. ``allocate_slugs`` does the same
+for a whole batch of names. ``save_with_unique_slug`` wraps a model save in a
+savepoint and allocates again if a concurrent writer took the slug first.
+Lookups go through ``_base_manager`` so soft-deleted rows, which still hold
+their unique slugs, are taken into account.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from functools import reduce
+from operator import or_
+from typing import Any
+from uuid import uuid4
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SLUG_SAVE_ATTEMPTS = 3
+# Slug prefixes combined into one OR query by ``allocate_slugs``.
+BATCH_QUERY_SIZE = 200
+SUFFIX_RESERVE = 8
+
+
+def slug_base(model: type[models.Model], value: str, fallback: str) -> str:
+    """Slugified ``value`` trimmed so that a ``-<n>`` suffix still fits."""
+    max_length = model._meta.get_field("slug").max_length
+    base = slugify(value or "", allow_unicode=True)
+    base = base[: max_length - SUFFIX_RESERVE].rstrip("-")
+    return base or f"{fallback}-{uuid4().hex[:8]}"
+
+
+def _prefix_filter(bases: Iterable[str], field: str = "slug") -> Q:
+    return reduce(
+        or_,
+        (
+            Q(**{field: base}) | Q(**{f"{field}__startswith": f"{base}-"})
+            for base in bases
+        ),
+    )
+
+
+def next_free_slug(base: str, taken: set[str]) -> str:
+    """First of ``base``, ``base-2``, ``base-3``, ... that is not in ``taken``."""
+    slug, counter = base, 1
+    while slug in taken:
+        counter += 1
+        slug = f"{base}-{counter}"
+    return slug
+
+
+def allocate_suffixed(queryset: models.QuerySet, field: str, base: str) -> str:
+    """Free ``base`` / ``base-<n>`` value of a unique ``field``, using one query."""
+    taken = queryset.filter(_prefix_filter([base], field)).values_list(field, flat=True)
+    return next_free_slug(base, set(taken))
+
+
+def allocate_slug(
+    model: type[models.Model], value: str, *, fallback: str, exclude_pk: Any = None
+) -> str:
+    """Free slug for ``value`` using a single query."""
+    queryset = model._base_manager.all()
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return allocate_suffixed(queryset, "slug", slug_base(model, value, fallback))
+
+
+def allocate_slugs(
+    model: type[models.Model], values: list[str], *, fallback: str
+) -> list[str]:
+    """
+    Batch mode: free, mutually distinct slugs for ``values`` (in order).
+
+    Issues one query per ``BATCH_QUERY_SIZE`` distinct bases, so importing many
+    items that share a name costs a handful of queries instead of O(n²).
+    """
+    bases = [slug_base(model, value, fallback) for value in values]
+    distinct = list(dict.fromkeys(bases))
+    taken: set[str] = set()
+    for start in range(0, len(distinct), BATCH_QUERY_SIZE):
+        chunk = distinct[start : start + BATCH_QUERY_SIZE]
+        taken.update(
+            model._base_manager.filter(_prefix_filter(chunk)).values_list(
+                "slug", flat=True
+            )
+        )
+    slugs = []
+    for base in bases:
+        slug = next_free_slug(base, taken)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_unique_slug(
+    instance: models.Model, save: Callable[[], None], *, source: str, fallback: str
+) -> None:
+    """
+    Call ``save`` after filling an empty ``instance.slug``.
+
+    The save runs in a savepoint; if it fails because another transaction
+    claimed the same slug in the meantime, a new slug is allocated and the save
+    retried, up to ``SLUG_SAVE_ATTEMPTS`` times. Explicit slugs are saved as is.
+    """
+    if instance.slug:
+        save()
+        return
+    model = type(instance)
+    for attempt in range(1, SLUG_SAVE_ATTEMPTS + 1):
+        instance.slug = allocate_slug(
+            model, source, fallback=fallback, exclude_pk=instance.pk
+        )
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            conflict = (
+                model._base_manager.filter(slug=instance.slug)
+                .exclude(pk=instance.pk)
+                .exists()
+            )
+            if not conflict or attempt == SLUG_SAVE_ATTEMPTS:
+                instance.slug = ""
+                raise
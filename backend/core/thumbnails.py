@@ -0,0 +1,202 @@
+"""
+On-demand thumbnails with a size-bounded disk cache.
+
+``/media/thumbs/<w>x<h>/<path>`` resizes an uploaded image (product images, blog
+OG images and avatars) the first time it is requested. Results are written to
+``THUMBNAIL_CACHE_DIR`` under a name derived from the source fingerprint, the
+requested size and the output format, so a re-uploaded file never serves a stale
+thumbnail. The cache is evicted least-recently-used first once it grows beyond
+``THUMBNAIL_CACHE_MAX_BYTES``; hits refresh the file mtime. Concurrent resizes
+are capped per process by ``THUMBNAIL_MAX_CONCURRENT_RESIZES``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import posixpath
+import tempfile
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+ALLOWED_PREFIXES = ("products/", "blog/", "avatars/")
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+
+
+class ThumbnailNotFound(Exception):
+    pass
+
+
+class ThumbnailBusy(Exception):
+    pass
+
+
+@dataclass
+class Thumbnail:
+    path: Path
+    relative_path: str
+    content_type: str
+
+
+_resize_slots: threading.BoundedSemaphore | None = None
+_cache_lock = threading.Lock()
+_cache_size: int | None = None
+
+
+def _slots() -> threading.BoundedSemaphore:
+    global _resize_slots
+    if _resize_slots is None:
+        with _cache_lock:
+            if _resize_slots is None:
+                _resize_slots = threading.BoundedSemaphore(
+                    settings.THUMBNAIL_MAX_CONCURRENT_RESIZES
+                )
+    return _resize_slots
+
+
+def cache_dir() -> Path:
+    return Path(settings.THUMBNAIL_CACHE_DIR)
+
+
+def clean_source_path(path: str) -> str:
+    normalized = posixpath.normpath(path).lstrip("/")
+    if normalized.startswith("..") or not normalized.startswith(ALLOWED_PREFIXES):
+        raise ThumbnailNotFound(path)
+    return normalized
+
+
+def choose_format(accept: str, source_format: str | None) -> str:
+    if "image/webp" in accept:
+        return "webp"
+    return "png" if source_format == "PNG" else "jpeg"
+
+
+def get_thumbnail(path: str, width: int, height: int, accept: str = "") -> Thumbnail:
+    """Return the cached thumbnail for ``path``, rendering it on a miss."""
+    if (width, height) not in settings.THUMBNAIL_SIZES:
+        raise ThumbnailNotFound(f"{width}x{height}")
+    source = clean_source_path(path)
+    try:
+        fingerprint = (
+            f"{source}|{default_storage.size(source)}|"
+            f"{default_storage.get_modified_time(source).timestamp()}"
+        )
+    except (OSError, NotImplementedError) as exc:
+        raise ThumbnailNotFound(path) from exc
+
+    # The output format depends on the source only when WebP is not accepted.
+    candidates = ("webp",) if "image/webp" in accept else ("jpeg", "png")
+    for fmt in candidates:
+        cached = _cached(fingerprint, width, height, fmt)
+        if cached is not None:
+            return cached
+    return _render(source, fingerprint, width, height, accept)
+
+
+def _relative_name(fingerprint: str, width: int, height: int, fmt: str) -> str:
+    key = hashlib.sha256(f"{fingerprint}|{width}x{height}|{fmt}".encode()).hexdigest()
+    return f"{key[:2]}/{key}.{fmt}"
+
+
+def _cached(fingerprint: str, width: int, height: int, fmt: str) -> Thumbnail | None:
+    relative = _relative_name(fingerprint, width, height, fmt)
+    target = cache_dir() / relative
+    try:
+        os.utime(target)
+    except FileNotFoundError:
+        return None
+    return Thumbnail(target, relative, OUTPUT_FORMATS[fmt][1])
+
+
+def _render(
+    source: str, fingerprint: str, width: int, height: int, accept: str
+) -> Thumbnail:
+    slots = _slots()
+    if not slots.acquire(timeout=settings.THUMBNAIL_RESIZE_WAIT_SECONDS):
+        raise ThumbnailBusy(source)
+    try:
+        with default_storage.open(source, "rb") as handle:
+            payload = handle.read()
+        try:
+            with Image.open(BytesIO(payload)) as original:
+                fmt = choose_format(accept, original.format)
+                pil_format, content_type = OUTPUT_FORMATS[fmt]
+                cached = _cached(fingerprint, width, height, fmt)
+                if cached is not None:
+                    return cached
+                image = ImageOps.exif_transpose(original)
+                image = image.convert(
+                    "RGB" if fmt == "jpeg" else "RGBA" if "A" in image.mode else "RGB"
+                )
+                thumb = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+                buffer = BytesIO()
+                thumb.save(buffer, format=pil_format, quality=82)
+        except (OSError, ValueError, Image.DecompressionBombError) as exc:
+            raise ThumbnailNotFound(source) from exc
+    finally:
+        slots.release()
+
+    relative = _relative_name(fingerprint, width, height, fmt)
+    target = cache_dir() / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    data = buffer.getvalue()
+    with tempfile.NamedTemporaryFile(dir=target.parent, delete=False) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, target)
+    _track_write(len(data))
+    return Thumbnail(target, relative, content_type)
+
+
+def _track_write(size: int) -> None:
+    global _cache_size
+    with _cache_lock:
+        if _cache_size is None:
+            _cache_size = sum(
+                entry.stat().st_size
+                for entry in cache_dir().rglob("*")
+                if entry.is_file()
+            )
+        else:
+            _cache_size += size
+        if _cache_size > settings.THUMBNAIL_CACHE_MAX_BYTES:
+            _cache_size = evict(int(settings.THUMBNAIL_CACHE_MAX_BYTES * 0.9))
+
+
+def evict(target_bytes: int) -> int:
+    """Delete least recently used thumbnails until the cache fits ``target_bytes``."""
+    entries = []
+    for entry in cache_dir().rglob("*"):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        if entry.is_file():
+            entries.append((stat.st_mtime, stat.st_size, entry))
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries, key=lambda item: item[0]):
+        if total <= target_bytes:
+            break
+        try:
+            entry.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
+
+
+def reset_cache_state() -> None:
+    """Forget the tracked cache size and resize slots (used after settings change)."""
+    global _cache_size, _resize_slots
+    with _cache_lock:
+        _cache_size = None
+        _resize_slots = None
@@ -5,7 +5,7 @@ URL configuration for the project.
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.views.generic import TemplateView
 from drf_spectacular.views import (
     SpectacularAPIView,
@@ -13,9 +13,22 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from .views import metrics, slow_queries, thumbnail
+
 urlpatterns = [
     path("", TemplateView.as_view(template_name="index.html"), name="home"),
+    path(
+        "admin/slow-queries/",
+        admin.site.admin_view(slow_queries),
+        name="admin-slow-queries",
+    ),
     path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
+    re_path(
+        r"^media/thumbs/(?P<width>\d+)x(?P<height>\d+)/(?P<path>.+)$",
+        thumbnail,
+        name="thumbnail",
+    ),
     path("api/auth/", include("accounts.urls")),
     path("api/", include("shop.urls")),
     path("api/content/", include("content.urls")),
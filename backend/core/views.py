@@ -0,0 +1,77 @@
+"""
+Project-level views that do not belong to a domain app.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from .metrics import render_metrics
+from .slow_queries import slow_query_log
+from .thumbnails import ThumbnailBusy, ThumbnailNotFound, get_thumbnail
+
+
+def metrics(request):
+    """Expose aggregated request metrics in the Prometheus text format."""
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if token:
+        if not constant_time_compare(authorization, f"Bearer {token}"):
+            return HttpResponseForbidden("Invalid metrics token.")
+    elif not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden("Metrics are available to staff only.")
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def slow_queries(request):
+    """Show the slow query ring buffer of the worker serving the request."""
+    user = request.user
+    if not (user.is_staff and user.has_perm(settings.SLOW_QUERY_VIEW_PERMISSION)):
+        raise PermissionDenied
+    if request.method == "POST":
+        slow_query_log.clear()
+        return redirect("admin-slow-queries")
+    context = {
+        **admin.site.each_context(request),
+        "title": "Slow queries",
+        "entries": slow_query_log.entries(),
+        "enabled": settings.SLOW_QUERY_LOG_ENABLED,
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "explain_rate": settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    }
+    return TemplateResponse(request, "admin/slow_queries.html", context)
+
+
+@require_GET
+def thumbnail(request, width: str, height: str, path: str):
+    """Serve a cached thumbnail of an uploaded image, rendering it on a miss."""
+    try:
+        thumb = get_thumbnail(
+            path, int(width), int(height), request.headers.get("Accept", "")
+        )
+    except ThumbnailNotFound as exc:
+        raise Http404("Thumbnail not available.") from exc
+    except ThumbnailBusy:
+        response = HttpResponse("Thumbnail rendering is busy.", status=503)
+        response["Retry-After"] = "1"
+        return response
+
+    prefix = settings.THUMBNAIL_ACCEL_REDIRECT_PREFIX
+    if prefix:
+        response = HttpResponse(content_type=thumb.content_type)
+        response["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{thumb.relative_path}"
+    else:
+        response = FileResponse(open(thumb.path, "rb"), content_type=thumb.content_type)
+    patch_cache_control(response, public=True, max_age=settings.THUMBNAIL_MAX_AGE)
+    patch_vary_headers(response, ("Accept",))
+    return response
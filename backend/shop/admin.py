@@ -1,8 +1,20 @@
+from collections.abc import Iterator
+
+from django.conf import settings
 from django.contrib import admin, messages
+from django.db import transaction
+from django.db.models import ProtectedError
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
+from core.paginators import EstimatedCountPaginator
+
+from . import jobs
+from .catalog_io import export_lines, schedule_import
 from .models import (
+    AdminJob,
     Cart,
     CartItem,
     Category,
@@ -10,8 +22,11 @@ from .models import (
     OrderItem,
     Product,
     ProductImage,
+    ProductImport,
     ProductReview,
 )
+from .moderation import moderate_reviews
+from .signals import SideEffects, batched_side_effects
 
 # Admin branding
 admin.site.site_header = "Shopster Admin"
@@ -98,7 +113,66 @@ class DeletedStatusFilter(admin.SimpleListFilter):
         return queryset
 
 
-class SoftDeleteAdmin(admin.ModelAdmin):
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that grow with traffic."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class BulkActionAdmin(LargeTableAdmin):
+    """
+    Actions that process the selection in chunks of ``bulk_batch_size`` rows.
+
+    A chunk method takes ``(pks, user=..., **params)`` and returns the number
+    of rows it changed. ``run_bulk_action`` calls it within the request for up
+    to ``ADMIN_JOB_INLINE_MAX_ROWS`` rows and queues an ``AdminJob`` for
+    ``run_admin_jobs`` otherwise (see ``shop.jobs``).
+    """
+
+    # Rows per UPDATE/DELETE statement and per background job chunk.
+    bulk_batch_size = 1000
+
+    def record_bulk_change(self, effects: SideEffects, queryset) -> None:
+        """Add the search/cache side effects of changing ``queryset`` in bulk."""
+
+    def _batches(self, pks: list) -> Iterator[list]:
+        for start in range(0, len(pks), self.bulk_batch_size):
+            yield pks[start : start + self.bulk_batch_size]
+
+    def run_bulk_action(
+        self, request, queryset, action: str, description, **params
+    ) -> int | None:
+        """Changed row count, or ``None`` when the action was queued as a job."""
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+        if len(pks) > settings.ADMIN_JOB_INLINE_MAX_ROWS:
+            job = jobs.enqueue(
+                self,
+                action,
+                pks,
+                user=request.user,
+                description=description,
+                params=params,
+            )
+            self.message_user(
+                request,
+                _(
+                    "%(count)d record(s) were queued as background job #%(job)d; "
+                    "follow its progress under Admin jobs."
+                )
+                % {"count": len(pks), "job": job.pk},
+                messages.INFO,
+            )
+            return None
+        chunk = getattr(self, action)
+        with transaction.atomic(), batched_side_effects():
+            return sum(
+                chunk(batch, user=request.user, **params)
+                for batch in self._batches(pks)
+            )
+
+
+class SoftDeleteAdmin(BulkActionAdmin):
     actions = ["soft_delete_selected", "restore_selected", "hard_delete_selected"]
 
     def get_queryset(self, request):
@@ -113,12 +187,36 @@ class SoftDeleteAdmin(admin.ModelAdmin):
     def is_archived(self, obj):
         return obj.deleted_at is not None
 
+    def archive_rows(self, pks: list, user=None) -> int:
+        with batched_side_effects() as effects:
+            rows = self.model.all_objects.filter(pk__in=pks)
+            count = rows.filter(deleted_at__isnull=True).delete()
+            self.record_bulk_change(effects, rows)
+        return count
+
+    def restore_rows(self, pks: list, user=None) -> int:
+        with batched_side_effects() as effects:
+            rows = self.model.all_objects.filter(pk__in=pks)
+            count = rows.filter(deleted_at__isnull=False).update(deleted_at=None)
+            self.record_bulk_change(effects, rows)
+        return count
+
+    def delete_rows(self, pks: list, user=None) -> int:
+        # Cascades are collected per chunk; receivers only record products.
+        with batched_side_effects():
+            _, deleted = self.model.all_objects.filter(pk__in=pks).hard_delete()
+        return deleted.get(self.model._meta.label, 0)
+
+    @admin.action(description=_("Archive selected records"))
     def soft_delete_selected(self, request, queryset):
-        count = 0
-        for obj in queryset:
-            if obj.deleted_at is None:
-                obj.delete()
-                count += 1
+        count = self.run_bulk_action(
+            request,
+            queryset.filter(deleted_at__isnull=True),
+            "archive_rows",
+            _("Archive selected records"),
+        )
+        if count is None:
+            return
         if count:
             self.message_user(
                 request,
@@ -130,14 +228,16 @@ class SoftDeleteAdmin(admin.ModelAdmin):
                 request, _("Selected records are already archived."), messages.WARNING
             )
 
-    soft_delete_selected.short_description = _("Archive selected records")
-
+    @admin.action(description=_("Restore selected records"))
     def restore_selected(self, request, queryset):
-        count = 0
-        for obj in queryset:
-            if obj.deleted_at:
-                obj.restore()
-                count += 1
+        count = self.run_bulk_action(
+            request,
+            queryset.filter(deleted_at__isnull=False),
+            "restore_rows",
+            _("Restore selected records"),
+        )
+        if count is None:
+            return
         if count:
             self.message_user(
                 request,
@@ -149,27 +249,35 @@ class SoftDeleteAdmin(admin.ModelAdmin):
                 request, _("No archived records were selected."), messages.WARNING
             )
 
-    restore_selected.short_description = _("Restore selected records")
-
+    @admin.action(description=_("Permanently delete selected records"))
     def hard_delete_selected(self, request, queryset):
-        count = queryset.count()
-        for obj in queryset:
-            obj.hard_delete()
+        try:
+            count = self.run_bulk_action(
+                request,
+                queryset,
+                "delete_rows",
+                _("Permanently delete selected records"),
+            )
+        except ProtectedError as exc:
+            self.message_user(request, exc.args[0], messages.ERROR)
+            return
+        if count is None:
+            return
         self.message_user(
             request,
             _("Permanently deleted %(count)d record(s).") % {"count": count},
             messages.WARNING if count else messages.INFO,
         )
 
-    hard_delete_selected.short_description = _("Permanently delete selected records")
-
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ("name", "slug", "is_active")
+    list_display = ("name", "slug", "parent", "is_active")
     list_filter = ("is_active",)
+    list_select_related = ("parent",)
     search_fields = ("name", "slug")
     prepopulated_fields = {"slug": ("name",)}
+    autocomplete_fields = ("parent",)
 
 
 class ProductImageInline(admin.TabularInline):
@@ -190,21 +298,177 @@ class ProductAdmin(SoftDeleteAdmin):
         "deleted_at",
     )
     list_filter = ("category", "is_active", DeletedStatusFilter)
+    list_select_related = ("category",)
     search_fields = ("name", "sku", "slug")
+    autocomplete_fields = ("category",)
     prepopulated_fields = {"slug": ("name",)}
     inlines = [ProductImageInline]
     readonly_fields = ("deleted_at",)
+    actions = SoftDeleteAdmin.actions + ["reindex_selected", "export_selected_csv"]
+
+    def record_bulk_change(self, effects, queryset):
+        effects.indexed.update(queryset.values_list("pk", flat=True))
+        effects.navigation = True
+
+    def reindex_rows(self, pks: list, user=None) -> int:
+        with batched_side_effects() as effects:
+            effects.indexed.update(pks)
+        return len(pks)
+
+    @admin.action(description=_("Reindex selected products in search"))
+    def reindex_selected(self, request, queryset):
+        count = self.run_bulk_action(
+            request, queryset, "reindex_rows", _("Reindex selected products in search")
+        )
+        if count is not None:
+            self.message_user(
+                request,
+                _("Scheduled a search reindex of %(count)d product(s).")
+                % {"count": count},
+                messages.SUCCESS,
+            )
+
+    @admin.action(description=_("Export selected products to CSV"))
+    def export_selected_csv(self, request, queryset):
+        response = StreamingHttpResponse(
+            export_lines(ProductImport.Format.CSV, queryset),
+            content_type="text/csv; charset=utf-8",
+        )
+        response["Content-Disposition"] = 'attachment; filename="products.csv"'
+        return response
+
+
+@admin.register(ProductImport)
+class ProductImportAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "status",
+        "format",
+        "rows_created",
+        "rows_updated",
+        "rows_failed",
+        "created_by",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status", "format")
+    list_select_related = ("created_by",)
+    readonly_fields = (
+        "status",
+        "rows_created",
+        "rows_updated",
+        "rows_failed",
+        "error_report",
+        "message",
+        "created_by",
+        "created_at",
+        "finished_at",
+    )
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            return ("source", "format", *self.readonly_fields)
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+        if not change:
+            schedule_import(obj.pk)
+            self.message_user(
+                request,
+                _("Import #%(id)d started; refresh this page to follow progress.")
+                % {"id": obj.pk},
+                messages.INFO,
+            )
 
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
     extra = 0
+    autocomplete_fields = ("product",)
+
+
+@admin.register(AdminJob)
+class AdminJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "description",
+        "status",
+        "display_progress",
+        "affected",
+        "created_by",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+    list_select_related = ("created_by",)
+    fields = (
+        "description",
+        "model",
+        "action",
+        "params",
+        "status",
+        "display_progress",
+        "affected",
+        "message",
+        "created_by",
+        "created_at",
+        "started_at",
+        "heartbeat_at",
+        "finished_at",
+    )
+    readonly_fields = fields
+    actions = ["retry_jobs", "cancel_jobs"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        # The selected primary keys can be large and are never displayed.
+        return super().get_queryset(request).defer("object_ids")
+
+    @admin.display(description=_("Progress"))
+    def display_progress(self, obj: AdminJob):
+        return format_html(
+            '<progress value="{}" max="{}"></progress> {} / {} ({}%)',
+            obj.processed,
+            obj.total or 1,
+            obj.processed,
+            obj.total,
+            obj.progress,
+        )
+
+    @admin.action(description=_("Retry or resume selected jobs"))
+    def retry_jobs(self, request, queryset):
+        count = queryset.filter(
+            status__in=[AdminJob.Status.FAILED, AdminJob.Status.CANCELLED]
+        ).update(status=AdminJob.Status.PENDING, message="", finished_at=None)
+        self.message_user(
+            request,
+            _("Queued %(count)d job(s) again.") % {"count": count},
+            messages.SUCCESS if count else messages.WARNING,
+        )
+
+    @admin.action(description=_("Cancel selected jobs"))
+    def cancel_jobs(self, request, queryset):
+        count = queryset.filter(
+            status__in=[AdminJob.Status.PENDING, AdminJob.Status.RUNNING]
+        ).update(status=AdminJob.Status.CANCELLED, finished_at=timezone.now())
+        self.message_user(
+            request,
+            _("Cancelled %(count)d job(s).") % {"count": count},
+            messages.WARNING if count else messages.INFO,
+        )
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(LargeTableAdmin):
     list_display = ("id", "user", "created_at", "updated_at")
+    list_select_related = ("user",)
     search_fields = ("id", "user__email")
+    autocomplete_fields = ("user",)
     inlines = [CartItemInline]
 
 
@@ -219,6 +483,9 @@ class OrderItemInline(admin.TabularInline):
         "line_total",
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("product")
+
 
 @admin.register(Order)
 class OrderAdmin(SoftDeleteAdmin):
@@ -233,7 +500,12 @@ class OrderAdmin(SoftDeleteAdmin):
         "deleted_at",
     )
     list_filter = (OrderStatusFilter, OrderPaymentStatusFilter, DeletedStatusFilter)
-    search_fields = ("id", "customer_email", "shipping_full_name")
+    list_select_related = ("user",)
+    # Both lookups are indexed; ``icontains`` over name/e-mail scanned the table.
+    search_fields = ("^customer_email",)
+    search_help_text = _("Order number or the beginning of the customer e-mail.")
+    autocomplete_fields = ("user",)
+    raw_id_fields = ("cart",)
     readonly_fields = (
         "subtotal_amount",
         "total_amount",
@@ -244,6 +516,17 @@ class OrderAdmin(SoftDeleteAdmin):
     )
     inlines = [OrderItemInline]
 
+    def record_bulk_change(self, effects, queryset):
+        effects.purchasers.update(
+            queryset.exclude(user=None).values_list("user_id", flat=True)
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip().lstrip("#")
+        if term.isdigit() and len(term) <= 18:
+            return queryset.filter(pk=int(term)), False
+        return super().get_search_results(request, queryset, search_term)
+
     @admin.display(description="Status")
     def display_status(self, obj: Order):
         return ORDER_STATUS_LABELS.get(obj.status, obj.status)
@@ -253,9 +536,21 @@ class OrderAdmin(SoftDeleteAdmin):
         return ORDER_PAYMENT_STATUS_LABELS.get(obj.payment_status, obj.payment_status)
 
 
-admin.site.register(ProductImage)
-admin.site.register(CartItem)
-admin.site.register(OrderItem)
+@admin.register(ProductImage)
+class ProductImageAdmin(LargeTableAdmin):
+    list_select_related = ("product",)
+    autocomplete_fields = ("product",)
+
+
+@admin.register(CartItem)
+class CartItemAdmin(LargeTableAdmin):
+    list_select_related = ("product",)
+    autocomplete_fields = ("cart", "product")
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(LargeTableAdmin):
+    autocomplete_fields = ("order", "product")
 
 
 @admin.register(ProductReview)
@@ -277,6 +572,7 @@ class ProductReviewAdmin(SoftDeleteAdmin):
         DeletedStatusFilter,
         "rating",
     )
+    list_select_related = ("product", "user")
     search_fields = (
         "product__name",
         "user__email",
@@ -285,6 +581,7 @@ class ProductReviewAdmin(SoftDeleteAdmin):
         "title",
         "body",
     )
+    autocomplete_fields = ("product", "user")
     readonly_fields = (
         "created_at",
         "updated_at",
@@ -294,12 +591,21 @@ class ProductReviewAdmin(SoftDeleteAdmin):
     )
     actions = SoftDeleteAdmin.actions + ["approve_reviews", "reject_reviews"]
 
+    def record_bulk_change(self, effects, queryset):
+        effects.reviewed.update(queryset.values_list("product_id", flat=True))
+
+    def moderate_rows(self, pks: list, user=None, *, status: str) -> int:
+        rows = ProductReview.all_objects.filter(pk__in=pks)
+        return len(moderate_reviews(rows, status=status, moderator=user))
+
     @admin.action(description=_("Approve selected reviews"))
     def approve_reviews(self, request, queryset):
-        updated = queryset.update(
-            moderation_status=ProductReview.ModerationStatus.APPROVED,
-            moderated_by=request.user,
-            moderated_at=timezone.now(),
+        updated = self.run_bulk_action(
+            request,
+            queryset,
+            "moderate_rows",
+            _("Approve selected reviews"),
+            status=ProductReview.ModerationStatus.APPROVED,
         )
         if updated:
             self.message_user(
@@ -310,10 +616,12 @@ class ProductReviewAdmin(SoftDeleteAdmin):
 
     @admin.action(description=_("Reject selected reviews"))
     def reject_reviews(self, request, queryset):
-        updated = queryset.update(
-            moderation_status=ProductReview.ModerationStatus.REJECTED,
-            moderated_by=request.user,
-            moderated_at=timezone.now(),
+        updated = self.run_bulk_action(
+            request,
+            queryset,
+            "moderate_rows",
+            _("Reject selected reviews"),
+            status=ProductReview.ModerationStatus.REJECTED,
         )
         if updated:
             self.message_user(
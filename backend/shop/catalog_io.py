@@ -0,0 +1,441 @@
+"""
+Streaming product import/export (CSV or JSON Lines).
+
+``import_products`` reads rows one at a time, validates them with
+``ProductImportRowSerializer`` and upserts them by ``sku`` with
+``bulk_create(update_conflicts=True)`` in chunks of ``PRODUCT_IMPORT_CHUNK_SIZE``.
+Rows for existing SKUs may carry only the columns they change (a price/stock
+feed is ``sku,price,stock``); missing columns keep their stored values. New
+products get a temporary slug on insert; real slugs are allocated and Algolia is
+updated once, in batches, after all rows are loaded. Invalid rows are written to
+an error report as they are found, so memory use does not grow with the file.
+
+Imports uploaded in the admin (``ProductImport``) are run by the
+``run_admin_jobs`` worker, which claims pending imports and imports whose
+heartbeat (touched after every chunk) is older than ``ADMIN_JOB_STALE_AFTER``
+seconds. Upserts by ``sku`` are idempotent, so a reclaimed import starts over.
+With ``PRODUCT_IMPORT_ASYNC`` off the import runs in the request after commit.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from functools import partial
+from io import TextIOWrapper
+from typing import IO, Any
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from core.slugs import allocate_slugs
+
+from . import navigation, review_feed
+from .models import Category, Product, ProductImport
+from .search import index_products
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = (
+    "sku",
+    "name",
+    "category",
+    "price",
+    "currency",
+    "stock",
+    "is_active",
+    "short_description",
+    "description",
+    "meta_title",
+    "meta_description",
+    "meta_keywords",
+)
+REQUIRED_FOR_NEW = ("name", "category", "price")
+# Columns read to fill in missing meta tags; loaded together when a row has any.
+META_FIELDS = (
+    "name",
+    "short_description",
+    "description",
+    "meta_title",
+    "meta_description",
+)
+PENDING_SLUG_PREFIX = "import-pending-"
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=64)
+    name = serializers.CharField(max_length=255, required=False)
+    category = serializers.CharField(max_length=255, required=False)
+    price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+    currency = serializers.CharField(max_length=3, required=False)
+    stock = serializers.IntegerField(min_value=0, required=False)
+    is_active = serializers.BooleanField(required=False)
+    short_description = serializers.CharField(
+        max_length=500, required=False, allow_blank=True
+    )
+    description = serializers.CharField(required=False, allow_blank=True)
+    meta_title = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    meta_description = serializers.CharField(
+        max_length=500, required=False, allow_blank=True
+    )
+    meta_keywords = serializers.CharField(
+        max_length=255, required=False, allow_blank=True
+    )
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.created + self.updated + self.failed
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield ``(line number, row)`` pairs; blank CSV cells count as missing."""
+    if fmt == ProductImport.Format.JSONL:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_number, {"__error__": f"Invalid JSON: {exc.msg}"}
+                continue
+            if not isinstance(row, dict):
+                row = {"__error__": "Expected a JSON object."}
+            yield line_number, row
+        return
+    reader = csv.DictReader(stream)
+    for row in reader:
+        cleaned = {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key and value is not None and value.strip() != ""
+        }
+        yield reader.line_num, cleaned
+
+
+class ProductImporter:
+    """Validate and upsert product rows; see the module docstring."""
+
+    def __init__(
+        self,
+        *,
+        chunk_size: int | None = None,
+        error_stream: IO[str] | None = None,
+        on_chunk: Callable[[], None] | None = None,
+    ) -> None:
+        self.chunk_size = chunk_size or settings.PRODUCT_IMPORT_CHUNK_SIZE
+        self.on_chunk = on_chunk
+        self.result = ImportResult()
+        self.validator = ProductImportRowSerializer()
+        self.categories = self._category_map()
+        self.new_product_ids: list[int] = []
+        self.changed_product_ids: list[int] = []
+        self.renamed_product_ids: list[int] = []
+        self.error_writer = (
+            csv.writer(error_stream) if error_stream is not None else None
+        )
+        if self.error_writer is not None:
+            self.error_writer.writerow(("line", "sku", "errors"))
+
+    @staticmethod
+    def _category_map() -> dict[str, int]:
+        mapping: dict[str, int] = {}
+        for pk, name, slug in Category.objects.values_list("id", "name", "slug"):
+            mapping[name.casefold()] = pk
+            mapping[slug.casefold()] = pk
+        return mapping
+
+    def run(self, rows: Iterable[tuple[int, dict[str, Any]]]) -> ImportResult:
+        chunk: list[tuple[int, dict[str, Any]]] = []
+        for line_number, row in rows:
+            validated = self._validate(line_number, row)
+            if validated is not None:
+                chunk.append((line_number, validated))
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk)
+                chunk = []
+                if self.on_chunk is not None:
+                    self.on_chunk()
+        if chunk:
+            self._flush(chunk)
+        self.finalize()
+        return self.result
+
+    def _fail(self, line_number: int, sku: str, errors: Any) -> None:
+        self.result.failed += 1
+        if self.error_writer is not None:
+            self.error_writer.writerow(
+                (line_number, sku, json.dumps(errors, ensure_ascii=False))
+            )
+
+    def _validate(self, line_number: int, row: dict[str, Any]) -> dict | None:
+        sku = str(row.get("sku", ""))
+        if "__error__" in row:
+            self._fail(line_number, sku, {"row": [row["__error__"]]})
+            return None
+        try:
+            data = self.validator.run_validation(row)
+        except serializers.ValidationError as exc:
+            self._fail(line_number, sku, exc.detail)
+            return None
+        if "category" in data:
+            category_id = self.categories.get(data.pop("category").casefold())
+            if category_id is None:
+                self._fail(line_number, sku, {"category": ["Unknown category."]})
+                return None
+            data["category_id"] = category_id
+        return data
+
+    def _flush(self, chunk: list[tuple[int, dict[str, Any]]]) -> None:
+        # Duplicate SKUs inside a chunk: the last row wins, as in a sequential import.
+        by_sku = {data["sku"]: (line, data) for line, data in chunk}
+        # Existing products load only the columns the chunk writes, so a
+        # price/stock feed does not read descriptions it leaves alone.
+        fields = {"sku"}.union(*(data for _, data in by_sku.values()))
+        if fields.intersection(META_FIELDS):
+            fields.update(META_FIELDS)
+        existing = Product.all_objects.only(
+            *(Product._meta.get_field(field).name for field in fields)
+        ).in_bulk(list(by_sku), field_name="sku")
+
+        created: list[Product] = []
+        updated: list[Product] = []
+        created_columns: set[str] = set()
+        updated_columns: set[str] = set()
+        for sku, (line_number, data) in by_sku.items():
+            product = existing.get(sku)
+            if product is None:
+                missing = [
+                    field
+                    for field in REQUIRED_FOR_NEW
+                    if field not in data
+                    and not (field == "category" and "category_id" in data)
+                ]
+                if missing:
+                    self._fail(
+                        line_number,
+                        sku,
+                        {f: ["Required for new products."] for f in missing},
+                    )
+                    continue
+                product = Product(slug=f"{PENDING_SLUG_PREFIX}{uuid4().hex}")
+                created.append(product)
+                columns = created_columns
+            else:
+                updated.append(product)
+                columns = updated_columns
+            for field, value in data.items():
+                setattr(product, field, value)
+            columns.update(data)
+            if columns is updated_columns and not data.keys() & set(META_FIELDS):
+                continue
+            if not product.meta_title:
+                product.meta_title = product.name
+                columns.add("meta_title")
+            if not product.meta_description:
+                product.meta_description = next(
+                    (
+                        c[:500]
+                        for c in (product.short_description, product.description)
+                        if c
+                    ),
+                    "",
+                )
+                columns.add("meta_description")
+
+        if not created and not updated:
+            return
+        now = timezone.now()
+        for product in updated:
+            product.updated_at = now
+        with transaction.atomic():
+            if created:
+                # Upserted on ``sku`` in case a concurrent import inserted it.
+                Product.all_objects.bulk_create(
+                    created,
+                    update_conflicts=True,
+                    unique_fields=["sku"],
+                    update_fields=sorted(created_columns - {"sku"} | {"updated_at"}),
+                )
+            if updated:
+                Product.all_objects.bulk_update(
+                    updated, sorted(updated_columns - {"sku"} | {"updated_at"})
+                )
+        self.result.created += len(created)
+        self.result.updated += len(updated)
+        if created:
+            new_ids = list(
+                Product.all_objects.filter(
+                    sku__in=[p.sku for p in created]
+                ).values_list("id", flat=True)
+            )
+            self.new_product_ids.extend(new_ids)
+            self.changed_product_ids.extend(new_ids)
+        self.changed_product_ids.extend(product.pk for product in updated)
+        if "name" in updated_columns:
+            # Cached review feed pages show the product name.
+            self.renamed_product_ids.extend(product.pk for product in updated)
+
+    def finalize(self) -> None:
+        """Allocate real slugs for new products and reindex changed ones in batches."""
+        for start in range(0, len(self.new_product_ids), self.chunk_size):
+            assign_slugs(self.new_product_ids[start : start + self.chunk_size])
+        index_products(dict.fromkeys(self.changed_product_ids))
+        if self.changed_product_ids:
+            navigation.invalidate_on_commit()
+        if self.renamed_product_ids:
+            review_feed.invalidate_on_commit(self.renamed_product_ids)
+
+
+def assign_slugs(product_ids: list[int]) -> None:
+    """Replace temporary slugs with unique name-based ones (batch allocation)."""
+    products = list(
+        Product.all_objects.filter(
+            pk__in=product_ids, slug__startswith=PENDING_SLUG_PREFIX
+        ).only("id", "name", "slug")
+    )
+    if not products:
+        return
+    slugs = allocate_slugs(Product, [p.name for p in products], fallback="product")
+    for product, slug in zip(products, slugs, strict=True):
+        product.slug = slug
+    Product.all_objects.bulk_update(products, ["slug"])
+
+
+def import_products(
+    stream: IO[str],
+    fmt: str,
+    *,
+    error_stream: IO[str] | None = None,
+    chunk_size: int | None = None,
+    on_chunk: Callable[[], None] | None = None,
+) -> ImportResult:
+    importer = ProductImporter(
+        chunk_size=chunk_size, error_stream=error_stream, on_chunk=on_chunk
+    )
+    return importer.run(read_rows(stream, fmt))
+
+
+def export_rows(queryset=None) -> Iterator[dict[str, Any]]:
+    """Yield export rows using a server-side cursor where the database has one."""
+    queryset = queryset if queryset is not None else Product.objects.all()
+    values = queryset.order_by("pk").values_list(
+        *(f if f != "category" else "category__name" for f in EXPORT_FIELDS)
+    )
+    for row in values.iterator(chunk_size=settings.PRODUCT_IMPORT_CHUNK_SIZE):
+        yield dict(zip(EXPORT_FIELDS, row, strict=True))
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_lines(fmt: str, queryset=None) -> Iterator[str]:
+    """Serialize ``export_rows`` as CSV or JSON Lines, one line at a time."""
+    if fmt == ProductImport.Format.JSONL:
+        for row in export_rows(queryset):
+            row["price"] = str(row["price"])
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+        return
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in export_rows(queryset):
+        yield writer.writerow(row.values())
+
+
+def _heartbeat(job_id: int) -> None:
+    ProductImport.objects.filter(pk=job_id).update(heartbeat_at=timezone.now())
+
+
+def run_import_job(job_id: int) -> None:
+    """Process a ``ProductImport`` created from the admin and record the outcome."""
+    job = ProductImport.objects.get(pk=job_id)
+    job.status = ProductImport.Status.RUNNING
+    job.heartbeat_at = timezone.now()
+    job.save(update_fields=["status", "heartbeat_at"])
+    try:
+        with (
+            job.source.open("rb") as raw,
+            tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as errors,
+        ):
+            stream = TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            result = import_products(
+                stream,
+                job.format,
+                error_stream=errors,
+                on_chunk=partial(_heartbeat, job.pk),
+            )
+            if result.failed:
+                errors.seek(0)
+                job.error_report.save(
+                    f"import-{job.pk}-errors.csv", File(errors), save=False
+                )
+        job.rows_created = result.created
+        job.rows_updated = result.updated
+        job.rows_failed = result.failed
+        job.status = ProductImport.Status.DONE
+    except Exception as exc:
+        logger.exception("Product import %s failed", job_id)
+        job.status = ProductImport.Status.FAILED
+        job.message = str(exc)
+    job.finished_at = timezone.now()
+    job.save()
+
+
+def claim_import() -> ProductImport | None:
+    """Mark the oldest pending (or stalled) import as running and return it."""
+    stale = timezone.now() - timedelta(seconds=settings.ADMIN_JOB_STALE_AFTER)
+    with transaction.atomic():
+        job = (
+            ProductImport.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ProductImport.Status.PENDING)
+                | Q(status=ProductImport.Status.RUNNING, heartbeat_at__lt=stale)
+            )
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ProductImport.Status.RUNNING
+        job.heartbeat_at = timezone.now()
+        job.save(update_fields=["status", "heartbeat_at"])
+    return job
+
+
+def run_pending_imports() -> int:
+    """Run queued and stalled imports until none is left; returns how many ran."""
+    count = 0
+    while (job := claim_import()) is not None:
+        run_import_job(job.pk)
+        count += 1
+    return count
+
+
+def schedule_import(job_id: int) -> None:
+    """
+    Leave the import to the ``run_admin_jobs`` worker, or with
+    ``PRODUCT_IMPORT_ASYNC`` off run it once the creating transaction commits.
+    """
+    if not settings.PRODUCT_IMPORT_ASYNC:
+        transaction.on_commit(partial(run_import_job, job_id))
@@ -0,0 +1,519 @@
+"""
+Bulk demo/benchmark data generator behind ``load_demo_data --fast``.
+
+The regular loader goes through ``update_or_create`` and ``Product.save`` for
+every row. For load-testing datasets this module instead:
+
+* renders one placeholder image per colour in a process pool and points every
+  product of that colour at the same file;
+* inserts products, images, users, profiles, orders, order items and reviews
+  with ``bulk_create`` in batches, allocating slugs per batch;
+* mutes the indexing, derivative and profile signals for the whole run;
+* draws order and review volumes from skewed distributions, so a few products
+  and customers account for most of the activity, and ratings are J-shaped.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import random
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import ModelSignal, post_delete, post_save
+from django.utils import timezone
+from PIL import Image, ImageDraw, ImageFont
+
+from accounts.models import UserProfile
+from accounts.signals import create_user_profile
+from core.slugs import allocate_slugs
+
+from . import review_feed
+from .models import Category, Order, OrderItem, Product, ProductImage, ProductReview
+from .navigation import invalidate as invalidate_navigation
+from .purchases import QUALIFYING_STATUSES, TRACKED_FIELDS, qualifies
+from .purchases import refresh as refresh_purchases
+from .ratings import recount as recount_ratings
+from .signals import (
+    product_image_saved,
+    product_saved,
+    review_changed,
+    review_rating_deleted,
+)
+
+IMAGE_DIR = "products/demo"
+DEMO_PASSWORD = "demo-password"
+RATING_WEIGHTS = {5: 45, 4: 25, 3: 10, 2: 7, 1: 13}
+STATUS_WEIGHTS = {
+    Order.Status.COMPLETED: 55,
+    Order.Status.SHIPPED: 12,
+    Order.Status.PAID: 10,
+    Order.Status.PENDING: 15,
+    Order.Status.CANCELLED: 8,
+}
+REVIEW_BODIES = {
+    5: "Отличный товар, полностью оправдал ожидания.",
+    4: "Хороший товар, есть мелкие недочёты.",
+    3: "Нормально, но за эти деньги ждал большего.",
+    2: "Качество могло быть лучше.",
+    1: "Не рекомендую, разочарован покупкой.",
+}
+CITIES = ("Москва", "Санкт-Петербург", "Казань", "Новосибирск", "Екатеринбург")
+
+User = get_user_model()
+
+
+@dataclass
+class StageTiming:
+    name: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+
+@dataclass
+class BulkDemoResult:
+    stages: list[StageTiming] = field(default_factory=list)
+
+    @property
+    def rows(self) -> int:
+        return sum(stage.rows for stage in self.stages)
+
+    @property
+    def seconds(self) -> float:
+        return sum(stage.seconds for stage in self.stages)
+
+
+def render_placeholder(color: tuple[int, int, int], label: str) -> bytes:
+    """PNG placeholder shared by every product of one colour (process-pool safe)."""
+    width, height = 960, 640
+    image = Image.new("RGB", (width, height), color)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 42)
+    except OSError:
+        font = ImageFont.load_default()
+    text = label[:32]
+    bbox = draw.textbbox((0, 0), text, font=font)
+    position = ((width - (bbox[2] - bbox[0])) / 2, (height - (bbox[3] - bbox[1])) / 2)
+    draw.text(position, text, fill=(255, 255, 255), font=font)
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def palette_color(color) -> tuple[int, int, int]:
+    """Snap a colour to a coarse palette so variants share placeholder images."""
+    return tuple(min(255, component // 32 * 32 + 16) for component in color)
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> list[float]:
+    """Popularity weights: the item at rank ``r`` gets ``1 / r ** exponent``."""
+    return [1 / (rank**exponent) for rank in range(1, count + 1)]
+
+
+def batched(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@contextlib.contextmanager
+def muted_signals() -> Iterator[None]:
+    """
+    Disconnect Algolia sync, derivative rendering, profile creation and the
+    per-review rating/feed updates (the run recounts and invalidates once).
+    """
+    receivers: list[tuple[ModelSignal, Callable, type, str]] = [
+        (post_save, product_saved, Product, "shop_product_algolia_sync"),
+        (
+            post_save,
+            product_image_saved,
+            ProductImage,
+            "shop_product_image_derivatives",
+        ),
+        (post_save, create_user_profile, User, "accounts_create_profile"),
+        (post_delete, review_changed, ProductReview, "shop_review_feed_deleted"),
+        (
+            post_delete,
+            review_rating_deleted,
+            ProductReview,
+            "shop_review_ratings_deleted",
+        ),
+    ]
+    disconnected = [
+        (signal, receiver, sender, uid)
+        for signal, receiver, sender, uid in receivers
+        if signal.disconnect(sender=sender, dispatch_uid=uid)
+    ]
+    try:
+        yield
+    finally:
+        for signal, receiver, sender, uid in disconnected:
+            signal.connect(receiver, sender=sender, dispatch_uid=uid)
+
+
+class BulkDemoGenerator:
+    def __init__(
+        self,
+        *,
+        batch_size: int = 1000,
+        workers: int = 4,
+        seed: int | None = None,
+        log: Callable[[StageTiming], None] | None = None,
+    ) -> None:
+        self.batch_size = max(batch_size, 1)
+        self.workers = max(workers, 1)
+        self.random = random.Random(seed)
+        self.log = log
+        self.result = BulkDemoResult()
+
+    @contextlib.contextmanager
+    def _stage(self, name: str) -> Iterator[list[int]]:
+        counter = [0]
+        started = time.perf_counter()
+        yield counter
+        timing = StageTiming(name, counter[0], time.perf_counter() - started)
+        self.result.stages.append(timing)
+        if self.log is not None:
+            self.log(timing)
+
+    def run(
+        self,
+        categories: dict[str, Category],
+        seeds: list,
+        *,
+        users: int = 0,
+        orders: int = 0,
+        reviews_per_product: float = 0.0,
+    ) -> BulkDemoResult:
+        with muted_signals():
+            images = self.render_images(seeds)
+            product_ids = self.create_products(categories, seeds, images)
+            user_ids = self.create_users(users)
+            purchases = self.create_orders(product_ids, user_ids, orders)
+            self.create_reviews(product_ids, user_ids, purchases, reviews_per_product)
+        invalidate_navigation()
+        return self.result
+
+    def render_images(self, seeds: list) -> dict[tuple[int, int, int], str]:
+        """Store one image per palette colour; returns colour -> storage path."""
+        labels: dict[tuple[int, int, int], str] = {}
+        for seed in seeds:
+            labels.setdefault(palette_color(seed.color), seed.category)
+        paths = {
+            color: f"{IMAGE_DIR}/{''.join(f'{c:02x}' for c in color)}.png"
+            for color in labels
+        }
+        missing = [
+            color for color in labels if not default_storage.exists(paths[color])
+        ]
+        with self._stage("images") as counter:
+            args = (missing, [labels[color] for color in missing])
+            if self.workers > 1 and len(missing) > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    rendered = list(pool.map(render_placeholder, *args))
+            else:
+                rendered = list(map(render_placeholder, *args))
+            for color, payload in zip(missing, rendered, strict=True):
+                paths[color] = default_storage.save(paths[color], ContentFile(payload))
+            counter[0] = len(missing)
+        return paths
+
+    def create_products(
+        self,
+        categories: dict[str, Category],
+        seeds: list,
+        images: dict[tuple[int, int, int], str],
+    ) -> list[int]:
+        product_ids: list[int] = []
+        with self._stage("products") as counter:
+            for chunk in batched(seeds, self.batch_size):
+                existing = dict(
+                    Product.all_objects.filter(
+                        sku__in=[seed.sku for seed in chunk]
+                    ).values_list("sku", "slug")
+                )
+                new_seeds = [seed for seed in chunk if seed.sku not in existing]
+                existing.update(
+                    zip(
+                        [seed.sku for seed in new_seeds],
+                        allocate_slugs(
+                            Product,
+                            [seed.name for seed in new_seeds],
+                            fallback="product",
+                        ),
+                        strict=True,
+                    )
+                )
+                products = []
+                for seed in chunk:
+                    slug = existing[seed.sku]
+                    products.append(
+                        Product(
+                            category=categories[seed.category],
+                            name=seed.name,
+                            slug=slug,
+                            sku=seed.sku,
+                            short_description=seed.short_description,
+                            description=seed.description,
+                            price=seed.price,
+                            currency=seed.currency,
+                            stock=seed.stock,
+                            is_active=True,
+                        )
+                    )
+                Product.all_objects.bulk_create(
+                    products,
+                    update_conflicts=True,
+                    unique_fields=["sku"],
+                    update_fields=[
+                        "category",
+                        "name",
+                        "short_description",
+                        "description",
+                        "price",
+                        "currency",
+                        "stock",
+                        "is_active",
+                        "updated_at",
+                    ],
+                )
+                ids_by_sku = dict(
+                    Product.all_objects.filter(
+                        sku__in=[seed.sku for seed in chunk]
+                    ).values_list("sku", "id")
+                )
+                chunk_ids = [ids_by_sku[seed.sku] for seed in chunk]
+                ProductImage.objects.filter(product_id__in=chunk_ids).delete()
+                ProductImage.objects.bulk_create(
+                    [
+                        ProductImage(
+                            product_id=product_id,
+                            image=images[palette_color(seed.color)],
+                            alt_text=seed.name,
+                            is_main=True,
+                        )
+                        for product_id, seed in zip(chunk_ids, chunk, strict=True)
+                    ]
+                )
+                product_ids.extend(chunk_ids)
+                counter[0] += len(chunk) * 2
+        return product_ids
+
+    def create_users(self, count: int) -> list[int]:
+        if count <= 0:
+            return []
+        usernames = [f"demo-user-{index:06d}" for index in range(1, count + 1)]
+        password = make_password(DEMO_PASSWORD)
+        with self._stage("users") as counter:
+            for chunk in batched(usernames, self.batch_size):
+                existing = set(
+                    User.objects.filter(username__in=chunk).values_list(
+                        "username", flat=True
+                    )
+                )
+                created = User.objects.bulk_create(
+                    [
+                        User(
+                            username=username,
+                            email=f"{username}@example.com",
+                            first_name="Demo",
+                            last_name=username.rsplit("-", 1)[-1],
+                            password=password,
+                        )
+                        for username in chunk
+                        if username not in existing
+                    ]
+                )
+                UserProfile.objects.bulk_create(
+                    [
+                        UserProfile(
+                            user_id=user.pk,
+                            default_shipping_city=self.random.choice(CITIES),
+                        )
+                        for user in created
+                    ]
+                )
+                counter[0] += len(created) * 2
+            return list(
+                User.objects.filter(username__in=usernames).values_list("id", flat=True)
+            )
+
+    def create_orders(
+        self, product_ids: list[int], user_ids: list[int], count: int
+    ) -> set[tuple[int, int]]:
+        """Create orders; returns ``(user_id, product_id)`` pairs of verified buys."""
+        purchases: set[tuple[int, int]] = set()
+        if count <= 0 or not product_ids:
+            return purchases
+        names: dict[int, str] = {}
+        prices: dict[int, Decimal] = {}
+        for pk, name, price in Product.all_objects.filter(
+            id__in=product_ids
+        ).values_list("id", "name", "price"):
+            names[pk], prices[pk] = name, price
+        emails = dict(User.objects.filter(id__in=user_ids).values_list("id", "email"))
+        ranked = self.random.sample(product_ids, len(product_ids))
+        product_weights = list(accumulate(zipf_weights(len(ranked))))
+        # Heavy-tailed customers: a few buy often, most buy once or never.
+        customer_weights = list(
+            accumulate(self.random.paretovariate(1.5) for _ in user_ids)
+        )
+        statuses = list(STATUS_WEIGHTS)
+        status_weights = list(STATUS_WEIGHTS.values())
+        now = timezone.now()
+
+        with self._stage("orders") as counter:
+            for chunk_size in self._chunk_sizes(count):
+                orders: list[Order] = []
+                lines: list[list[tuple[int, int]]] = []
+                for _ in range(chunk_size):
+                    user_id = (
+                        self.random.choices(user_ids, cum_weights=customer_weights)[0]
+                        if user_ids and self.random.random() < 0.85
+                        else None
+                    )
+                    picked = set(
+                        self.random.choices(
+                            ranked,
+                            cum_weights=product_weights,
+                            k=self.random.choice((1, 1, 2, 3, 4)),
+                        )
+                    )
+                    items = [
+                        (pid, self.random.choice((1, 1, 1, 2, 3))) for pid in picked
+                    ]
+                    subtotal = sum(prices[pid] * qty for pid, qty in items)
+                    shipping = (
+                        Decimal("0.00") if subtotal >= 5000 else Decimal("390.00")
+                    )
+                    status = self.random.choices(statuses, status_weights)[0]
+                    orders.append(
+                        Order(
+                            user_id=user_id,
+                            status=status,
+                            payment_status=(
+                                Order.PaymentStatus.PAID
+                                if status in QUALIFYING_STATUSES
+                                else Order.PaymentStatus.PENDING
+                            ),
+                            subtotal_amount=subtotal,
+                            shipping_amount=shipping,
+                            total_amount=subtotal + shipping,
+                            customer_email=(
+                                emails[user_id]
+                                if user_id
+                                else f"guest-{self.random.randrange(10**8)}@example.com"
+                            ),
+                            shipping_full_name="Demo Customer",
+                            shipping_address="ул. Демонстрационная, 1",
+                            shipping_city=self.random.choice(CITIES),
+                            placed_at=now
+                            - timedelta(minutes=self.random.randrange(365 * 24 * 60)),
+                        )
+                    )
+                    lines.append(items)
+                Order.objects.bulk_create(orders)
+                order_items = []
+                for order, items in zip(orders, lines, strict=True):
+                    bought = qualifies(
+                        {field: getattr(order, field) for field in TRACKED_FIELDS}
+                    )
+                    for pid, qty in items:
+                        order_items.append(
+                            OrderItem(
+                                order_id=order.pk,
+                                product_id=pid,
+                                product_name=names[pid],
+                                unit_price=prices[pid],
+                                quantity=qty,
+                                line_total=prices[pid] * qty,
+                            )
+                        )
+                        if bought:
+                            purchases.add((order.user_id, pid))
+                OrderItem.objects.bulk_create(order_items, batch_size=self.batch_size)
+                counter[0] += len(orders) + len(order_items)
+        for start in range(0, len(user_ids), self.batch_size):
+            refresh_purchases(user_ids[start : start + self.batch_size])
+        return purchases
+
+    def create_reviews(
+        self,
+        product_ids: list[int],
+        user_ids: list[int],
+        purchases: set[tuple[int, int]],
+        per_product: float,
+    ) -> None:
+        if per_product <= 0 or not product_ids or not user_ids:
+            return
+        buyers: dict[int, list[int]] = {}
+        for user_id, product_id in purchases:
+            buyers.setdefault(product_id, []).append(user_id)
+        # Popular products collect most reviews; the mean stays at ``per_product``.
+        ranked = self.random.sample(product_ids, len(product_ids))
+        weights = zipf_weights(len(ranked))
+        scale = per_product * len(ranked) / sum(weights)
+        ratings = list(RATING_WEIGHTS)
+        rating_weights = list(RATING_WEIGHTS.values())
+        now = timezone.now()
+        ProductReview.all_objects.filter(
+            product_id__in=product_ids, user_id__in=user_ids
+        ).hard_delete()
+
+        with self._stage("reviews") as counter:
+            pending: list[ProductReview] = []
+            for product_id, weight in zip(ranked, weights, strict=True):
+                wanted = min(
+                    int(self.random.expovariate(1 / (weight * scale))), len(user_ids)
+                )
+                verified = buyers.get(product_id, [])[:wanted]
+                others = self.random.sample(user_ids, wanted)
+                authors = list(dict.fromkeys(verified + others))[:wanted]
+                for user_id in authors:
+                    rating = self.random.choices(ratings, rating_weights)[0]
+                    approved = self.random.random() < 0.9
+                    pending.append(
+                        ProductReview(
+                            product_id=product_id,
+                            user_id=user_id,
+                            rating=rating,
+                            title=f"Оценка {rating}",
+                            body=REVIEW_BODIES[rating],
+                            verified_purchase=user_id in verified,
+                            moderation_status=(
+                                ProductReview.ModerationStatus.APPROVED
+                                if approved
+                                else ProductReview.ModerationStatus.PENDING
+                            ),
+                            moderated_at=now if approved else None,
+                        )
+                    )
+                if len(pending) >= self.batch_size:
+                    ProductReview.all_objects.bulk_create(pending)
+                    counter[0] += len(pending)
+                    pending = []
+            ProductReview.all_objects.bulk_create(pending)
+            counter[0] += len(pending)
+        # ``bulk_create`` and the muted deletes skip the rating and feed receivers.
+        recount_ratings(product_ids)
+        review_feed.invalidate(product_ids)
+
+    def _chunk_sizes(self, total: int) -> Iterator[int]:
+        while total > 0:
+            size = min(self.batch_size, total)
+            yield size
+            total -= size
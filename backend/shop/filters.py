@@ -3,7 +3,8 @@
 import django_filters
 from django.db.models import Q, QuerySet
 
-from .models import Product
+from . import navigation
+from .models import Category, Product
 
 
 class ProductFilter(django_filters.FilterSet):
@@ -22,10 +23,15 @@ class ProductFilter(django_filters.FilterSet):
     ) -> QuerySet[Product]:
         if not value:
             return queryset
-        lookup = Q(category__slug=value)
-        if value.isdigit():
-            lookup |= Q(category_id=value)
-        return queryset.filter(lookup)
+        # Subcategories included; resolved from the cached navigation tree.
+        category_ids = navigation.category_ids(value)
+        if category_ids is not None:
+            return queryset.filter(category_id__in=category_ids)
+        # Inactive or unknown category: match it alone, by slug before id.
+        categories = Category.objects.filter(slug=value)
+        if value.isdigit() and not categories.exists():
+            categories = Category.objects.filter(pk=value)
+        return queryset.filter(category__in=categories)
 
     def filter_in_stock(
         self, queryset: QuerySet[Product], name: str, value: bool | None
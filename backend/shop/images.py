@@ -0,0 +1,208 @@
+"""
+Responsive image derivatives for ``ProductImage``.
+
+Saving a product image schedules ``generate_derivatives`` after the transaction
+commits. It renders the original at the widths in ``IMAGE_DERIVATIVE_WIDTHS`` in
+every supported format of ``IMAGE_DERIVATIVE_FORMATS`` and stores the files under
+names hashed from the content and those settings (with the quality), so identical
+uploads share their derivatives, the files can be cached forever, and a settings
+change renders new files. The manifest is kept on ``ProductImage.derivatives``;
+its ``config`` digest lets the backfill command find images rendered with older
+settings.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from functools import partial
+from io import BytesIO
+from typing import Any
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from core.executors import BackgroundExecutor
+
+from .models import ProductImage
+
+logger = logging.getLogger(__name__)
+
+# Format name -> (Pillow format, file extension, MIME type).
+FORMATS: dict[str, tuple[str, str, str]] = {
+    "avif": ("AVIF", "avif", "image/avif"),
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+}
+DERIVATIVES_DIR = "products/derivatives"
+
+_executor = BackgroundExecutor(
+    "image-derivatives", "IMAGE_DERIVATIVE_WORKERS", database=True
+)
+
+
+def supported_formats() -> list[str]:
+    """Configured formats the installed Pillow can encode (AVIF needs a plugin)."""
+    try:
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        pass
+    available = set(Image.registered_extensions().values())
+    return [
+        name
+        for name in settings.IMAGE_DERIVATIVE_FORMATS
+        if name in FORMATS and FORMATS[name][0] in available
+    ]
+
+
+def target_widths(original_width: int, widths: tuple[int, ...]) -> list[int]:
+    """Configured widths that do not upscale; the original width as a fallback."""
+    fitting = sorted(w for w in widths if w <= original_width)
+    return fitting or [original_width]
+
+
+def config_digest(widths: tuple[int, ...], formats: list[str], quality: int) -> str:
+    """Digest of the settings a set of derivatives is rendered with."""
+    key = json.dumps([sorted(widths), list(formats), quality])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def derivative_hash(source: bytes, config: str) -> str:
+    digest = hashlib.sha256(source)
+    digest.update(config.encode())
+    return digest.hexdigest()[:16]
+
+
+def render_derivatives(
+    source: bytes, widths: tuple[int, ...], formats: list[str], quality: int
+) -> dict[str, Any]:
+    """
+    Encode ``source`` at every width and format.
+
+    Pure function of its arguments so it can run in a worker process. Returns the
+    source/settings hash, the settings digest and the size plus
+    ``{format: {width: encoded bytes}}``.
+    """
+    with Image.open(BytesIO(source)) as original:
+        original = ImageOps.exif_transpose(original)
+        width, height = original.size
+        has_alpha = original.mode in {"RGBA", "LA"} or (
+            original.mode == "P" and "transparency" in original.info
+        )
+        base = original.convert("RGBA" if has_alpha else "RGB")
+        outputs: dict[str, dict[int, bytes]] = {name: {} for name in formats}
+        for target in target_widths(width, widths):
+            resized = (
+                base
+                if target >= width
+                else base.resize(
+                    (target, max(1, round(height * target / width))),
+                    Image.Resampling.LANCZOS,
+                )
+            )
+            for name in formats:
+                pil_format = FORMATS[name][0]
+                frame = resized
+                if pil_format == "JPEG" and frame.mode != "RGB":
+                    frame = frame.convert("RGB")
+                buffer = BytesIO()
+                frame.save(buffer, format=pil_format, quality=quality)
+                outputs[name][target] = buffer.getvalue()
+    config = config_digest(widths, formats, quality)
+    return {
+        "hash": derivative_hash(source, config),
+        "config": config,
+        "width": width,
+        "height": height,
+        "files": outputs,
+    }
+
+
+def store_derivatives(rendered: dict[str, Any]) -> dict[str, Any]:
+    """Save rendered files under content-hashed names and return the manifest."""
+    files: dict[str, dict[str, str]] = {}
+    for name, by_width in rendered["files"].items():
+        extension = FORMATS[name][1]
+        files[name] = {}
+        for width, payload in by_width.items():
+            path = f"{DERIVATIVES_DIR}/{rendered['hash']}-{width}w.{extension}"
+            if not default_storage.exists(path):
+                path = default_storage.save(path, ContentFile(payload))
+            files[name][str(width)] = path
+    return {
+        "hash": rendered["hash"],
+        "config": rendered["config"],
+        "width": rendered["width"],
+        "height": rendered["height"],
+        "files": files,
+    }
+
+
+def generate_derivatives(image_id: int, *, force: bool = False) -> bool:
+    """Render and store derivatives for one image. Returns True when regenerated."""
+    image = ProductImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image:
+        return False
+    with image.image.open("rb") as handle:
+        source = handle.read()
+    widths = tuple(settings.IMAGE_DERIVATIVE_WIDTHS)
+    formats = supported_formats()
+    quality = settings.IMAGE_DERIVATIVE_QUALITY
+    source_hash = derivative_hash(source, config_digest(widths, formats, quality))
+    if not force and image.derivatives.get("hash") == source_hash:
+        return False
+    rendered = render_derivatives(source, widths, formats, quality)
+    manifest = store_derivatives(rendered)
+    ProductImage.objects.filter(pk=image_id).update(derivatives=manifest)
+    return True
+
+
+def _run_in_background(image_id: int) -> None:
+    try:
+        generate_derivatives(image_id)
+    except Exception:  # pragma: no cover - logged for the backfill command
+        logger.exception("Failed to build derivatives for product image %s", image_id)
+
+
+def _submit(image_id: int) -> None:
+    if not settings.IMAGE_DERIVATIVES_ASYNC:
+        _run_in_background(image_id)
+        return
+    _executor.submit(_run_in_background, image_id)
+
+
+def schedule_derivatives(image_id: int) -> None:
+    """Build derivatives off the request path once the current transaction commits."""
+    transaction.on_commit(partial(_submit, image_id))
+
+
+def build_sources(image: ProductImage, request=None) -> list[dict[str, str]]:
+    """``<picture>`` sources, best format first: ``[{type, srcset}]``."""
+    files = (image.derivatives or {}).get("files") or {}
+    sources = []
+    for name, (_, _, mime_type) in FORMATS.items():
+        by_width = files.get(name)
+        if not by_width:
+            continue
+        candidates = []
+        for width, path in sorted(by_width.items(), key=lambda item: int(item[0])):
+            url = default_storage.url(path)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            candidates.append(f"{url} {width}w")
+        sources.append({"type": mime_type, "srcset": ", ".join(candidates)})
+    return sources
+
+
+def derivative_url(image: ProductImage, width: int, fmt: str = "jpeg") -> str:
+    """URL of the smallest ``fmt`` derivative at least ``width`` wide, if any."""
+    by_width = ((image.derivatives or {}).get("files") or {}).get(fmt) or {}
+    if not by_width:
+        return ""
+    widths = sorted(int(value) for value in by_width)
+    chosen = next((value for value in widths if value >= width), widths[-1])
+    return default_storage.url(by_width[str(chosen)])
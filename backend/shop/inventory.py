@@ -0,0 +1,73 @@
+"""
+Set-based price/stock updates for warehouse feeds.
+
+``apply_price_stock_updates`` locks the affected rows with one
+``SELECT ... FOR UPDATE``, works out which SKUs actually change and writes them
+with a single ``UPDATE ... FROM (VALUES ...)`` statement per chunk, bypassing
+``Product.save()`` and its per-row Algolia signal. Changed products are reindexed
+in one batch after commit.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import navigation
+from .models import Product
+from .search import schedule_index_products
+
+UPDATE_CHUNK_SIZE = 1000
+
+
+@dataclass
+class StockUpdate:
+    sku: str
+    price: Decimal | None = None
+    stock: int | None = None
+
+
+def apply_price_stock_updates(updates: list[StockUpdate]) -> dict[str, str]:
+    """Apply ``updates`` in one transaction; returns ``{sku: status}``."""
+    by_sku = {update.sku: update for update in updates}
+    statuses = dict.fromkeys(by_sku, "not_found")
+    changed: list[tuple[int, Decimal, int]] = []
+    with transaction.atomic():
+        current = Product.objects.select_for_update().filter(sku__in=list(by_sku))
+        for pk, sku, price, stock in current.values_list("pk", "sku", "price", "stock"):
+            update = by_sku[sku]
+            new_price = price if update.price is None else update.price
+            new_stock = stock if update.stock is None else update.stock
+            if (new_price, new_stock) == (price, stock):
+                statuses[sku] = "unchanged"
+                continue
+            statuses[sku] = "updated"
+            changed.append((pk, new_price, new_stock))
+        for start in range(0, len(changed), UPDATE_CHUNK_SIZE):
+            _update_rows(changed[start : start + UPDATE_CHUNK_SIZE])
+        schedule_index_products(pk for pk, _, _ in changed)
+        if changed:
+            navigation.invalidate_on_commit()
+    return statuses
+
+
+def _update_rows(rows: list[tuple[int, Decimal, int]]) -> None:
+    quote = connection.ops.quote_name
+    table = quote(Product._meta.db_table)
+    ops = connection.ops
+    values = ", ".join("(%s, CAST(%s AS numeric), CAST(%s AS integer))" for _ in rows)
+    params: list = []
+    for pk, price, stock in rows:
+        params += [pk, ops.adapt_decimalfield_value(price, 10, 2), stock]
+    sql = (
+        f"WITH v(id, price, stock) AS (VALUES {values}) "
+        f"UPDATE {table} SET "
+        f"{quote('price')} = v.price, {quote('stock')} = v.stock, "
+        f"{quote('updated_at')} = %s "
+        f"FROM v WHERE {table}.{quote('id')} = v.id"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, ops.adapt_datetimefield_value(timezone.now())])
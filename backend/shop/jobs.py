@@ -0,0 +1,112 @@
+"""
+Admin actions over many rows as resumable background jobs.
+
+An ``AdminJob`` stores the selected primary keys, the model whose admin owns
+the action and the name of the admin's chunk method. ``manage.py
+run_admin_jobs`` polls the table, claims one job at a time and calls
+``<ModelAdmin>.<action>(pks, user=..., **params)`` on consecutive slices of
+``bulk_batch_size`` keys. Each slice commits together with the job's
+``processed`` counter, so a job resumes after its last finished slice when the
+worker is restarted, when a stalled job (no heartbeat for
+``ADMIN_JOB_STALE_AFTER`` seconds) is reclaimed, or when a failed job is
+retried from the admin. The database is the only queue; no broker is needed.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AdminJob
+from .signals import batched_side_effects
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(
+    model_admin, action: str, pks: list, *, user, description, params=None
+) -> AdminJob:
+    return AdminJob.objects.create(
+        model=model_admin.model._meta.label_lower,
+        action=action,
+        description=str(description),
+        params=params or {},
+        object_ids=pks,
+        total=len(pks),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim_job() -> AdminJob | None:
+    """Mark the oldest pending (or stalled) job as running and return it."""
+    stale = timezone.now() - timedelta(seconds=settings.ADMIN_JOB_STALE_AFTER)
+    with transaction.atomic():
+        job = (
+            AdminJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=AdminJob.Status.PENDING)
+                | Q(status=AdminJob.Status.RUNNING, heartbeat_at__lt=stale)
+            )
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        job.status = AdminJob.Status.RUNNING
+        job.started_at = job.started_at or now
+        job.heartbeat_at = now
+        job.save(update_fields=["status", "started_at", "heartbeat_at"])
+    return job
+
+
+def run_job(job: AdminJob) -> AdminJob:
+    """Process the remaining slices of a claimed job."""
+    try:
+        model_admin = admin.site.get_model_admin(apps.get_model(job.model))
+        method = getattr(model_admin, job.action)
+        size = model_admin.bulk_batch_size
+        while job.processed < job.total:
+            chunk = job.object_ids[job.processed : job.processed + size]
+            with transaction.atomic():
+                status = (
+                    AdminJob.objects.select_for_update()
+                    .values_list("status", flat=True)
+                    .get(pk=job.pk)
+                )
+                if status != AdminJob.Status.RUNNING:
+                    # Cancelled from the admin.
+                    job.status = status
+                    return job
+                with batched_side_effects():
+                    affected = method(chunk, user=job.created_by, **job.params)
+                job.processed += len(chunk)
+                job.affected += affected
+                job.heartbeat_at = timezone.now()
+                job.save(update_fields=["processed", "affected", "heartbeat_at"])
+    except Exception as exc:
+        logger.exception("Admin job %s failed", job.pk)
+        job.status = AdminJob.Status.FAILED
+        job.message = str(exc)
+    else:
+        job.status = AdminJob.Status.DONE
+        job.message = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "message", "finished_at"])
+    return job
+
+
+def run_pending() -> int:
+    """Run queued jobs until none is left; returns how many were run."""
+    count = 0
+    while (job := claim_job()) is not None:
+        run_job(job)
+        count += 1
+    return count
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...purchases import flag_reviews, refresh
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает купленные товары пользователей (PurchasedProduct) по "
+        "оплаченным заказам и отмечает отзывы покупателей как подтверждённые."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Пользователей или отзывов за один запрос.",
+        )
+        parser.add_argument(
+            "--skip-rebuild",
+            action="store_true",
+            help="Только отметить отзывы, не пересобирая покупки.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if not options["skip_rebuild"]:
+            changed = 0
+            user_ids = (
+                get_user_model()
+                .objects.order_by("pk")
+                .values_list("pk", flat=True)
+                .iterator(chunk_size=batch_size)
+            )
+            while chunk := list(islice(user_ids, batch_size)):
+                with transaction.atomic():
+                    changed += refresh(chunk)
+            self.stdout.write(f"Исправлено записей о покупках: {changed}")
+        flagged = flag_reviews(batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(f"Отмечено подтверждённых отзывов: {flagged}")
+        )
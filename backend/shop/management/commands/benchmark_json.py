@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.renderers import ORJSONRenderer
+
+from ...views import OrderViewSet, ProductViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает скорость JSONRenderer и ORJSONRenderer на данных "
+        "ProductViewSet.list и OrderViewSet.list."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=100,
+            help="Сколько объектов сериализовать в одном ответе.",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=50,
+            help="Сколько раз рендерить каждый ответ.",
+        )
+
+    def handle(self, *args, **options):
+        limit = max(options["limit"], 1)
+        iterations = max(options["iterations"], 1)
+        staff = get_user_model().objects.filter(is_staff=True).first()
+        if staff is None:
+            raise CommandError("Нужен хотя бы один staff-пользователь для заказов.")
+
+        for label, viewset in (("products", ProductViewSet), ("orders", OrderViewSet)):
+            data = self._list_payload(viewset, staff, limit)
+            self._compare(label, data, iterations)
+
+    def _list_payload(self, viewset, user, limit: int):
+        factory = APIRequestFactory()
+        django_request = factory.get("/")
+        force_authenticate(django_request, user=user)
+        view = viewset(
+            action_map={"get": "list"}, format_kwarg=None, args=(), kwargs={}
+        )
+        view.request = view.initialize_request(django_request)
+        queryset = view.filter_queryset(view.get_queryset())[:limit]
+        return view.get_serializer(queryset, many=True).data
+
+    def _compare(self, label: str, data, iterations: int) -> None:
+        results: dict[str, tuple[float, bytes]] = {}
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            output = renderer.render(data)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                renderer.render(data)
+            per_call = (time.perf_counter() - started) / iterations
+            results[type(renderer).__name__] = (per_call, output)
+
+        stdlib_time, stdlib_output = results["JSONRenderer"]
+        orjson_time, orjson_output = results["ORJSONRenderer"]
+        self.stdout.write(
+            f"{label}: {len(data)} objects, {len(stdlib_output)} bytes | "
+            f"json {stdlib_time * 1000:.2f} ms | orjson {orjson_time * 1000:.2f} ms | "
+            f"x{stdlib_time / orjson_time if orjson_time else 0:.1f}"
+        )
+        if stdlib_output == orjson_output:
+            self.stdout.write(self.style.SUCCESS(f"{label}: output is identical"))
+        else:
+            self.stdout.write(self.style.ERROR(f"{label}: output differs"))
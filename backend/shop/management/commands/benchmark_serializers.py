@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ...serializers import ProductSerializer
+from ...views import ProductViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет пропускную способность сериализации списка товаров "
+        "с кэшем плана полей и без него."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[100, 1000],
+            help="Размеры списков товаров для замера.",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="Сколько раз сериализовать каждый список.",
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(options["iterations"], 1)
+        request = Request(APIRequestFactory().get("/api/products/"))
+        queryset = ProductViewSet(request=request).get_queryset().order_by("pk")
+        for size in options["sizes"]:
+            products = list(queryset[:size])
+            if len(products) < size:
+                raise CommandError(
+                    f"В базе {len(products)} товаров, нужно {size}. "
+                    "Используйте load_demo_data --products."
+                )
+            results = {}
+            for enabled in (False, True):
+                with override_settings(SERIALIZER_FIELD_PLAN_CACHE=enabled):
+                    self._serialize(products, request)
+                    started = time.perf_counter()
+                    for _ in range(iterations):
+                        self._serialize(products, request)
+                    elapsed = (time.perf_counter() - started) / iterations
+                results[enabled] = elapsed
+            self.stdout.write(
+                f"{size} products | DRF {size / results[False]:.0f} obj/s | "
+                f"cached plan {size / results[True]:.0f} obj/s | "
+                f"x{results[False] / results[True]:.2f}"
+            )
+
+    def _serialize(self, products, request):
+        return ProductSerializer(products, many=True, context={"request": request}).data
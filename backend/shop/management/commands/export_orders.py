@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import Order, ProductImport
+from ...order_export import OrderFilterSerializer, export_lines, filter_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает заказы с позициями в CSV или JSONL потоково, "
+        "с фильтрами по дате, статусу, оплате и началу e-mail."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=ProductImport.Format.values,
+            default=ProductImport.Format.CSV,
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Файл для выгрузки или '-' для stdout.",
+        )
+        parser.add_argument(
+            "--date-from", help="Начало периода (ISO 8601), включительно."
+        )
+        parser.add_argument("--date-to", help="Конец периода (ISO 8601), включительно.")
+        parser.add_argument("--status", choices=Order.Status.values)
+        parser.add_argument("--payment-status", choices=Order.PaymentStatus.values)
+        parser.add_argument("--email", help="Начало e-mail покупателя.")
+        parser.add_argument(
+            "--include-archived",
+            action="store_true",
+            help="Включить заказы в архиве.",
+        )
+
+    def handle(self, *args, **options):
+        keys = ("date_from", "date_to", "status", "payment_status", "email")
+        filters = OrderFilterSerializer(
+            data={key: options[key] for key in keys if options[key] is not None}
+        )
+        if not filters.is_valid():
+            raise CommandError(filters.errors)
+        queryset = (
+            Order.all_objects.all()
+            if options["include_archived"]
+            else Order.objects.all()
+        )
+        queryset = filter_orders(queryset, **filters.validated_data)
+        lines = export_lines(options["format"], queryset)
+        if options["output"] == "-":
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as handle:
+            handle.writelines(lines)
+        self.stderr.write(self.style.SUCCESS(f"Выгружено в {options['output']}"))
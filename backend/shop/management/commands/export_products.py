@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from ...catalog_io import export_lines
+from ...models import Product, ProductImport
+
+
+class Command(BaseCommand):
+    help = "Выгружает товары в CSV или JSONL потоково, без загрузки каталога в память."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=ProductImport.Format.values,
+            default=ProductImport.Format.CSV,
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Файл для выгрузки или '-' для stdout.",
+        )
+        parser.add_argument(
+            "--include-archived",
+            action="store_true",
+            help="Включить товары в архиве.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = (
+            Product.all_objects.all()
+            if options["include_archived"]
+            else Product.objects.all()
+        )
+        lines = export_lines(options["format"], queryset)
+        if options["output"] == "-":
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as handle:
+            handle.writelines(lines)
+        self.stderr.write(self.style.SUCCESS(f"Выгружено в {options['output']}"))
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ...images import (
+    config_digest,
+    render_derivatives,
+    store_derivatives,
+    supported_formats,
+)
+from ...models import ProductImage
+
+
+class Command(BaseCommand):
+    help = "Генерирует адаптивные версии (AVIF/WebP/JPEG) для изображений товаров."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Количество процессов для обработки (по умолчанию по числу CPU).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help=(
+                "Пересоздать версии даже для изображений, обработанных "
+                "с текущими настройками."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        widths = tuple(settings.IMAGE_DERIVATIVE_WIDTHS)
+        formats = supported_formats()
+        quality = settings.IMAGE_DERIVATIVE_QUALITY
+        queryset = ProductImage.objects.exclude(image="").order_by("pk")
+        if not options["force"]:
+            # New images and images rendered with other widths, formats or quality.
+            config = config_digest(widths, formats, quality)
+            queryset = queryset.filter(
+                Q(derivatives__config__isnull=True) | ~Q(derivatives__config=config)
+            )
+
+        processed = failed = 0
+        started = time.perf_counter()
+        workers = options["workers"] or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            max_pending = workers * 2
+            pending = {}
+            for image in queryset.only("pk", "image").iterator(chunk_size=200):
+                try:
+                    with image.image.open("rb") as handle:
+                        source = handle.read()
+                except OSError as exc:
+                    failed += 1
+                    self.stderr.write(f"#{image.pk}: {exc}")
+                    continue
+                future = pool.submit(
+                    render_derivatives, source, widths, formats, quality
+                )
+                pending[future] = image.pk
+                if len(pending) >= max_pending:
+                    processed, failed = self._collect(pending, processed, failed)
+            while pending:
+                processed, failed = self._collect(pending, processed, failed)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обработано изображений: {processed}, ошибок: {failed}, "
+                f"форматы: {', '.join(formats)}, время: {elapsed:.1f} с"
+            )
+        )
+
+    def _collect(self, pending, processed: int, failed: int) -> tuple[int, int]:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            image_id = pending.pop(future)
+            try:
+                manifest = store_derivatives(future.result())
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"#{image_id}: {exc}")
+                continue
+            ProductImage.objects.filter(pk=image_id).update(derivatives=manifest)
+            processed += 1
+        return processed, failed
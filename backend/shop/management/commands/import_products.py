@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...catalog_io import import_products
+from ...models import ProductImport
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует товары из CSV или JSONL потоково: upsert по sku пачками, "
+        "slug и индексация Algolia — одним проходом в конце."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл с товарами или '-' для stdin.")
+        parser.add_argument(
+            "--format",
+            choices=ProductImport.Format.values,
+            help="Формат файла (по умолчанию по расширению).",
+        )
+        parser.add_argument(
+            "--errors",
+            help="Куда записать CSV-отчёт об ошибочных строках.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Сколько строк записывать за один bulk_create.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or (
+            ProductImport.Format.JSONL
+            if path.endswith((".jsonl", ".ndjson"))
+            else ProductImport.Format.CSV
+        )
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            try:
+                stream = (
+                    sys.stdin
+                    if path == "-"
+                    else stack.enter_context(
+                        open(path, encoding="utf-8-sig", newline="")
+                    )
+                )
+            except OSError as exc:
+                raise CommandError(f"Не удалось открыть {path}: {exc}") from exc
+            errors = (
+                stack.enter_context(
+                    open(options["errors"], "w", encoding="utf-8", newline="")
+                )
+                if options["errors"]
+                else None
+            )
+            result = import_products(
+                stream, fmt, error_stream=errors, chunk_size=options["chunk_size"]
+            )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано: {result.created}, обновлено: {result.updated}, "
+                f"ошибок: {result.failed} за {elapsed:.1f} с "
+                f"({result.processed / elapsed if elapsed else 0:.0f} строк/с)"
+            )
+        )
+        if result.failed and not options["errors"]:
+            self.stdout.write(
+                self.style.WARNING("Укажите --errors, чтобы получить отчёт по строкам.")
+            )
@@ -11,6 +11,7 @@ from django.db import transaction
 from django.utils.text import slugify
 from PIL import Image, ImageDraw, ImageFont
 
+from ...demo_data import BulkDemoGenerator, StageTiming
 from ...models import Cart, CartItem, Category, Order, OrderItem, Product, ProductImage
 
 
@@ -205,6 +206,50 @@ class Command(BaseCommand):
             default=len(PRODUCTS),
             help="Сколько товаров сгенерировать (по умолчанию базовый набор).",
         )
+        parser.add_argument(
+            "--fast",
+            action="store_true",
+            help=(
+                "Быстрый режим для нагрузочных тестов: bulk_create пачками, "
+                "одна картинка на цвет, без сигналов индексации."
+            ),
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=0,
+            help="Сколько покупателей создать (только --fast).",
+        )
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=0,
+            help="Сколько заказов создать (только --fast).",
+        )
+        parser.add_argument(
+            "--reviews-per-product",
+            type=float,
+            default=0.0,
+            help="Среднее число отзывов на товар (только --fast).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Размер пачки для bulk_create (только --fast).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Процессов для рендеринга картинок (только --fast).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Seed генератора случайных чисел для воспроизводимых данных.",
+        )
 
     @transaction.atomic
     def handle(self, *args, **options):
@@ -221,8 +266,13 @@ class Command(BaseCommand):
             Category.objects.all().delete()
 
         target_products = max(options.get("products") or len(PRODUCTS), 1)
+        if options["seed"] is not None:
+            random.seed(options["seed"])
         created_categories = self._create_categories()
         seeds = build_product_seeds(target_products)
+        if options["fast"]:
+            self._load_fast(created_categories, seeds, options)
+            return
         created_products = self._create_products(created_categories, seeds)
 
         self.stdout.write(
@@ -234,6 +284,40 @@ class Command(BaseCommand):
             "Теперь можно открыть главную страницу http://localhost:8000/ и увидеть витрину."
         )
 
+    def _load_fast(
+        self, categories: dict[str, Category], seeds: list[ProductSeed], options
+    ) -> None:
+        generator = BulkDemoGenerator(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            seed=options["seed"],
+            log=self._report_stage,
+        )
+        result = generator.run(
+            categories,
+            seeds,
+            users=options["users"],
+            orders=options["orders"],
+            reviews_per_product=options["reviews_per_product"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово! Строк: {result.rows} за {result.seconds:.1f} с "
+                f"({result.rows / result.seconds if result.seconds else 0:.0f} строк/с)"
+            )
+        )
+        self.stdout.write(
+            "Сигналы индексации были отключены: для поиска запустите "
+            "sync_algolia_products, для адаптивных картинок — "
+            "generate_image_derivatives."
+        )
+
+    def _report_stage(self, stage: StageTiming) -> None:
+        self.stdout.write(
+            f"{stage.name}: {stage.rows} строк за {stage.seconds:.2f} с "
+            f"({stage.rows_per_second:.0f} строк/с)"
+        )
+
     def _create_categories(self) -> dict[str, Category]:
         categories: dict[str, Category] = {}
         for name, description in CATEGORIES.items():
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...ratings import recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает счётчики оценок товаров (ProductRatingSummary) "
+        "по одобренным отзывам одним GROUP BY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--product",
+            type=int,
+            action="append",
+            dest="products",
+            help="ID товара; можно указать несколько раз. По умолчанию — все товары.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = recount(options["products"])
+        self.stdout.write(self.style.SUCCESS(f"Исправлено сводок оценок: {changed}"))
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...catalog_io import run_pending_imports
+from ...jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет фоновые задачи админки (AdminJob) порциями и импорты "
+        "товаров, опрашивая таблицы задач. Прерванные задачи продолжаются "
+        "с последней порции, прерванные импорты запускаются заново."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить задачи из очереди и завершиться.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.ADMIN_JOB_POLL_INTERVAL,
+            help="Пауза между опросами очереди, в секундах.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            count = run_pending() + run_pending_imports()
+            if count:
+                self.stdout.write(f"Выполнено задач: {count}")
+            if options["once"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0005_productreview_guest_comments"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productimage",
+            name="derivatives",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_summaries(apps, schema_editor):
+    ProductReview = apps.get_model("shop", "ProductReview")
+    ProductRatingSummary = apps.get_model("shop", "ProductRatingSummary")
+    rows = (
+        ProductReview.objects.filter(moderation_status="approved", deleted_at=None)
+        .order_by()
+        .values_list("product_id", "rating")
+        .annotate(count=models.Count("id"))
+    )
+    summaries = {}
+    for product_id, rating, count in rows.iterator():
+        summary = summaries.setdefault(
+            product_id, ProductRatingSummary(product_id=product_id)
+        )
+        setattr(summary, f"stars_{rating}", count)
+    ProductRatingSummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0007_productimport"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductRatingSummary",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating_summary",
+                        serialize=False,
+                        to="shop.product",
+                    ),
+                ),
+                ("stars_1", models.PositiveIntegerField(default=0)),
+                ("stars_2", models.PositiveIntegerField(default=0)),
+                ("stars_3", models.PositiveIntegerField(default=0)),
+                ("stars_4", models.PositiveIntegerField(default=0)),
+                ("stars_5", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Сводка оценок товара",
+                "verbose_name_plural": "Сводки оценок товаров",
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
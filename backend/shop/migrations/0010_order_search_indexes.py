@@ -0,0 +1,55 @@
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+EMAIL_INDEX_NAME = "shop_order_email_upper_idx"
+
+
+def _email_index(schema_editor):
+    expression = Upper("customer_email")
+    if schema_editor.connection.vendor == "postgresql":
+        from django.contrib.postgres.indexes import OpClass
+
+        # LIKE 'PREFIX%' can only use a btree index with pattern ops under a
+        # non-C collation.
+        expression = OpClass(expression, name="text_pattern_ops")
+    return models.Index(expression, name=EMAIL_INDEX_NAME)
+
+
+def add_email_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model("shop", "Order"), _email_index(schema_editor))
+
+
+def remove_email_index(apps, schema_editor):
+    schema_editor.remove_index(
+        apps.get_model("shop", "Order"), _email_index(schema_editor)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0009_adminjob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["placed_at"], name="shop_order_placed__5a6344_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "placed_at"], name="shop_order_status_31bd54_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["payment_status", "placed_at"],
+                name="shop_order_payment_1b5981_idx",
+            ),
+        ),
+        migrations.RunPython(add_email_index, remove_email_index),
+    ]
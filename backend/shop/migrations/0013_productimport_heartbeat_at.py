@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0012_category_parent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productimport",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def populate_purchases(apps, schema_editor):
+    OrderItem = apps.get_model("shop", "OrderItem")
+    ProductReview = apps.get_model("shop", "ProductReview")
+    PurchasedProduct = apps.get_model("shop", "PurchasedProduct")
+    rows = (
+        OrderItem.objects.filter(
+            order__user__isnull=False,
+            order__deleted_at=None,
+            order__status__in=("paid", "shipped", "completed"),
+            order__payment_status="paid",
+        )
+        .order_by()
+        .values_list("order__user_id", "product_id")
+        .distinct()
+    )
+    batch = []
+    for user_id, product_id in rows.iterator(chunk_size=1000):
+        batch.append(PurchasedProduct(user_id=user_id, product_id=product_id))
+        if len(batch) >= 1000:
+            PurchasedProduct.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    PurchasedProduct.objects.bulk_create(batch, ignore_conflicts=True)
+    # The base manager also reaches pending and archived reviews.
+    ProductReview._base_manager.filter(
+        models.Exists(
+            PurchasedProduct.objects.filter(
+                user_id=models.OuterRef("user_id"),
+                product_id=models.OuterRef("product_id"),
+            )
+        ),
+        verified_purchase=False,
+    ).update(verified_purchase=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0013_productimport_heartbeat_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_purchases, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,15 @@
 ﻿from __future__ import annotations
 
 from decimal import Decimal
+from functools import partial
 from uuid import uuid4
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.utils import timezone
-from django.utils.text import slugify
+
+from core.slugs import save_with_unique_slug
 
 
 class SoftDeleteQuerySet(models.QuerySet):
@@ -66,6 +69,13 @@ class SoftDeleteModel(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=255, unique=True)
     slug = models.SlugField(max_length=255, unique=True, blank=True, allow_unicode=True)
+    parent = models.ForeignKey(
+        "self",
+        related_name="children",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+    )
     description = models.TextField(blank=True)
     meta_title = models.CharField(max_length=255, blank=True)
     meta_description = models.CharField(max_length=500, blank=True)
@@ -78,15 +88,31 @@ class Category(models.Model):
         verbose_name = "РљР°С‚РµРіРѕСЂРёСЏ"
         verbose_name_plural = "РљР°С‚РµРіРѕСЂРёРё"
 
+    def clean(self):
+        ancestor_id, seen = self.parent_id, set()
+        while ancestor_id is not None and ancestor_id not in seen:
+            seen.add(ancestor_id)
+            if self.pk is not None and ancestor_id == self.pk:
+                raise ValidationError(
+                    {"parent": "A category cannot be nested inside itself."}
+                )
+            ancestor_id = (
+                Category.objects.filter(pk=ancestor_id)
+                .values_list("parent_id", flat=True)
+                .first()
+            )
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            raw_slug = slugify(self.name, allow_unicode=True)
-            self.slug = raw_slug or f"category-{uuid4().hex[:8]}"
         if not self.meta_title:
             self.meta_title = self.name
         if not self.meta_description and self.description:
             self.meta_description = self.description[:500]
-        super().save(*args, **kwargs)
+        save_with_unique_slug(
+            self,
+            partial(super().save, *args, **kwargs),
+            source=self.name,
+            fallback="category",
+        )
 
     def __str__(self) -> str:
         return self.name
@@ -119,22 +145,17 @@ class Product(SoftDeleteModel):
         verbose_name_plural = "РўРѕРІР°СЂС‹"
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = (
-                slugify(self.name, allow_unicode=True) or f"product-{uuid4().hex[:8]}"
-            )
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                counter += 1
-                slug = f"{base_slug}-{counter}"
-            self.slug = slug
         if not self.meta_title:
             self.meta_title = self.name
         if not self.meta_description:
             candidates = [self.short_description, self.description]
             self.meta_description = next((c[:500] for c in candidates if c), "")
-        super().save(*args, **kwargs)
+        save_with_unique_slug(
+            self,
+            partial(super().save, *args, **kwargs),
+            source=self.name,
+            fallback="product",
+        )
 
     def __str__(self) -> str:
         return self.name
@@ -149,6 +170,7 @@ class ProductImage(models.Model):
     image = models.ImageField(upload_to="products/")
     alt_text = models.CharField(max_length=255, blank=True)
     is_main = models.BooleanField(default=False)
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -268,8 +290,22 @@ class Order(SoftDeleteModel):
     placed_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored values, so ``shop.purchases`` can tell what a save changed.
+        instance._loaded_values = dict(zip(field_names, values, strict=True))
+        return instance
+
     class Meta:
         ordering = ("-placed_at",)
+        # Staff search/export filters (shop/order_export.py); the e-mail prefix
+        # index is an expression index created by migration 0010.
+        indexes = [
+            models.Index(fields=("placed_at",)),
+            models.Index(fields=("status", "placed_at")),
+            models.Index(fields=("payment_status", "placed_at")),
+        ]
         verbose_name = "Р—Р°РєР°Р·"
         verbose_name_plural = "Р—Р°РєР°Р·С‹"
 
@@ -412,6 +448,13 @@ class ProductReview(SoftDeleteModel):
     objects = ProductReviewManager()
     all_objects = ProductReviewQuerySet.as_manager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored values, so the rating counters can tell what a save changed.
+        instance._loaded_values = dict(zip(field_names, values, strict=True))
+        return instance
+
     class Meta:
         ordering = ("-created_at",)
         constraints = [
@@ -435,6 +478,12 @@ class ProductReview(SoftDeleteModel):
             name = (self.author_name or "").strip() or "Anonymous"
         return f"{self.product} review by {name}"
 
+    def save(self, *args, **kwargs):
+        # ``shop.ratings`` updates the per-star counters from post_save; the
+        # atomic block keeps the review and its counters consistent.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def mark_moderated(self, *, status: str, moderator, note: str = "") -> None:
         if status not in self.ModerationStatus.values:
             raise ValueError("Unknown moderation status")
@@ -451,3 +500,163 @@ class ProductReview(SoftDeleteModel):
                 "updated_at",
             ]
         )
+
+
+class ProductRatingSummary(models.Model):
+    """Approved, non-deleted reviews of a product per star (see ``shop.ratings``)."""
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        related_name="rating_summary",
+        on_delete=models.CASCADE,
+    )
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Сводка оценок товара"
+        verbose_name_plural = "Сводки оценок товаров"
+
+    def __str__(self) -> str:
+        return f"Ratings of product #{self.product_id}"
+
+    @property
+    def histogram(self) -> dict[int, int]:
+        return {star: getattr(self, f"stars_{star}") for star in range(1, 6)}
+
+    @property
+    def count(self) -> int:
+        return sum(self.histogram.values())
+
+    @property
+    def average(self) -> float | None:
+        count = self.count
+        if not count:
+            return None
+        total = sum(star * n for star, n in self.histogram.items())
+        return round(total / count, 2)
+
+
+class PurchasedProduct(models.Model):
+    """A product the user has a paid, non-archived order for (see ``shop.purchases``)."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="purchased_products",
+        on_delete=models.CASCADE,
+    )
+    product = models.ForeignKey(
+        Product,
+        related_name="purchases",
+        on_delete=models.CASCADE,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "product"), name="unique_purchased_product"
+            ),
+        ]
+        verbose_name = "Купленный товар"
+        verbose_name_plural = "Купленные товары"
+
+    def __str__(self) -> str:
+        return f"Product #{self.product_id} bought by user #{self.user_id}"
+
+
+class ProductImport(models.Model):
+    class Format(models.TextChoices):
+        CSV = "csv", "CSV"
+        JSONL = "jsonl", "JSON Lines"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    source = models.FileField(upload_to="imports/")
+    format = models.CharField(max_length=10, choices=Format.choices, default=Format.CSV)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    rows_created = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    error_report = models.FileField(upload_to="imports/reports/", blank=True)
+    message = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="product_imports",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        verbose_name = "Импорт товаров"
+        verbose_name_plural = "Импорты товаров"
+
+    def __str__(self) -> str:
+        return f"Import #{self.pk} ({self.get_status_display()})"
+
+
+class AdminJob(models.Model):
+    """An admin action over many rows, run by ``manage.py run_admin_jobs``."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+        CANCELLED = "cancelled", "Отменено"
+
+    model = models.CharField(max_length=100)
+    action = models.CharField(max_length=100)
+    description = models.CharField(max_length=255)
+    params = models.JSONField(default=dict, blank=True)
+    object_ids = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    affected = models.PositiveIntegerField(default=0)
+    message = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="admin_jobs",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [models.Index(fields=("status", "created_at"))]
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+
+    def __str__(self) -> str:
+        return f"Job #{self.pk}: {self.description} ({self.get_status_display()})"
+
+    @property
+    def progress(self) -> int:
+        """Processed share of the selected rows, in percent."""
+        if not self.total:
+            return 100 if self.status == self.Status.DONE else 0
+        return self.processed * 100 // self.total
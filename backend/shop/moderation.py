@@ -0,0 +1,53 @@
+"""
+Set-based review moderation for ``POST /api/reviews/bulk-moderate/`` and the
+admin approve/reject actions.
+
+``moderate_reviews`` writes the new status with a single ``UPDATE`` (which,
+unlike ``save()``, has to set ``updated_at`` itself) and then refreshes what
+depends on review moderation once for all affected products: the per-star
+rating counters and the cached public review feed. Search records carry no
+review data, so moderation does not reindex products.
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from . import ratings, review_feed
+from .models import ProductReview
+
+
+def moderate_reviews(
+    reviews: QuerySet[ProductReview],
+    *,
+    status: str,
+    moderator,
+    note: str | None = None,
+) -> dict[int, int]:
+    """
+    Moderate every review in ``reviews``; returns ``{review_id: product_id}``.
+
+    ``note=None`` keeps the existing moderation notes.
+    """
+    if status not in ProductReview.ModerationStatus.values:
+        raise ValueError("Unknown moderation status")
+    now = timezone.now()
+    with transaction.atomic():
+        moderated = dict(reviews.order_by().values_list("id", "product_id"))
+        if not moderated:
+            return moderated
+        changes = {
+            "moderation_status": status,
+            "moderated_by": moderator,
+            "moderated_at": now,
+            "updated_at": now,
+        }
+        if note is not None:
+            changes["moderation_note"] = note
+        ProductReview.all_objects.filter(pk__in=list(moderated)).update(**changes)
+        product_ids = set(moderated.values())
+        ratings.recount(product_ids)
+        review_feed.invalidate_on_commit(product_ids)
+    return moderated
@@ -0,0 +1,114 @@
+"""
+Cached category navigation behind ``GET /api/categories/navigation/``.
+
+``build`` reads every active category with the count and price range of its
+active, in-stock products in one aggregate query and assembles the tree in
+memory from ``parent`` ids, so nesting never costs extra queries. Counts and
+price ranges of a category include its subcategories; categories below an
+inactive parent are hidden. The tree is cached under ``categories:navigation``
+for ``CATEGORY_NAVIGATION_CACHE_TIMEOUT`` and dropped after any product or
+category change commits (receivers in ``shop.signals``; set-based paths call
+``invalidate_on_commit`` themselves).
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from rest_framework import serializers
+
+from .models import Category
+
+CACHE_KEY = "categories:navigation"
+NODE_FIELDS = ("id", "name", "slug", "parent", "product_count")
+# Formats prices the way ``ProductSerializer`` does (SQLite drops the scale).
+PRICE = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+def _pick(first: Decimal | None, second: Decimal | None, choose) -> Decimal | None:
+    if first is None or second is None:
+        return first if second is None else second
+    return choose(first, second)
+
+
+def _walk(roots: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Nodes with every parent before its children."""
+    ordered: list[dict[str, Any]] = []
+    stack = list(reversed(roots))
+    while stack:
+        node = stack.pop()
+        ordered.append(node)
+        stack.extend(reversed(node["children"]))
+    return ordered
+
+
+def build() -> list[dict[str, Any]]:
+    listed = Q(
+        products__is_active=True,
+        products__deleted_at__isnull=True,
+        products__stock__gt=0,
+    )
+    rows = (
+        Category.objects.filter(is_active=True)
+        .annotate(
+            product_count=Count("products", filter=listed),
+            min_price=Min("products__price", filter=listed),
+            max_price=Max("products__price", filter=listed),
+        )
+        .order_by("name")
+        .values(*NODE_FIELDS, "min_price", "max_price")
+    )
+    nodes = {row["id"]: {**row, "children": []} for row in rows}
+    roots = []
+    for node in nodes.values():
+        if node["parent"] is None:
+            roots.append(node)
+        elif node["parent"] in nodes:
+            nodes[node["parent"]]["children"].append(node)
+
+    ordered = _walk(roots)
+    for node in reversed(ordered):
+        for child in node["children"]:
+            node["product_count"] += child["product_count"]
+            node["min_price"] = _pick(node["min_price"], child["min_price"], min)
+            node["max_price"] = _pick(node["max_price"], child["max_price"], max)
+    for node in ordered:
+        for field in ("min_price", "max_price"):
+            if node[field] is not None:
+                node[field] = PRICE.to_representation(node[field])
+    return roots
+
+
+def get_tree() -> list[dict[str, Any]]:
+    tree = cache.get(CACHE_KEY)
+    if tree is None:
+        tree = build()
+        cache.set(CACHE_KEY, tree, settings.CATEGORY_NAVIGATION_CACHE_TIMEOUT)
+    return tree
+
+
+def invalidate() -> None:
+    cache.delete(CACHE_KEY)
+
+
+def invalidate_on_commit() -> None:
+    transaction.on_commit(invalidate)
+
+
+def category_ids(value: str) -> list[int] | None:
+    """
+    Ids of the active category with slug (or else id) ``value`` and of its
+    subcategories; ``None`` if no active category matches.
+    """
+    ordered = _walk(get_tree())
+    node = next((node for node in ordered if node["slug"] == value), None)
+    if node is None and value.isdigit():
+        node = next((node for node in ordered if node["id"] == int(value)), None)
+    if node is None:
+        return None
+    return [descendant["id"] for descendant in _walk([node])]
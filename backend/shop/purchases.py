@@ -0,0 +1,214 @@
+"""
+Verified-purchase lookups.
+
+``PurchasedProduct`` holds one row per (user, product) the user has a qualifying
+order for: status paid/shipped/completed, payment paid, not archived. Reviews
+check it instead of joining ``OrderItem`` and ``Order``. Each user's product ids
+are cached under ``purchases:user:<id>`` for ``VERIFIED_PURCHASE_CACHE_TIMEOUT``.
+
+``order_saved`` / ``order_deleted`` / ``order_item_changed`` (receivers in
+``shop.signals``) call ``refresh`` for the affected users when an order starts
+or stops qualifying. ``refresh`` recomputes those users' rows from their orders
+with one query, applies the difference, and drops their cache entries once the
+transaction commits. Set-based order changes add their users to
+``SideEffects.purchasers``. Migration ``0014_backfill_purchased_products``
+fills the table from existing orders; ``manage.py backfill_verified_purchases``
+rebuilds every user in chunks and re-flags historical reviews.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from functools import partial
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from . import review_feed
+from .models import Order, OrderItem, ProductReview, PurchasedProduct
+
+QUALIFYING_STATUSES = (
+    Order.Status.PAID,
+    Order.Status.SHIPPED,
+    Order.Status.COMPLETED,
+)
+QUALIFYING_PAYMENTS = (Order.PaymentStatus.PAID,)
+TRACKED_FIELDS = ("user_id", "status", "payment_status", "deleted_at")
+
+
+def _cache_key(user_id: int) -> str:
+    return f"purchases:user:{user_id}"
+
+
+def qualifies(values: Mapping[str, Any]) -> bool:
+    return (
+        values["user_id"] is not None
+        and values["deleted_at"] is None
+        and values["status"] in QUALIFYING_STATUSES
+        and values["payment_status"] in QUALIFYING_PAYMENTS
+    )
+
+
+def invalidate(user_ids: Iterable[int]) -> None:
+    cache.delete_many([_cache_key(user_id) for user_id in set(user_ids)])
+
+
+def refresh(user_ids: Iterable[int]) -> int:
+    """
+    Recompute ``PurchasedProduct`` rows of ``user_ids`` from their orders.
+
+    Returns the number of rows added or removed.
+    """
+    user_ids = set(user_ids) - {None}
+    if not user_ids:
+        return 0
+    bought = OrderItem.objects.filter(
+        order__user_id__in=user_ids,
+        order__deleted_at__isnull=True,
+        order__status__in=QUALIFYING_STATUSES,
+        order__payment_status__in=QUALIFYING_PAYMENTS,
+    ).order_by()
+    wanted = set(bought.values_list("order__user_id", "product_id").distinct())
+    current = set(
+        PurchasedProduct.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", "product_id"
+        )
+    )
+    added = wanted - current
+    removed: dict[int, list[int]] = defaultdict(list)
+    for user_id, product_id in current - wanted:
+        removed[user_id].append(product_id)
+
+    if added:
+        PurchasedProduct.objects.bulk_create(
+            [
+                PurchasedProduct(user_id=user_id, product_id=product_id)
+                for user_id, product_id in added
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    if removed:
+        PurchasedProduct.objects.filter(
+            Q.create(
+                [
+                    Q(user_id=user_id, product_id__in=product_ids)
+                    for user_id, product_ids in removed.items()
+                ],
+                connector=Q.OR,
+            )
+        ).delete()
+    # Also after a no-op: a reader may have cached the state mid-transaction.
+    transaction.on_commit(partial(invalidate, user_ids))
+    return len(added) + sum(map(len, removed.values()))
+
+
+def purchased_product_ids(user_ids: Iterable[int]) -> dict[int, frozenset[int]]:
+    """Product ids bought by each user; one query for all users not yet cached."""
+    user_ids = set(user_ids)
+    keys = {_cache_key(user_id): user_id for user_id in user_ids}
+    found = {
+        keys[key]: frozenset(product_ids)
+        for key, product_ids in cache.get_many(keys).items()
+    }
+    missing = user_ids - found.keys()
+    if missing:
+        loaded: dict[int, set[int]] = {user_id: set() for user_id in missing}
+        rows = PurchasedProduct.objects.filter(user_id__in=missing).values_list(
+            "user_id", "product_id"
+        )
+        for user_id, product_id in rows:
+            loaded[user_id].add(product_id)
+        cache.set_many(
+            {
+                _cache_key(user_id): sorted(product_ids)
+                for user_id, product_ids in loaded.items()
+            },
+            settings.VERIFIED_PURCHASE_CACHE_TIMEOUT,
+        )
+        found.update(
+            (user_id, frozenset(product_ids)) for user_id, product_ids in loaded.items()
+        )
+    return found
+
+
+def verified_purchases(
+    pairs: Iterable[tuple[int, int]],
+) -> set[tuple[int, int]]:
+    """The ``(user_id, product_id)`` pairs backed by a qualifying order."""
+    pairs = {(user_id, product_id) for user_id, product_id in pairs if user_id}
+    bought = purchased_product_ids(user_id for user_id, _ in pairs)
+    return {
+        (user_id, product_id)
+        for user_id, product_id in pairs
+        if product_id in bought[user_id]
+    }
+
+
+def _previous_users(order: Order, created: bool) -> set[int] | None:
+    """Users the order counted for before this save; ``None`` if unknown."""
+    if created:
+        return set()
+    loaded = getattr(order, "_loaded_values", None) or {}
+    if not all(field in loaded for field in TRACKED_FIELDS):
+        return None
+    return {loaded["user_id"]} if qualifies(loaded) else set()
+
+
+def order_saved(order: Order, created: bool) -> set[int]:
+    """Users whose purchases this save may have changed."""
+    previous = _previous_users(order, created)
+    current = {field: getattr(order, field) for field in TRACKED_FIELDS}
+    order._loaded_values = {**getattr(order, "_loaded_values", {}), **current}
+    now = {order.user_id} if qualifies(current) else set()
+    if previous is None:
+        return {order.user_id} - {None}
+    return previous ^ now
+
+
+def order_deleted(order: Order) -> set[int]:
+    return {order.user_id} - {None}
+
+
+def order_item_changed(item: OrderItem) -> set[int]:
+    """The order's user if the order qualifies (items of other orders never count)."""
+    if OrderItem.order.is_cached(item):
+        values = {field: getattr(item.order, field) for field in TRACKED_FIELDS}
+    else:
+        values = (
+            Order.all_objects.filter(pk=item.order_id).values(*TRACKED_FIELDS).first()
+        )
+    return {values["user_id"]} if values and qualifies(values) else set()
+
+
+def flag_reviews(batch_size: int = 1000) -> int:
+    """Mark unflagged reviews whose author bought the product; returns the count."""
+    flagged = 0
+    last_pk = 0
+    reviews = (
+        ProductReview.all_objects.filter(verified_purchase=False, user__isnull=False)
+        .order_by("pk")
+        .values_list("pk", "user_id", "product_id")
+    )
+    while chunk := list(reviews.filter(pk__gt=last_pk)[:batch_size]):
+        last_pk = chunk[-1][0]
+        verified = verified_purchases(
+            (user_id, product_id) for _, user_id, product_id in chunk
+        )
+        matched = [
+            (pk, product_id)
+            for pk, user_id, product_id in chunk
+            if (user_id, product_id) in verified
+        ]
+        if not matched:
+            continue
+        with transaction.atomic():
+            flagged += ProductReview.all_objects.filter(
+                pk__in=[pk for pk, _ in matched]
+            ).update(verified_purchase=True)
+            review_feed.invalidate_on_commit(product_id for _, product_id in matched)
+    return flagged
@@ -0,0 +1,159 @@
+"""
+Per-star review counters behind ``GET /api/products/<slug>/reviews/summary/``.
+
+A review counts toward ``ProductRatingSummary`` while it is approved and not
+deleted. ``review_saved`` / ``review_deleted`` (post_save / post_delete
+receivers) compare what a review counted as when it was loaded with what it
+counts as now and apply the difference with ``F()`` updates, inside the
+transaction that saved the review. Set-based changes that bypass signals
+(queryset ``update()``, ``bulk_create``) call ``recount`` for the affected
+products; ``manage.py recount_review_ratings`` runs it for the whole catalog
+with a single ``GROUP BY``.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ProductRatingSummary, ProductReview
+
+STARS = range(1, 6)
+STAR_FIELDS = [f"stars_{star}" for star in STARS]
+COUNTED_FIELDS = ("product_id", "rating", "moderation_status", "deleted_at")
+
+
+def _contribution(values: Mapping[str, Any]) -> tuple[int, int] | None:
+    if (
+        values["moderation_status"] != ProductReview.ModerationStatus.APPROVED
+        or values["deleted_at"] is not None
+    ):
+        return None
+    return values["product_id"], values["rating"]
+
+
+def _stored_values(
+    review: ProductReview, loaded: Mapping[str, Any], update_fields
+) -> dict[str, Any]:
+    """Counted fields as written by this save (unsaved edits are ignored)."""
+    values = {}
+    for field in COUNTED_FIELDS:
+        saved = update_fields is None or {field, field.removesuffix("_id")} & set(
+            update_fields
+        )
+        values[field] = loaded[field] if not saved else getattr(review, field)
+    return values
+
+
+def apply_deltas(deltas: Mapping[tuple[int, int], int]) -> None:
+    """Add ``{(product_id, star): delta}`` to the counters."""
+    by_product: dict[int, dict[int, int]] = defaultdict(dict)
+    for (product_id, star), delta in deltas.items():
+        if delta:
+            by_product[product_id][star] = delta
+    growing = [
+        ProductRatingSummary(product_id=product_id)
+        for product_id, stars in by_product.items()
+        if any(delta > 0 for delta in stars.values())
+    ]
+    if growing:
+        ProductRatingSummary.objects.bulk_create(growing, ignore_conflicts=True)
+    now = timezone.now()
+    for product_id, stars in by_product.items():
+        changes = {
+            f"stars_{star}": (
+                F(f"stars_{star}") + delta
+                if delta > 0
+                # Never below zero, even if the counters have drifted.
+                else Greatest(F(f"stars_{star}") + delta, 0)
+            )
+            for star, delta in stars.items()
+        }
+        ProductRatingSummary.objects.filter(product_id=product_id).update(
+            **changes, updated_at=now
+        )
+
+
+def recount(product_ids: Iterable[int] | None = None) -> int:
+    """
+    Recompute counters from the reviews with one ``GROUP BY``.
+
+    Limited to ``product_ids`` when given. Returns the number of products whose
+    counters changed.
+    """
+    reviews = ProductReview.objects.order_by()
+    summaries = ProductRatingSummary.objects.all()
+    if product_ids is not None:
+        product_ids = set(product_ids)
+        reviews = reviews.filter(product_id__in=product_ids)
+        summaries = summaries.filter(product_id__in=product_ids)
+
+    counts: dict[int, list[int]] = defaultdict(lambda: [0] * len(STARS))
+    rows = reviews.values_list("product_id", "rating").annotate(total=Count("id"))
+    for product_id, rating, total in rows.iterator():
+        counts[product_id][rating - 1] = total
+    current = {
+        row[0]: list(row[1:])
+        for row in summaries.values_list("product_id", *STAR_FIELDS).iterator()
+    }
+
+    changed = [
+        ProductRatingSummary(
+            product_id=product_id, **dict(zip(STAR_FIELDS, stars, strict=True))
+        )
+        for product_id, stars in counts.items()
+        if current.get(product_id) != stars
+    ]
+    stale = [
+        product_id
+        for product_id, stars in current.items()
+        if product_id not in counts and any(stars)
+    ]
+    if changed:
+        ProductRatingSummary.objects.bulk_create(
+            changed,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["product"],
+            update_fields=[*STAR_FIELDS, "updated_at"],
+        )
+    if stale:
+        ProductRatingSummary.objects.filter(product_id__in=stale).update(
+            **dict.fromkeys(STAR_FIELDS, 0), updated_at=timezone.now()
+        )
+    return len(changed) + len(stale)
+
+
+def review_saved(review: ProductReview, created: bool, update_fields=None) -> None:
+    loaded = getattr(review, "_loaded_values", None) or {}
+    if not created and not all(field in loaded for field in COUNTED_FIELDS):
+        # Loaded with deferred fields: the previous state is unknown.
+        recount({review.product_id, loaded.get("product_id")} - {None})
+        return
+    stored = _stored_values(review, loaded, update_fields)
+    old = None if created else _contribution(loaded)
+    new = _contribution(stored)
+    review._loaded_values = {**loaded, **stored}
+    if old == new:
+        return
+    deltas: Counter[tuple[int, int]] = Counter()
+    if old is not None:
+        deltas[old] -= 1
+    if new is not None:
+        deltas[new] += 1
+    apply_deltas(deltas)
+
+
+def review_deleted(review: ProductReview) -> None:
+    loaded = getattr(review, "_loaded_values", None) or {}
+    if not all(field in loaded for field in COUNTED_FIELDS):
+        recount([review.product_id])
+        return
+    old = _contribution(loaded)
+    if old is not None:
+        apply_deltas({old: -1})
@@ -0,0 +1,94 @@
+"""
+Cached pages of the public (anonymous) per-product review feed.
+
+``GET /api/reviews/?product=<id>`` or ``?product_slug=<slug>`` with an optional
+``page`` returns the same approved reviews to every anonymous visitor, so the
+serialized page is cached under ``reviews:feed:<product>:<version>:<page>``.
+Each product has a version token; ``invalidate`` replaces it, which orphans all
+cached pages of that product at once (they expire after
+``REVIEW_FEED_CACHE_TIMEOUT``). Pages embed the product name and slug and the
+authors' names, so renaming a product or a reviewer invalidates them too. Pagination links are rebuilt per request, so
+cached pages do not depend on the host or scheme a client used.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+FEED_PARAMS = {"product", "product_slug", "page"}
+
+
+def _version_key(product_id: int) -> str:
+    return f"reviews:feed:{product_id}:version"
+
+
+def _version(product_id: int) -> str:
+    key = _version_key(product_id)
+    version = cache.get(key)
+    if version is None:
+        version = str(time.time_ns())
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def page_key(product_id: int, page: int) -> str:
+    return f"reviews:feed:{product_id}:{_version(product_id)}:{page}"
+
+
+def invalidate(product_ids: Iterable[int]) -> None:
+    version = str(time.time_ns())
+    cache.set_many({_version_key(pk): version for pk in set(product_ids)}, timeout=None)
+
+
+def invalidate_on_commit(product_ids: Iterable[int]) -> None:
+    """
+    Invalidate once the current transaction commits (immediately outside one).
+
+    Invalidating earlier would let a concurrent reader cache the old page again.
+    """
+    transaction.on_commit(partial(invalidate, set(product_ids)))
+
+
+def get_page(key: str) -> dict | None:
+    return cache.get(key)
+
+
+def store_page(key: str, count: int, results: list) -> None:
+    cache.set(
+        key,
+        {"count": count, "results": results},
+        settings.REVIEW_FEED_CACHE_TIMEOUT,
+    )
+
+
+def paginated(request, page: int, page_size: int, cached: dict) -> OrderedDict:
+    """``PageNumberPagination`` payload for a cached page."""
+    url = request.build_absolute_uri()
+    next_link = (
+        replace_query_param(url, "page", page + 1)
+        if page * page_size < cached["count"]
+        else None
+    )
+    if page == 1:
+        previous_link = None
+    elif page == 2:
+        previous_link = remove_query_param(url, "page")
+    else:
+        previous_link = replace_query_param(url, "page", page - 1)
+    return OrderedDict(
+        [
+            ("count", cached["count"]),
+            ("next", next_link),
+            ("previous", previous_link),
+            ("results", cached["results"]),
+        ]
+    )
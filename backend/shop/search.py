@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import logging
+from functools import partial
 from typing import Any
 
 from algoliasearch.search_client import SearchClient
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
+from core.executors import BackgroundExecutor
+
+from .images import derivative_url
 from .models import Product
 
+CARD_IMAGE_WIDTH = 640
+
+logger = logging.getLogger(__name__)
+
 _client = None
 _index = None
+_executor = BackgroundExecutor("algolia", database=True)
 
 
 def get_index():
@@ -27,7 +38,11 @@ def get_index():
 
 def serialize_product(product: Product) -> dict[str, Any]:
     main_image = product.images.filter(is_main=True).first() or product.images.first()
-    image_url = main_image.image.url if main_image else ""
+    image_url = ""
+    if main_image:
+        image_url = (
+            derivative_url(main_image, CARD_IMAGE_WIDTH, "webp") or main_image.image.url
+        )
     return {
         "objectID": str(product.id),
         "name": product.name,
@@ -80,6 +95,54 @@ def remove_product(product_id: int) -> None:
     index.delete_object(str(product_id))
 
 
+def index_products(product_ids, batch_size: int = 500) -> None:
+    """Push many products in batched ``save_objects``/``delete_objects`` calls."""
+    if not settings.ALGOLIA_ENABLED:
+        return
+    index = get_index()
+    if not index:
+        return
+    product_ids = list(product_ids)
+    for start in range(0, len(product_ids), batch_size):
+        chunk = product_ids[start : start + batch_size]
+        products = (
+            Product.objects.select_related("category")
+            .prefetch_related("images")
+            .filter(pk__in=chunk)
+        )
+        records = [serialize_product(p) for p in products if p.is_active]
+        indexed = {int(record["objectID"]) for record in records}
+        if records:
+            index.save_objects(records)
+        removed = [str(pk) for pk in chunk if pk not in indexed]
+        if removed:
+            index.delete_objects(removed)
+
+
+def _index_in_background(product_ids: list[int]) -> None:
+    try:
+        index_products(product_ids)
+    except Exception:  # pragma: no cover - network errors are logged only
+        logger.exception(
+            "Batched Algolia reindex of %d products failed", len(product_ids)
+        )
+
+
+def _submit(product_ids: list[int]) -> None:
+    _executor.submit(_index_in_background, product_ids)
+
+
+def schedule_index_products(product_ids) -> None:
+    """Reindex ``product_ids`` in one background batch after the transaction commits."""
+    if not settings.ALGOLIA_ENABLED:
+        return
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+
+    transaction.on_commit(partial(_submit, product_ids))
+
+
 def sync_all_products(clear_index: bool = False) -> None:
     if not settings.ALGOLIA_ENABLED:
         return
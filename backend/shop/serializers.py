@@ -2,10 +2,18 @@ from __future__ import annotations
 
 from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from django.utils.text import slugify
 from rest_framework import serializers
 
+from accounts.utils import get_user_by_email
+from core.serializers import CachedFieldsModelSerializer
+from core.slugs import allocate_suffixed
+
+from .images import build_sources, derivative_url
 from .models import (
     Cart,
     CartItem,
@@ -17,23 +25,34 @@ from .models import (
     ProductReview,
 )
 
+# Attempts at creating a guest account before a username race is reported.
+USERNAME_ATTEMPTS = 3
+# Width of the product picture shown next to an order in the order list.
+ORDER_THUMBNAIL_WIDTH = 320
+
 User = get_user_model()
 
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class ProductImageSerializer(CachedFieldsModelSerializer):
+    sources = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = ("id", "image", "alt_text", "is_main")
-        read_only_fields = ("id",)
+        fields = ("id", "image", "alt_text", "is_main", "sources")
+        read_only_fields = ("id", "sources")
 
+    def get_sources(self, obj: ProductImage) -> list[dict[str, str]]:
+        return build_sources(obj, self.context.get("request"))
 
-class CategorySerializer(serializers.ModelSerializer):
+
+class CategorySerializer(CachedFieldsModelSerializer):
     class Meta:
         model = Category
         fields = (
             "id",
             "name",
             "slug",
+            "parent",
             "description",
             "meta_title",
             "meta_description",
@@ -43,8 +62,16 @@ class CategorySerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("id", "slug", "created_at", "updated_at")
 
+    def validate_parent(self, parent):
+        if parent is not None and self.instance is not None:
+            try:
+                Category(pk=self.instance.pk, parent=parent).clean()
+            except DjangoValidationError as exc:
+                raise serializers.ValidationError(exc.message_dict["parent"]) from exc
+        return parent
+
 
-class ProductReviewSerializer(serializers.ModelSerializer):
+class ProductReviewSerializer(CachedFieldsModelSerializer):
     product = serializers.SerializerMethodField()
     product_id = serializers.PrimaryKeyRelatedField(
         source="product",
@@ -129,7 +156,7 @@ class ProductReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(CachedFieldsModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
         source="category",
@@ -221,7 +248,38 @@ class ProductSerializer(serializers.ModelSerializer):
         return ProductReviewSerializer(review, context=self.context).data
 
 
-class CartItemSerializer(serializers.ModelSerializer):
+class ProductStockUpdateSerializer(serializers.Serializer):
+    """One row of a warehouse price/stock feed."""
+
+    sku = serializers.CharField(max_length=64)
+    price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+    stock = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        if "price" not in attrs and "stock" not in attrs:
+            raise serializers.ValidationError("Provide price, stock or both.")
+        return attrs
+
+
+class ReviewBulkModerationSerializer(serializers.Serializer):
+    """Payload of ``POST /api/reviews/bulk-moderate/``."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+    status = serializers.ChoiceField(choices=ProductReview.ModerationStatus.choices)
+    note = serializers.CharField(allow_blank=True, required=False, default="")
+
+    def validate_ids(self, value):
+        limit = settings.REVIEW_BULK_MODERATION_MAX_IDS
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} ids per request.")
+        return list(dict.fromkeys(value))
+
+
+class CartItemSerializer(CachedFieldsModelSerializer):
     product = ProductSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         source="product",
@@ -240,7 +298,7 @@ class CartItemSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "product", "subtotal", "cart")
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(CachedFieldsModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     subtotal = serializers.DecimalField(
         max_digits=10,
@@ -258,14 +316,14 @@ class CartSerializer(serializers.ModelSerializer):
         return sum(item.quantity for item in obj.items.all())
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer(read_only=True)
+class OrderItemSerializer(CachedFieldsModelSerializer):
+    """Line as sold: the name and price snapshot, not the live product."""
 
     class Meta:
         model = OrderItem
         fields = (
             "id",
-            "product",
+            "product_id",
             "product_name",
             "unit_price",
             "quantity",
@@ -274,7 +332,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(CachedFieldsModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
 
     class Meta:
@@ -309,7 +367,47 @@ class OrderSerializer(serializers.ModelSerializer):
         )
 
 
-class OrderCreateSerializer(serializers.ModelSerializer):
+# Order columns loaded for the order list.
+ORDER_SUMMARY_COLUMNS = (
+    "id",
+    "status",
+    "payment_status",
+    "subtotal_amount",
+    "shipping_amount",
+    "total_amount",
+    "currency",
+    "placed_at",
+)
+
+
+class OrderSummarySerializer(CachedFieldsModelSerializer):
+    """
+    Row of ``GET /api/orders/``.
+
+    ``items_count``, ``thumbnail_image`` and ``thumbnail_derivatives`` are
+    annotations from ``OrderViewSet.get_queryset``; no items are loaded.
+    """
+
+    items_count = serializers.IntegerField(read_only=True)
+    thumbnail = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = (*ORDER_SUMMARY_COLUMNS, "items_count", "thumbnail")
+        read_only_fields = fields
+
+    def get_thumbnail(self, obj: Order) -> str | None:
+        if not obj.thumbnail_image:
+            return None
+        image = ProductImage(
+            image=obj.thumbnail_image, derivatives=obj.thumbnail_derivatives or {}
+        )
+        url = derivative_url(image, ORDER_THUMBNAIL_WIDTH, "webp") or image.image.url
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+class OrderCreateSerializer(CachedFieldsModelSerializer):
     cart_id = serializers.UUIDField(write_only=True)
     shipping_amount = serializers.DecimalField(
         max_digits=10,
@@ -369,18 +467,28 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         if not email:
             return None, False
         UserModel = get_user_model()
-        existing_user = UserModel.objects.filter(email__iexact=email).first()
-        if existing_user:
-            return existing_user, False
-        username = self._generate_username(email, UserModel)
         first_name, last_name = self._split_full_name(full_name)
-        user = UserModel.objects.create_user(
-            username=username,
-            email=email,
-            first_name=first_name,
-            last_name=last_name,
-        )
-        return user, True
+        for attempt in range(1, USERNAME_ATTEMPTS + 1):
+            existing_user = get_user_by_email(email)
+            if existing_user:
+                return existing_user, False
+            try:
+                # A concurrent checkout may claim the username first; the
+                # savepoint keeps the order transaction. ``email`` is not
+                # unique: the same address derives the same username, so a
+                # racing checkout for it fails here and then finds the user,
+                # but nothing else stops two accounts sharing an e-mail.
+                with transaction.atomic():
+                    user = UserModel.objects.create_user(
+                        username=self._generate_username(email, UserModel),
+                        email=email,
+                        first_name=first_name,
+                        last_name=last_name,
+                    )
+                return user, True
+            except IntegrityError:
+                if attempt == USERNAME_ATTEMPTS:
+                    raise
 
     def _generate_username(self, email: str, user_model) -> str:
         base_part = email.split("@")[0] if "@" in email else email
@@ -392,13 +500,7 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         slug_base = slug_base[:usable_length] if usable_length else slug_base
         if not slug_base:
             slug_base = "user"
-        candidate = slug_base
-        suffix = 1
-        while user_model.objects.filter(username=candidate).exists():
-            suffix += 1
-            candidate = f"{slug_base}-{suffix}"
-            candidate = candidate[:max_length]
-        return candidate
+        return allocate_suffixed(user_model._base_manager.all(), "username", slug_base)
 
     def _split_full_name(self, full_name: str) -> tuple[str, str]:
         parts = full_name.strip().split()
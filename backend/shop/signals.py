@@ -1,17 +1,82 @@
 from __future__ import annotations
 
+import contextlib
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
 from django.conf import settings
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Product
-from .search import index_product, remove_product
+from . import navigation, purchases, ratings, review_feed
+from .images import schedule_derivatives
+from .models import Category, Order, OrderItem, Product, ProductImage, ProductReview
+from .search import index_product, remove_product, schedule_index_products
+
+
+@dataclass
+class SideEffects:
+    """
+    Products whose search record or review-derived data must be refreshed,
+    products whose cached review feed shows an outdated product or author name,
+    users whose verified purchases must be recomputed, and whether the cached
+    category navigation is stale.
+    """
+
+    indexed: set[int] = field(default_factory=set)
+    reviewed: set[int] = field(default_factory=set)
+    feeds: set[int] = field(default_factory=set)
+    purchasers: set[int] = field(default_factory=set)
+    navigation: bool = False
+
+    def flush(self) -> None:
+        if self.navigation:
+            navigation.invalidate_on_commit()
+        if self.purchasers:
+            purchases.refresh(self.purchasers)
+        if self.reviewed:
+            ratings.recount(self.reviewed)
+        if self.reviewed or self.feeds:
+            review_feed.invalidate_on_commit(self.reviewed | self.feeds)
+        schedule_index_products(self.indexed)
+
+
+_batch: ContextVar[SideEffects | None] = ContextVar("shop_side_effects", default=None)
+
+# Fields shown on cached review feed pages (``ProductReviewSerializer``).
+FEED_PRODUCT_FIELDS = frozenset({"name", "slug"})
+FEED_USER_FIELDS = frozenset({"first_name", "last_name", "username"})
+
+
+@contextlib.contextmanager
+def batched_side_effects() -> Iterator[SideEffects]:
+    """
+    Collect what the receivers below would do per row and do it once on exit.
+
+    Set-based code that bypasses signals (``update()``) adds its own products
+    to the yielded ``SideEffects``. Nothing is flushed if the block raises.
+    """
+    outer = _batch.get()
+    if outer is not None:
+        yield outer
+        return
+    effects = SideEffects()
+    token = _batch.set(effects)
+    try:
+        yield effects
+    finally:
+        _batch.reset(token)
+    effects.flush()
 
 
 @receiver(post_save, sender=Product, dispatch_uid="shop_product_algolia_sync")
 def product_saved(sender, instance: Product, **kwargs):
     if not settings.ALGOLIA_ENABLED:
         return
+    if batch := _batch.get():
+        batch.indexed.add(instance.pk)
+        return
     index_product(instance.pk)
 
 
@@ -19,4 +84,118 @@ def product_saved(sender, instance: Product, **kwargs):
 def product_deleted(sender, instance: Product, **kwargs):
     if not settings.ALGOLIA_ENABLED:
         return
+    if batch := _batch.get():
+        batch.indexed.add(instance.pk)
+        return
     remove_product(instance.pk)
+
+
+@receiver(post_save, sender=Product, dispatch_uid="shop_product_navigation_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="shop_product_navigation_deleted")
+@receiver(post_save, sender=Category, dispatch_uid="shop_category_navigation_saved")
+@receiver(post_delete, sender=Category, dispatch_uid="shop_category_navigation_deleted")
+def catalog_changed(sender, instance, **kwargs):
+    if batch := _batch.get():
+        batch.navigation = True
+        return
+    navigation.invalidate_on_commit()
+
+
+@receiver(post_save, sender=ProductImage, dispatch_uid="shop_product_image_derivatives")
+def product_image_saved(sender, instance: ProductImage, **kwargs):
+    if not settings.IMAGE_DERIVATIVES_ENABLED or not instance.image:
+        return
+    schedule_derivatives(instance.pk)
+
+
+@receiver(post_save, sender=ProductReview, dispatch_uid="shop_review_feed_saved")
+@receiver(post_delete, sender=ProductReview, dispatch_uid="shop_review_feed_deleted")
+def review_changed(sender, instance: ProductReview, **kwargs):
+    if batch := _batch.get():
+        batch.reviewed.add(instance.product_id)
+        return
+    review_feed.invalidate_on_commit([instance.product_id])
+
+
+def _invalidate_feeds(product_ids: set[int]) -> None:
+    if not product_ids:
+        return
+    if batch := _batch.get():
+        batch.feeds.update(product_ids)
+        return
+    review_feed.invalidate_on_commit(product_ids)
+
+
+def _touches(update_fields, fields: frozenset[str]) -> bool:
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=Product, dispatch_uid="shop_product_review_feed_saved")
+def product_feed_saved(sender, instance: Product, created, update_fields, **kwargs):
+    if not created and _touches(update_fields, FEED_PRODUCT_FIELDS):
+        _invalidate_feeds({instance.pk})
+
+
+@receiver(
+    post_save,
+    sender=settings.AUTH_USER_MODEL,
+    dispatch_uid="shop_user_review_feed_saved",
+)
+def user_feed_saved(sender, instance, created, update_fields, **kwargs):
+    if created or not _touches(update_fields, FEED_USER_FIELDS):
+        return
+    _invalidate_feeds(
+        set(
+            ProductReview.all_objects.filter(user_id=instance.pk).values_list(
+                "product_id", flat=True
+            )
+        )
+    )
+
+
+@receiver(post_save, sender=ProductReview, dispatch_uid="shop_review_ratings_saved")
+def review_rating_saved(sender, instance: ProductReview, created, **kwargs):
+    if _batch.get():
+        return
+    ratings.review_saved(instance, created, kwargs.get("update_fields"))
+
+
+@receiver(post_delete, sender=ProductReview, dispatch_uid="shop_review_ratings_deleted")
+def review_rating_deleted(sender, instance: ProductReview, **kwargs):
+    if _batch.get():
+        return
+    ratings.review_deleted(instance)
+
+
+def _refresh_purchases(user_ids: set[int]) -> None:
+    if not user_ids:
+        return
+    if batch := _batch.get():
+        batch.purchasers.update(user_ids)
+        return
+    purchases.refresh(user_ids)
+
+
+@receiver(post_save, sender=Order, dispatch_uid="shop_order_purchases_saved")
+def order_purchases_saved(sender, instance: Order, created, **kwargs):
+    _refresh_purchases(purchases.order_saved(instance, created))
+
+
+@receiver(post_delete, sender=Order, dispatch_uid="shop_order_purchases_deleted")
+def order_purchases_deleted(sender, instance: Order, **kwargs):
+    _refresh_purchases(purchases.order_deleted(instance))
+
+
+@receiver(post_save, sender=OrderItem, dispatch_uid="shop_order_item_purchases_saved")
+def order_item_purchases_saved(sender, instance: OrderItem, **kwargs):
+    _refresh_purchases(purchases.order_item_changed(instance))
+
+
+@receiver(
+    post_delete, sender=OrderItem, dispatch_uid="shop_order_item_purchases_deleted"
+)
+def order_item_purchases_deleted(sender, instance: OrderItem, **kwargs):
+    if _batch.get():
+        # Bulk order deletes cascade here; the orders' receivers record the users.
+        return
+    _refresh_purchases(purchases.order_item_changed(instance))
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shop.admin import SoftDeleteAdmin
+from shop.models import (
+    Category,
+    Order,
+    OrderItem,
+    Product,
+    ProductRatingSummary,
+    ProductReview,
+)
+
+
+@override_settings(ALGOLIA_ENABLED=True)
+@mock.patch.object(SoftDeleteAdmin, "bulk_batch_size", 4)
+class SoftDeleteAdminActionTests(TestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="secret"
+        )
+        self.client.force_login(self.staff)
+        category = Category.objects.create(name="Chairs")
+        with mock.patch("shop.signals.index_product"):
+            self.products = [
+                Product.objects.create(
+                    category=category,
+                    name=f"Chair {index}",
+                    sku=f"C-{index}",
+                    price=Decimal("5.00"),
+                )
+                for index in range(10)
+            ]
+            for product in self.products[:2]:
+                for rating in (4, 5):
+                    ProductReview.objects.create(
+                        product=product,
+                        rating=rating,
+                        body="Text",
+                        author_name="Guest",
+                        moderation_status=ProductReview.ModerationStatus.APPROVED,
+                    )
+
+    def run_action(self, changelist: str, action: str, pks):
+        with (
+            mock.patch("shop.search.index_products") as index_products,
+            mock.patch("shop.search._executor") as executor,
+            mock.patch("shop.signals.index_product") as index_product,
+            mock.patch("shop.signals.remove_product") as remove_product,
+        ):
+            executor.submit.side_effect = lambda fn, ids: fn(ids)
+            with self.captureOnCommitCallbacks(execute=True):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.post(
+                        reverse(changelist),
+                        {"action": action, "_selected_action": list(pks)},
+                    )
+        self.assertEqual(response.status_code, 302)
+        index_product.assert_not_called()
+        remove_product.assert_not_called()
+        return index_products, [q["sql"] for q in queries.captured_queries]
+
+    def test_archive_and_restore_products_in_batches(self):
+        pks = [product.pk for product in self.products]
+        index_products, statements = self.run_action(
+            "admin:shop_product_changelist", "soft_delete_selected", pks
+        )
+        updates = [sql for sql in statements if sql.startswith('UPDATE "shop_product"')]
+        self.assertEqual(len(updates), 3)
+        index_products.assert_called_once()
+        self.assertEqual(sorted(index_products.call_args.args[0]), pks)
+        self.assertFalse(Product.objects.exists())
+
+        index_products, statements = self.run_action(
+            "admin:shop_product_changelist", "restore_selected", pks[:5]
+        )
+        updates = [sql for sql in statements if sql.startswith('UPDATE "shop_product"')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(sorted(index_products.call_args.args[0]), pks[:5])
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_archive_reviews_refreshes_counters_once(self):
+        reviews = ProductReview.objects.filter(product=self.products[0])
+        _, statements = self.run_action(
+            "admin:shop_productreview_changelist",
+            "soft_delete_selected",
+            reviews.values_list("pk", flat=True),
+        )
+        summary = ProductRatingSummary.objects.get(product=self.products[0])
+        self.assertEqual(summary.count, 0)
+        self.assertEqual(
+            ProductRatingSummary.objects.get(product=self.products[1]).count, 2
+        )
+        self.assertEqual(
+            len([sql for sql in statements if "GROUP BY" in sql]),
+            1,
+        )
+
+    def test_hard_delete_cascades_per_batch(self):
+        pks = [product.pk for product in self.products]
+        index_products, statements = self.run_action(
+            "admin:shop_product_changelist", "hard_delete_selected", pks
+        )
+        deletes = [
+            sql for sql in statements if sql.startswith('DELETE FROM "shop_product"')
+        ]
+        self.assertEqual(len(deletes), 3)
+        summary_updates = [
+            sql
+            for sql in statements
+            if sql.startswith('UPDATE "shop_productratingsummary"')
+        ]
+        self.assertEqual(summary_updates, [])
+        index_products.assert_called_once()
+        self.assertEqual(sorted(index_products.call_args.args[0]), pks)
+        self.assertFalse(Product.all_objects.exists())
+        self.assertFalse(ProductReview.all_objects.exists())
+        self.assertFalse(ProductRatingSummary.objects.exists())
+
+    def test_protected_rows_abort_the_whole_hard_delete(self):
+        order = Order.objects.create(
+            user=self.staff,
+            subtotal_amount=Decimal("5.00"),
+            total_amount=Decimal("5.00"),
+        )
+        OrderItem.objects.create(
+            order=order,
+            product=self.products[-1],
+            product_name=self.products[-1].name,
+            quantity=1,
+            unit_price=Decimal("5.00"),
+            line_total=Decimal("5.00"),
+        )
+        pks = [product.pk for product in self.products]
+        index_products, _ = self.run_action(
+            "admin:shop_product_changelist", "hard_delete_selected", pks
+        )
+        index_products.assert_not_called()
+        self.assertEqual(Product.all_objects.count(), 10)
+        self.assertEqual(ProductReview.all_objects.count(), 4)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from shop import jobs
+from shop.admin import BulkActionAdmin
+from shop.models import AdminJob, Category, Order, OrderItem, Product, ProductReview
+
+PRODUCTS = "admin:shop_product_changelist"
+
+
+@override_settings(ADMIN_JOB_INLINE_MAX_ROWS=3)
+@mock.patch.object(BulkActionAdmin, "bulk_batch_size", 2)
+class AdminJobTests(TestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="secret"
+        )
+        self.client.force_login(self.staff)
+        category = Category.objects.create(name="Tables")
+        self.products = [
+            Product.objects.create(
+                category=category,
+                name=f"Table {index}",
+                sku=f"T-{index}",
+                price=Decimal("5.00"),
+            )
+            for index in range(5)
+        ]
+        self.pks = [product.pk for product in self.products]
+
+    def post_action(self, action: str, pks, changelist: str = PRODUCTS):
+        return self.client.post(
+            reverse(changelist), {"action": action, "_selected_action": list(pks)}
+        )
+
+    def run_worker(self) -> str:
+        out = StringIO()
+        call_command("run_admin_jobs", "--once", stdout=out)
+        return out.getvalue()
+
+    def test_small_selections_run_inline(self):
+        self.post_action("soft_delete_selected", self.pks[:3])
+        self.assertFalse(AdminJob.objects.exists())
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_large_selection_is_queued_and_run_by_the_worker(self):
+        response = self.post_action("soft_delete_selected", self.pks)
+        self.assertEqual(response.status_code, 302)
+        job = AdminJob.objects.get()
+        self.assertEqual(
+            (job.status, job.total, job.processed, job.model, job.action),
+            (AdminJob.Status.PENDING, 5, 0, "shop.product", "archive_rows"),
+        )
+        self.assertEqual(Product.objects.count(), 5)
+
+        self.assertIn("1", self.run_worker())
+        job.refresh_from_db()
+        self.assertEqual(job.status, AdminJob.Status.DONE)
+        self.assertEqual((job.processed, job.affected, job.progress), (5, 5, 100))
+        self.assertEqual(job.created_by, self.staff)
+        self.assertFalse(Product.objects.exists())
+
+        progress = admin.site.get_model_admin(AdminJob).display_progress(job)
+        self.assertIn('<progress value="5" max="5">', progress)
+
+    def test_stalled_job_resumes_after_last_committed_chunk(self):
+        job = jobs.enqueue(
+            mock.Mock(model=Product),
+            "archive_rows",
+            self.pks,
+            user=self.staff,
+            description="Archive",
+        )
+        AdminJob.objects.filter(pk=job.pk).update(
+            status=AdminJob.Status.RUNNING,
+            processed=2,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+        self.run_worker()
+        self.assertEqual(
+            sorted(
+                Product.all_objects.filter(deleted_at__isnull=True).values_list(
+                    "pk", flat=True
+                )
+            ),
+            self.pks[:2],
+        )
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.affected), ("done", 5, 3))
+
+    def test_running_job_with_fresh_heartbeat_is_left_alone(self):
+        self.post_action("soft_delete_selected", self.pks)
+        AdminJob.objects.update(
+            status=AdminJob.Status.RUNNING, heartbeat_at=timezone.now()
+        )
+        self.run_worker()
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_failed_job_keeps_progress_and_can_be_retried(self):
+        order = Order.objects.create(
+            user=self.staff,
+            subtotal_amount=Decimal("5.00"),
+            total_amount=Decimal("5.00"),
+        )
+        item = OrderItem.objects.create(
+            order=order,
+            product=self.products[3],
+            product_name="Table",
+            quantity=1,
+            unit_price=Decimal("5.00"),
+            line_total=Decimal("5.00"),
+        )
+        self.post_action("hard_delete_selected", self.pks)
+        self.run_worker()
+        job = AdminJob.objects.get()
+        self.assertEqual(job.status, AdminJob.Status.FAILED)
+        self.assertEqual(job.processed, 2)
+        self.assertIn("protected", job.message)
+        self.assertEqual(Product.all_objects.count(), 3)
+
+        item.delete()
+        self.post_action("retry_jobs", [job.pk], "admin:shop_adminjob_changelist")
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.message), ("done", 5, ""))
+        self.assertFalse(Product.all_objects.exists())
+
+    def test_cancelled_jobs_are_not_run(self):
+        self.post_action("soft_delete_selected", self.pks)
+        job = AdminJob.objects.get()
+        self.post_action("cancel_jobs", [job.pk], "admin:shop_adminjob_changelist")
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, AdminJob.Status.CANCELLED)
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_moderation_runs_as_a_job_with_the_moderator(self):
+        reviews = [
+            ProductReview.objects.create(
+                product=product, rating=4, body="Text", author_name="Guest"
+            )
+            for product in self.products
+        ]
+        self.post_action(
+            "approve_reviews",
+            [review.pk for review in reviews],
+            "admin:shop_productreview_changelist",
+        )
+        self.assertEqual(AdminJob.objects.get().params, {"status": "approved"})
+        self.run_worker()
+        approved = ProductReview.objects.all()
+        self.assertEqual(approved.count(), 5)
+        self.assertEqual({review.moderated_by for review in approved}, {self.staff})
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from shop.models import Category, Product
+
+URL = reverse("product-bulk-update")
+
+
+class BulkStockUpdateTests(APITestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.staff = user_model.objects.create_user(
+            username="warehouse", password="pass", is_staff=True
+        )
+        self.buyer = user_model.objects.create_user(username="buyer", password="pass")
+        category = Category.objects.create(name="Lamps")
+        self.products = [
+            Product.objects.create(
+                category=category,
+                name=f"Lamp {index}",
+                sku=f"LAMP-{index}",
+                price=Decimal("10.00"),
+                stock=5,
+            )
+            for index in range(30)
+        ]
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(self.buyer)
+        response = self.client.post(URL, {"items": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_applies_rows_and_reports_per_sku(self):
+        self.client.force_authenticate(self.staff)
+        payload = {
+            "items": [
+                {"sku": "LAMP-0", "price": "12.50", "stock": 9},
+                {"sku": "LAMP-1", "stock": 0},
+                {"sku": "LAMP-2", "price": "10.00", "stock": 5},
+                {"sku": "MISSING", "stock": 1},
+                {"sku": "LAMP-3", "stock": -1},
+                {"sku": "LAMP-4"},
+            ]
+        }
+        response = self.client.post(URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(
+            [row["status"] for row in body["results"]],
+            ["updated", "updated", "unchanged", "not_found", "invalid", "invalid"],
+        )
+        self.assertEqual(
+            (body["updated"], body["unchanged"], body["not_found"], body["invalid"]),
+            (2, 1, 1, 2),
+        )
+        self.assertIn("stock", body["results"][4]["errors"])
+
+        first, second = Product.objects.get(sku="LAMP-0"), Product.objects.get(
+            sku="LAMP-1"
+        )
+        self.assertEqual((first.price, first.stock), (Decimal("12.50"), 9))
+        self.assertEqual((second.price, second.stock), (Decimal("10.00"), 0))
+        self.assertGreater(first.updated_at, self.products[0].updated_at)
+
+    @override_settings(ALGOLIA_ENABLED=True)
+    def test_query_count_is_constant_and_reindex_is_batched(self):
+        self.client.force_authenticate(self.staff)
+        payload = [{"sku": p.sku, "stock": 100} for p in self.products]
+        with (
+            mock.patch("shop.search.index_products") as index_products,
+            mock.patch("shop.search.index_product") as index_product,
+            mock.patch("shop.search._executor") as executor,
+        ):
+            executor.submit.side_effect = lambda fn, ids: fn(ids)
+            with self.captureOnCommitCallbacks(execute=True):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.post(URL, payload, format="json")
+
+        self.assertEqual(response.json()["updated"], 30)
+        statements = [
+            q["sql"] for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]
+        ]
+        self.assertLessEqual(len(statements), 2, statements)
+        index_product.assert_not_called()
+        index_products.assert_called_once()
+        self.assertEqual(
+            sorted(index_products.call_args.args[0]), [p.pk for p in self.products]
+        )
+        self.assertEqual(set(Product.objects.values_list("stock", flat=True)), {100})
+
+    @override_settings(PRODUCT_BULK_UPDATE_MAX_ROWS=2)
+    def test_rejects_oversized_payloads(self):
+        self.client.force_authenticate(self.staff)
+        payload = [{"sku": p.sku, "stock": 1} for p in self.products[:3]]
+        response = self.client.post(URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import csv
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from shop.catalog_io import (
+    PENDING_SLUG_PREFIX,
+    export_lines,
+    import_products,
+    run_pending_imports,
+)
+from shop.models import Category, Product, ProductImport
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PRODUCT_IMPORT_ASYNC=False)
+class CatalogImportTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Lamps")
+        self.existing = Product.objects.create(
+            category=self.category,
+            name="Desk lamp",
+            sku="LAMP-1",
+            price=Decimal("10.00"),
+            stock=1,
+        )
+
+    def test_csv_upserts_by_sku_and_reports_bad_rows(self):
+        feed = StringIO(
+            "sku,name,category,price,stock\n"
+            "LAMP-1,,,12.50,40\n"
+            "LAMP-2,Floor lamp,lamps,99.90,3\n"
+            "LAMP-3,Desk lamp,Lamps,15,2\n"
+            "LAMP-4,Ghost,Unknown,1,1\n"
+            "LAMP-5,Broken,Lamps,-1,1\n"
+            "LAMP-6,,,5,5\n"
+        )
+        errors = StringIO()
+        with mock.patch("shop.catalog_io.index_products") as index_products:
+            result = import_products(feed, "csv", error_stream=errors, chunk_size=2)
+
+        self.assertEqual((result.created, result.updated, result.failed), (2, 1, 3))
+        self.existing.refresh_from_db()
+        self.assertEqual(
+            (self.existing.name, self.existing.price, self.existing.stock),
+            ("Desk lamp", Decimal("12.50"), 40),
+        )
+        slugs = dict(Product.objects.values_list("sku", "slug"))
+        self.assertEqual(slugs["LAMP-2"], "floor-lamp")
+        self.assertEqual(slugs["LAMP-3"], "desk-lamp-2")
+        self.assertFalse(any(s.startswith(PENDING_SLUG_PREFIX) for s in slugs.values()))
+        self.assertEqual(Product.objects.get(sku="LAMP-2").meta_title, "Floor lamp")
+        index_products.assert_called_once()
+        self.assertEqual(len(list(index_products.call_args.args[0])), 3)
+
+        report = list(csv.DictReader(StringIO(errors.getvalue())))
+        self.assertEqual([row["sku"] for row in report], ["LAMP-4", "LAMP-5", "LAMP-6"])
+        self.assertIn("category", json.loads(report[0]["errors"]))
+        self.assertEqual(report[1]["line"], "6")
+
+    def test_jsonl_rows_and_invalid_lines(self):
+        feed = StringIO(
+            '{"sku": "LAMP-1", "stock": 7}\n'
+            "not json\n"
+            '{"sku": "LAMP-9", "name": "Wall lamp", "category": "Lamps", '
+            '"price": "20.00"}\n'
+        )
+        result = import_products(feed, "jsonl", error_stream=StringIO())
+        self.assertEqual((result.created, result.updated, result.failed), (1, 1, 1))
+        self.assertEqual(Product.objects.get(sku="LAMP-1").stock, 7)
+
+    def test_export_round_trips_through_import(self):
+        exported = "".join(export_lines("csv"))
+        Product.objects.filter(sku="LAMP-1").update(stock=0)
+        result = import_products(StringIO(exported), "csv")
+        self.assertEqual((result.updated, result.failed), (1, 0))
+        self.assertEqual(Product.objects.get(sku="LAMP-1").stock, 1)
+
+        lines = list(export_lines("jsonl"))
+        self.assertEqual(json.loads(lines[0])["category"], "Lamps")
+
+    def test_commands_stream_files(self):
+        out = StringIO()
+        call_command("export_products", "--format", "jsonl", stdout=out)
+        path = f"{MEDIA_ROOT}/feed.jsonl"
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(out.getvalue())
+        report = f"{MEDIA_ROOT}/errors.csv"
+        out = StringIO()
+        call_command("import_products", path, "--errors", report, stdout=out)
+        self.assertIn("обновлено: 1", out.getvalue())
+
+    def test_admin_upload_runs_import_job(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "pass"
+        )
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile(
+            "feed.csv", b"sku,stock\nLAMP-1,55\nMISSING,1\n", content_type="text/csv"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/admin/shop/productimport/add/",
+                {"source": upload, "format": "csv"},
+            )
+        self.assertEqual(response.status_code, 302)
+        job = ProductImport.objects.get()
+        self.assertEqual(job.status, ProductImport.Status.DONE)
+        self.assertEqual((job.rows_updated, job.rows_failed), (1, 1))
+        self.assertEqual(job.created_by, admin)
+        with job.error_report.open("r") as report:
+            self.assertIn("MISSING", report.read())
+        self.assertEqual(Product.objects.get(sku="LAMP-1").stock, 55)
+
+    def test_price_stock_feed_reads_and_writes_only_its_columns(self):
+        Product.objects.filter(pk=self.existing.pk).update(meta_title="")
+        feed = StringIO("sku,price,stock\nLAMP-1,11.00,4\n")
+        with CaptureQueriesContext(connection) as queries:
+            result = import_products(feed, "csv")
+        self.assertEqual(result.updated, 1)
+        statements = "\n".join(q["sql"] for q in queries.captured_queries)
+        self.assertNotIn('"description"', statements)
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.price, self.existing.stock), (11, 4))
+        self.assertEqual(self.existing.meta_title, "")
+
+    @override_settings(PRODUCT_IMPORT_ASYNC=True, ADMIN_JOB_STALE_AFTER=60)
+    def test_worker_reruns_imports_whose_heartbeat_stalled(self):
+        def job(name, **fields):
+            return ProductImport.objects.create(
+                source=SimpleUploadedFile(name, b"sku,stock\nLAMP-1,9\n"),
+                format="csv",
+                **fields,
+            )
+
+        stalled = job(
+            "stalled.csv",
+            status=ProductImport.Status.RUNNING,
+            heartbeat_at=timezone.now() - timedelta(minutes=5),
+        )
+        alive = job(
+            "alive.csv",
+            status=ProductImport.Status.RUNNING,
+            heartbeat_at=timezone.now(),
+        )
+
+        self.assertEqual(run_pending_imports(), 1)
+        stalled.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(
+            (stalled.status, stalled.rows_updated), (ProductImport.Status.DONE, 1)
+        )
+        self.assertEqual(alive.status, ProductImport.Status.RUNNING)
+        self.assertEqual(Product.objects.get(sku="LAMP-1").stock, 9)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+
+from accounts.models import UserProfile
+from shop.models import (
+    Order,
+    OrderItem,
+    Product,
+    ProductImage,
+    ProductReview,
+    PurchasedProduct,
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, ALGOLIA_ENABLED=True)
+class FastDemoDataTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def load(self, **options):
+        stdout = StringIO()
+        call_command(
+            "load_demo_data",
+            fast=True,
+            products=40,
+            users=10,
+            orders=30,
+            reviews_per_product=2,
+            workers=1,
+            seed=7,
+            stdout=stdout,
+            **options,
+        )
+        return stdout.getvalue()
+
+    def test_bulk_load_creates_related_rows_without_indexing(self):
+        receivers_before = len(post_save.receivers)
+        with mock.patch("shop.signals.index_product") as index_product:
+            output = self.load()
+
+        index_product.assert_not_called()
+        self.assertEqual(len(post_save.receivers), receivers_before)
+        self.assertIn("строк/с", output)
+        self.assertEqual(Product.objects.count(), 40)
+        self.assertEqual(ProductImage.objects.count(), 40)
+        self.assertEqual(len(set(Product.objects.values_list("slug", flat=True))), 40)
+        self.assertLess(
+            len(set(ProductImage.objects.values_list("image", flat=True))), 40
+        )
+        self.assertEqual(get_user_model().objects.count(), 10)
+        self.assertEqual(UserProfile.objects.count(), 10)
+        self.assertEqual(Order.objects.count(), 30)
+        self.assertTrue(OrderItem.objects.exists())
+        reviews = ProductReview.all_objects.all()
+        self.assertTrue(reviews.exists())
+        self.assertTrue(all(1 <= review.rating <= 5 for review in reviews))
+        # Seeded flags follow the same rule as ``PurchasedProduct``.
+        purchased = set(PurchasedProduct.objects.values_list("user_id", "product_id"))
+        flagged = set(
+            reviews.filter(verified_purchase=True).values_list("user_id", "product_id")
+        )
+        self.assertTrue(flagged)
+        self.assertLessEqual(flagged, purchased)
+
+    def test_rerun_updates_products_by_sku(self):
+        self.load()
+        with (
+            mock.patch("shop.ratings.review_deleted") as review_deleted,
+            mock.patch("shop.review_feed.invalidate_on_commit") as invalidate_feed,
+        ):
+            self.load()
+        # The review reset skips the per-row receivers; the run recounts once.
+        review_deleted.assert_not_called()
+        invalidate_feed.assert_not_called()
+        self.assertEqual(Product.all_objects.count(), 40)
+        self.assertEqual(ProductImage.objects.count(), 40)
+        self.assertEqual(get_user_model().objects.count(), 10)
+        self.assertFalse(ProductReview.all_objects.dead().exists())
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 from decimal import Decimal
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.db import IntegrityError, connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
+from accounts.utils import get_user_by_email
 from shop.models import Cart, CartItem, Category, Order, Product
+from shop.serializers import OrderCreateSerializer
 
 
 @override_settings(
@@ -105,3 +110,74 @@ class GuestCheckoutTests(APITestCase):
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, f"Order confirmation #{order.pk}")
         self.assertEqual(mail.outbox[0].to, ["guest@example.com"])
+
+    def test_guest_checkout_matches_email_case_insensitively(self):
+        user_model = get_user_model()
+        existing_user = user_model.objects.create_user(
+            username="existing-user", email="Guest@Example.com"
+        )
+        cart = self._build_cart()
+        response = self.client.post(
+            "/api/orders/",
+            self._order_payload(cart, customer_email="GUEST@example.COM"),
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Order.objects.get(pk=response.data["id"]).user, existing_user)
+        self.assertEqual(user_model.objects.count(), 1)
+
+    def test_email_lookup_compares_upper_case_expression(self):
+        with CaptureQueriesContext(connection) as queries:
+            get_user_by_email("someone@example.com")
+        self.assertIn('UPPER("auth_user"."email")', queries.captured_queries[0]["sql"])
+
+    def test_username_suffix_is_resolved_with_one_query(self):
+        user_model = get_user_model()
+        for suffix in ("", "-2", "-3", "-5"):
+            user_model.objects.create_user(username=f"info{suffix}")
+        serializer = OrderCreateSerializer()
+        with self.assertNumQueries(1):
+            username = serializer._generate_username("info@shop.example", user_model)
+        self.assertEqual(username, "info-4")
+
+    def test_username_race_is_retried(self):
+        user_model = get_user_model()
+        user_model.objects.create_user(username="info")
+        serializer = OrderCreateSerializer()
+        original = serializer._generate_username
+        calls = []
+
+        def stale_then_fresh(email, model):
+            calls.append(email)
+            return "info" if len(calls) == 1 else original(email, model)
+
+        serializer._generate_username = stale_then_fresh
+        user, created = serializer._resolve_user(
+            None, email="info@shop.example", full_name="Info Desk"
+        )
+        self.assertTrue(created)
+        self.assertEqual(user.username, "info-2")
+        self.assertEqual(len(calls), 2)
+
+    def test_username_race_gives_up_after_bounded_attempts(self):
+        get_user_model().objects.create_user(username="info")
+        serializer = OrderCreateSerializer()
+        serializer._generate_username = lambda email, model: "info"
+        with self.assertRaises(IntegrityError):
+            serializer._resolve_user(None, email="info@shop.example", full_name="")
+
+    def test_concurrent_checkout_for_the_same_email_reuses_its_user(self):
+        user = get_user_model().objects.create_user(
+            username="guest", email="guest@example.com"
+        )
+        serializer = OrderCreateSerializer()
+        # The first lookup ran before the other checkout committed its user.
+        with mock.patch(
+            "shop.serializers.get_user_by_email",
+            side_effect=[None, get_user_by_email("guest@example.com")],
+        ):
+            serializer._generate_username = lambda email, model: "guest"
+            resolved, created = serializer._resolve_user(
+                None, email="guest@example.com", full_name=""
+            )
+        self.assertEqual((resolved, created), (user, False))
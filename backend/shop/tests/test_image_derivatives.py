@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from shop.images import generate_derivatives, render_derivatives
+from shop.models import Category, Product, ProductImage
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_png(width: int = 1000, height: int = 500) -> SimpleUploadedFile:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (37, 99, 235)).save(buffer, format="PNG")
+    return SimpleUploadedFile("card.png", buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    IMAGE_DERIVATIVES_ASYNC=False,
+    IMAGE_DERIVATIVE_WIDTHS=(320, 640, 1280),
+    IMAGE_DERIVATIVE_FORMATS=("webp", "jpeg"),
+)
+class ImageDerivativeTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        category = Category.objects.create(name="Lamps")
+        self.product = Product.objects.create(
+            category=category, name="Desk lamp", sku="LAMP-1", price=Decimal("10")
+        )
+
+    def test_render_skips_upscaling(self):
+        rendered = render_derivatives(
+            make_png().read(), (320, 640, 1280), ["webp"], quality=80
+        )
+        self.assertEqual(sorted(rendered["files"]["webp"]), [320, 640])
+        self.assertEqual((rendered["width"], rendered["height"]), (1000, 500))
+
+    def test_saving_image_builds_hashed_derivatives_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(
+                product=self.product, image=make_png(), is_main=True
+            )
+        image.refresh_from_db()
+        files = image.derivatives["files"]
+        self.assertEqual(set(files), {"webp", "jpeg"})
+        self.assertEqual(
+            files["webp"]["320"],
+            f"products/derivatives/{image.derivatives['hash']}-320w.webp",
+        )
+
+        response = self.client.get(reverse("product-detail", args=[self.product.slug]))
+        sources = response.data["images"][0]["sources"]
+        self.assertEqual([s["type"] for s in sources], ["image/webp", "image/jpeg"])
+        self.assertIn("-320w.webp 320w, ", sources[0]["srcset"])
+        self.assertTrue(sources[0]["srcset"].endswith("-640w.webp 640w"))
+
+    def test_settings_change_renders_new_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=self.product, image=make_png())
+        image.refresh_from_db()
+        self.assertFalse(generate_derivatives(image.pk))
+
+        with override_settings(IMAGE_DERIVATIVE_QUALITY=40):
+            self.assertTrue(generate_derivatives(image.pk))
+            old_manifest = image.derivatives
+            image.refresh_from_db()
+            self.assertNotEqual(image.derivatives["hash"], old_manifest["hash"])
+            self.assertNotEqual(
+                image.derivatives["files"]["webp"]["320"],
+                old_manifest["files"]["webp"]["320"],
+            )
+            ProductImage.objects.filter(pk=image.pk).update(derivatives=old_manifest)
+            call_command("generate_image_derivatives", workers=1, stdout=StringIO())
+            image.refresh_from_db()
+            self.assertNotEqual(image.derivatives["hash"], old_manifest["hash"])
+
+    def test_backfill_command_processes_existing_images(self):
+        with override_settings(IMAGE_DERIVATIVES_ENABLED=False):
+            image = ProductImage.objects.create(product=self.product, image=make_png())
+        self.assertEqual(image.derivatives, {})
+
+        call_command("generate_image_derivatives", workers=1, stdout=StringIO())
+
+        image.refresh_from_db()
+        self.assertEqual(sorted(image.derivatives["files"]["jpeg"]), ["320", "640"])
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from shop import navigation
+from shop.inventory import StockUpdate, apply_price_stock_updates
+from shop.models import Category, Product
+
+LOCMEM_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shop-navigation-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CategoryNavigationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.lighting = Category.objects.create(name="Lighting")
+        self.lamps = Category.objects.create(name="Lamps", parent=self.lighting)
+        self.bulbs = Category.objects.create(name="Bulbs", parent=self.lighting)
+        self.hidden = Category.objects.create(name="Hidden", is_active=False)
+        self.orphan = Category.objects.create(name="Orphan", parent=self.hidden)
+        self.decor = Category.objects.create(name="Decor")
+        self._product(self.lighting, "9.00")
+        self._product(self.lamps, "25.00")
+        self._product(self.lamps, "40.00")
+        self._product(self.lamps, "1.00", stock=0)
+        self._product(self.lamps, "2.00", is_active=False)
+        self._product(self.bulbs, "3.50").delete()
+        self._product(self.orphan, "5.00")
+
+    def _product(self, category, price, **fields) -> Product:
+        return Product.objects.create(
+            category=category,
+            name=f"{category.name} {price}",
+            sku=f"{category.pk}-{price}",
+            price=Decimal(price),
+            stock=fields.pop("stock", 5),
+            **fields,
+        )
+
+    def test_tree_rolls_counts_and_prices_up_from_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("category-navigation"))
+        self.assertEqual(response.status_code, 200)
+        decor, lighting = response.json()
+
+        self.assertEqual(
+            decor,
+            {
+                "id": self.decor.pk,
+                "name": "Decor",
+                "slug": self.decor.slug,
+                "parent": None,
+                "product_count": 0,
+                "min_price": None,
+                "max_price": None,
+                "children": [],
+            },
+        )
+        self.assertEqual(
+            (lighting["product_count"], lighting["min_price"], lighting["max_price"]),
+            (3, "9.00", "40.00"),
+        )
+        bulbs, lamps = lighting["children"]
+        self.assertEqual((bulbs["slug"], bulbs["product_count"]), (self.bulbs.slug, 0))
+        self.assertEqual(
+            (lamps["parent"], lamps["product_count"], lamps["min_price"]),
+            (self.lighting.pk, 2, "25.00"),
+        )
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse("category-navigation"))
+
+    def test_product_and_category_changes_invalidate_the_cache(self):
+        navigation.get_tree()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._product(self.decor, "12.00")
+        self.assertIsNone(cache.get(navigation.CACHE_KEY))
+
+        navigation.get_tree()
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_price_stock_updates(
+                [StockUpdate(sku=f"{self.decor.pk}-12.00", stock=0)]
+            )
+        self.assertEqual(navigation.get_tree()[0]["product_count"], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lighting.is_active = False
+            self.lighting.save()
+        self.assertEqual(
+            [node["slug"] for node in navigation.get_tree()], [self.decor.slug]
+        )
+
+    def test_product_filter_includes_subcategories(self):
+        def listed(category):
+            response = self.client.get(reverse("product-list"), {"category": category})
+            return sorted(row["name"] for row in response.json()["results"])
+
+        self.assertEqual(
+            listed(self.lighting.slug),
+            ["Lamps 1.00", "Lamps 2.00", "Lamps 25.00", "Lamps 40.00", "Lighting 9.00"],
+        )
+        self.assertEqual(
+            listed(str(self.lamps.pk)),
+            ["Lamps 1.00", "Lamps 2.00", "Lamps 25.00", "Lamps 40.00"],
+        )
+        # Inactive categories are not in the tree and match only themselves.
+        self.assertEqual(listed(self.orphan.slug), ["Orphan 5.00"])
+        self.assertEqual(listed("missing"), [])
+
+    def test_categories_cannot_be_nested_inside_themselves(self):
+        staff = get_user_model().objects.create_user(username="staff", is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.patch(
+            reverse("category-detail", kwargs={"slug": self.lighting.slug}),
+            {"parent": self.lamps.pk},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("parent", response.json())
+
+    def test_model_validation_checks_nesting_on_categories_only(self):
+        product = Product.objects.get(sku=f"{self.lighting.pk}-9.00")
+        product.full_clean()
+
+        self.lighting.parent = self.lamps
+        with self.assertRaises(ValidationError) as caught:
+            self.lighting.full_clean()
+        self.assertIn("parent", caught.exception.message_dict)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import csv
+import json
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from shop.models import Category, Order, OrderItem, Product
+
+
+@override_settings(ORDER_EXPORT_CHUNK_SIZE=2)
+class OrderExportTests(APITestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user(
+            username="staff", password="secret", is_staff=True
+        )
+        category = Category.objects.create(name="Lamps")
+        self.lamp = Product.objects.create(
+            category=category, name="Lamp", sku="L-1", price=Decimal("10.00")
+        )
+        self.now = timezone.now()
+        self.orders = [
+            self._order("Anna@Example.com", days_ago=10, quantities=[1, 2]),
+            self._order("anna.b@example.com", days_ago=3, quantities=[1]),
+            self._order(
+                "bob@example.com", days_ago=2, quantities=[], status=Order.Status.PAID
+            ),
+            self._order(
+                "carol@example.com",
+                days_ago=1,
+                quantities=[3],
+                payment_status=Order.PaymentStatus.PAID,
+            ),
+            self._order("dave@example.com", days_ago=0, quantities=[1]),
+        ]
+        self.client.force_authenticate(self.staff)
+
+    def _order(self, email, *, days_ago, quantities, **fields) -> Order:
+        order = Order.objects.create(
+            customer_email=email,
+            shipping_full_name="Buyer",
+            subtotal_amount=Decimal("10.00"),
+            total_amount=Decimal("10.00"),
+            placed_at=self.now - timedelta(days=days_ago),
+            **fields,
+        )
+        for quantity in quantities:
+            OrderItem.objects.create(
+                order=order,
+                product=self.lamp,
+                product_name="Lamp",
+                unit_price=Decimal("10.00"),
+                quantity=quantity,
+                line_total=Decimal("10.00") * quantity,
+            )
+        return order
+
+    def _export(self, **params):
+        response = self.client.get(reverse("order-export"), params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_has_a_line_per_item_and_one_item_query_per_chunk(self):
+        response = self.client.get(reverse("order-export"))
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        # One order query, then one item query for each chunk of two orders.
+        with self.assertNumQueries(4):
+            content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(
+            [int(row["id"]) for row in rows],
+            [self.orders[0].pk] * 2 + [order.pk for order in self.orders[1:]],
+        )
+        self.assertEqual(rows[1]["item_quantity"], "2")
+        self.assertEqual(rows[1]["item_line_total"], "20.00")
+        bob = rows[3]
+        self.assertEqual((bob["status"], bob["item_product_id"]), ("paid", ""))
+
+    def test_filters_combine_date_range_status_and_email_prefix(self):
+        def exported_ids(**params):
+            content = self._export(export_format="jsonl", **params)
+            return [json.loads(line)["id"] for line in content.splitlines()]
+
+        first, second, third, fourth, fifth = (order.pk for order in self.orders)
+        self.assertEqual(exported_ids(email="ANNA"), [first, second])
+        self.assertEqual(
+            exported_ids(
+                date_from=(self.now - timedelta(days=5)).isoformat(),
+                date_to=(self.now - timedelta(hours=12)).isoformat(),
+            ),
+            [second, third, fourth],
+        )
+        self.assertEqual(exported_ids(status="paid"), [third])
+        self.assertEqual(exported_ids(payment_status="paid"), [fourth])
+        self.assertEqual(exported_ids(email="anna.", status="pending"), [second])
+
+    def test_jsonl_nests_items_and_skips_archived_orders_by_default(self):
+        self.orders[0].delete()
+        lines = self._export(export_format="jsonl").splitlines()
+        self.assertEqual(len(lines), 4)
+        carol = json.loads(lines[2])
+        self.assertEqual(carol["customer_email"], "carol@example.com")
+        self.assertEqual(carol["total_amount"], "10.00")
+        self.assertEqual(
+            carol["items"],
+            [
+                {
+                    "product_id": self.lamp.pk,
+                    "product_name": "Lamp",
+                    "unit_price": "10.00",
+                    "quantity": 3,
+                    "line_total": "30.00",
+                }
+            ],
+        )
+        archived = self._export(export_format="jsonl", include_archived="true")
+        self.assertEqual(len(archived.splitlines()), 5)
+
+    def test_invalid_filters_and_customers_are_rejected(self):
+        response = self.client.get(
+            reverse("order-export"),
+            {"date_from": self.now.isoformat(), "date_to": "2000-01-01T00:00"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("date_to", response.json())
+
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username="buyer")
+        )
+        self.assertEqual(self.client.get(reverse("order-export")).status_code, 403)
+
+    def test_staff_order_list_accepts_the_same_filters(self):
+        response = self.client.get(
+            reverse("order-list"), {"email": "anna", "status": "pending"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {row["id"] for row in response.json()["results"]},
+            {self.orders[0].pk, self.orders[1].pk},
+        )
+
+    def test_command_writes_filtered_orders(self):
+        stdout = StringIO()
+        call_command(
+            "export_orders", "--format", "jsonl", "--email", "carol", stdout=stdout
+        )
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["id"], self.orders[3].pk)
+
+    def test_admin_search_uses_order_number_or_email_prefix(self):
+        model_admin = site._registry[Order]
+        queryset = Order.objects.all()
+
+        found, _ = model_admin.get_search_results(
+            None, queryset, f"#{self.orders[2].pk}"
+        )
+        self.assertEqual(list(found), [self.orders[2]])
+        found, _ = model_admin.get_search_results(None, queryset, "ANNA")
+        self.assertEqual(set(found), set(self.orders[:2]))
+        found, _ = model_admin.get_search_results(None, queryset, "example.com")
+        self.assertFalse(found.exists())
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from shop.models import Category, Order, OrderItem, Product, ProductImage
+
+
+class OrderListTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@example.com", password="secret"
+        )
+        category = Category.objects.create(name="Lamps")
+        self.lamp = Product.objects.create(
+            category=category, name="Lamp", sku="L-1", price=Decimal("10.00")
+        )
+        self.bulb = Product.objects.create(
+            category=category, name="Bulb", sku="B-1", price=Decimal("2.00")
+        )
+        ProductImage.objects.create(product=self.lamp, image="products/side.png")
+        ProductImage.objects.create(
+            product=self.lamp,
+            image="products/main.png",
+            is_main=True,
+            derivatives={"files": {"webp": {"320": "products/derivatives/m.webp"}}},
+        )
+        self.order = self._order(self.user, [(self.lamp, 1), (self.bulb, 3)])
+        self.empty = self._order(self.user, [])
+        self._order(
+            get_user_model().objects.create_user(username="other"), [(self.bulb, 1)]
+        )
+        self.client.force_authenticate(self.user)
+
+    def _order(self, user, lines) -> Order:
+        order = Order.objects.create(
+            user=user,
+            subtotal_amount=Decimal("16.00"),
+            total_amount=Decimal("16.00"),
+        )
+        for product, quantity in lines:
+            OrderItem.objects.create(
+                order=order,
+                product=product,
+                product_name=product.name,
+                unit_price=product.price,
+                quantity=quantity,
+                line_total=product.price * quantity,
+            )
+        return order
+
+    def test_list_returns_annotated_summaries(self):
+        response = self.client.get(reverse("order-list"))
+        self.assertEqual(response.status_code, 200)
+        rows = {row["id"]: row for row in response.json()["results"]}
+        self.assertEqual(set(rows), {self.order.id, self.empty.id})
+
+        summary = rows[self.order.id]
+        self.assertNotIn("items", summary)
+        self.assertEqual(summary["items_count"], 2)
+        self.assertEqual(summary["total_amount"], "16.00")
+        self.assertEqual(
+            summary["thumbnail"], "http://testserver/media/products/derivatives/m.webp"
+        )
+        self.assertEqual(rows[self.empty.id]["items_count"], 0)
+        self.assertIsNone(rows[self.empty.id]["thumbnail"])
+
+    def test_detail_items_use_the_order_snapshot(self):
+        self.lamp.name = "Renamed lamp"
+        self.lamp.price = Decimal("99.00")
+        self.lamp.save()
+        self.lamp.delete()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("order-detail", args=[self.order.id]))
+        items = response.json()["items"]
+        self.assertEqual(
+            [
+                (item["product_id"], item["product_name"], item["unit_price"])
+                for item in items
+            ],
+            [(self.lamp.id, "Lamp", "10.00"), (self.bulb.id, "Bulb", "2.00")],
+        )
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from shop.models import (
+    Category,
+    Order,
+    OrderItem,
+    Product,
+    ProductReview,
+    PurchasedProduct,
+)
+from shop.purchases import purchased_product_ids, verified_purchases
+from shop.utils import user_has_verified_purchase
+
+LOCMEM_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shop-purchases-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PurchasedProductTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.buyer = User.objects.create_user(username="buyer")
+        self.other = User.objects.create_user(username="other")
+        category = Category.objects.create(name="Lamps")
+        self.lamp, self.bulb, self.shade = (
+            Product.objects.create(
+                category=category, name=name, sku=name, price=Decimal("5.00")
+            )
+            for name in ("Lamp", "Bulb", "Shade")
+        )
+
+    def _order(self, user, products, **fields) -> Order:
+        order = Order.objects.create(
+            user=user,
+            subtotal_amount=Decimal("5.00"),
+            total_amount=Decimal("5.00"),
+            **fields,
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(
+                order=order,
+                product=product,
+                product_name=product.name,
+                unit_price=product.price,
+                quantity=1,
+                line_total=product.price,
+            )
+            for product in products
+        )
+        return order
+
+    def _pay(self, order: Order, status=Order.Status.PAID) -> None:
+        order.status = status
+        order.payment_status = Order.PaymentStatus.PAID
+        order.save()
+
+    def _purchased(self, user) -> set[int]:
+        return set(
+            PurchasedProduct.objects.filter(user=user).values_list(
+                "product_id", flat=True
+            )
+        )
+
+    def test_rows_follow_order_status_payment_and_archiving(self):
+        order = self._order(self.buyer, [self.lamp, self.bulb])
+        self.assertEqual(self._purchased(self.buyer), set())
+
+        self._pay(order)
+        self.assertEqual(self._purchased(self.buyer), {self.lamp.pk, self.bulb.pk})
+
+        # A second paid order for the same product keeps it after the refund.
+        self._pay(self._order(self.buyer, [self.lamp]), Order.Status.COMPLETED)
+        order.payment_status = Order.PaymentStatus.REFUNDED
+        order.save(update_fields=["payment_status"])
+        self.assertEqual(self._purchased(self.buyer), {self.lamp.pk})
+
+        order = Order.objects.get(pk=order.pk)
+        order.payment_status = Order.PaymentStatus.PAID
+        order.user = self.other
+        order.save()
+        self.assertEqual(self._purchased(self.buyer), {self.lamp.pk})
+        self.assertEqual(self._purchased(self.other), {self.lamp.pk, self.bulb.pk})
+
+        order.delete()
+        self.assertEqual(self._purchased(self.other), set())
+
+    def test_admin_bulk_archive_and_restore_refresh_the_users_once(self):
+        orders = [self._order(self.buyer, [self.lamp]), self._order(self.other, [])]
+        for order in orders:
+            self._pay(order)
+        model_admin = site._registry[Order]
+        pks = [order.pk for order in orders]
+
+        model_admin.archive_rows(pks)
+        self.assertFalse(PurchasedProduct.objects.exists())
+        model_admin.restore_rows(pks)
+        self.assertEqual(self._purchased(self.buyer), {self.lamp.pk})
+        model_admin.delete_rows(pks)
+        self.assertFalse(PurchasedProduct.objects.exists())
+
+    def test_lookups_are_cached_per_user_until_the_purchases_change(self):
+        order = self._order(self.buyer, [self.lamp, self.shade])
+        self._pay(order, Order.Status.SHIPPED)
+
+        with self.assertNumQueries(1):
+            verified = verified_purchases(
+                [
+                    (self.buyer.pk, self.lamp.pk),
+                    (self.buyer.pk, self.bulb.pk),
+                    (self.other.pk, self.lamp.pk),
+                    (None, self.shade.pk),
+                ]
+            )
+        self.assertEqual(verified, {(self.buyer.pk, self.lamp.pk)})
+        with self.assertNumQueries(0):
+            self.assertTrue(user_has_verified_purchase(self.buyer, self.shade))
+            self.assertEqual(
+                purchased_product_ids([self.other.pk]), {self.other.pk: frozenset()}
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._pay(self._order(self.other, [self.bulb]))
+        self.assertTrue(user_has_verified_purchase(self.other, self.bulb))
+
+    def test_backfill_rebuilds_purchases_and_flags_reviews(self):
+        self._pay(self._order(self.buyer, [self.lamp]))
+        PurchasedProduct.objects.all().delete()
+        ProductReview.objects.bulk_create(
+            [
+                ProductReview(product=self.lamp, user=self.buyer, rating=5, body="ok"),
+                ProductReview(product=self.bulb, user=self.buyer, rating=4, body="ok"),
+                ProductReview(product=self.lamp, user=self.other, rating=3, body="ok"),
+            ]
+        )
+
+        stdout = StringIO()
+        call_command("backfill_verified_purchases", "--batch-size", "2", stdout=stdout)
+        self.assertIn("Исправлено записей о покупках: 1", stdout.getvalue())
+        self.assertIn("Отмечено подтверждённых отзывов: 1", stdout.getvalue())
+        self.assertEqual(
+            list(
+                ProductReview.all_objects.filter(verified_purchase=True).values_list(
+                    "product_id", "user_id"
+                )
+            ),
+            [(self.lamp.pk, self.buyer.pk)],
+        )
+
+    def test_migration_fills_the_table_from_existing_orders(self):
+        self._pay(self._order(self.buyer, [self.lamp, self.bulb]))
+        self._order(self.other, [self.lamp])
+        PurchasedProduct.objects.all().delete()
+        review = ProductReview.objects.create(
+            product=self.lamp, user=self.buyer, rating=5, body="ok"
+        )
+
+        migration = import_module("shop.migrations.0014_backfill_purchased_products")
+        migration.populate_purchases(apps, None)
+
+        self.assertEqual(self._purchased(self.buyer), {self.lamp.pk, self.bulb.pk})
+        self.assertEqual(self._purchased(self.other), set())
+        review.refresh_from_db()
+        self.assertTrue(review.verified_purchase)
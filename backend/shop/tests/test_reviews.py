@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.test import APITestCase
 
 from shop.models import Category, Order, OrderItem, Product, ProductReview
@@ -244,3 +252,334 @@ class ProductReviewAPITests(APITestCase):
         self.assertFalse(after_moderation["can_review"])
         self.assertEqual(after_moderation["reviews_count"], 1)
         self.assertEqual(after_moderation["average_rating"], 5.0)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+@mock.patch.object(PageNumberPagination, "page_size", 2)
+class ReviewFeedCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = get_user_model().objects.create_user(
+            username="moderator", password="secret", is_staff=True
+        )
+        self.author = get_user_model().objects.create_user(
+            username="author", password="secret", first_name="Ann"
+        )
+        category = Category.objects.create(name="Lamps")
+        self.product = Product.objects.create(
+            category=category,
+            name="Desk lamp",
+            sku="L-1",
+            price=Decimal("10.00"),
+            description="x" * 10_000,
+        )
+        self.reviews = [
+            ProductReview.objects.create(
+                product=self.product,
+                rating=5,
+                body=f"Review {index}",
+                author_name=f"Guest {index}",
+                moderation_status=ProductReview.ModerationStatus.APPROVED,
+            )
+            for index in range(3)
+        ]
+        self.url = reverse("review-list")
+
+    def feed(self, **params):
+        return self.client.get(self.url, {"product": self.product.id, **params})
+
+    def test_anonymous_pages_are_cached(self):
+        with CaptureQueriesContext(connection) as queries:
+            first = self.feed()
+        self.assertNotIn(
+            '"shop_product"."description"',
+            " ".join(q["sql"] for q in queries.captured_queries),
+        )
+        with self.assertNumQueries(0):
+            second = self.feed()
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second.json()["count"], 3)
+        self.assertIn("page=2", second.json()["next"])
+
+        self.feed(page=2)
+        with self.assertNumQueries(0):
+            page_two = self.feed(page=2).json()
+        self.assertEqual(len(page_two["results"]), 1)
+        self.assertIsNone(page_two["next"])
+        self.assertNotIn("page=", page_two["previous"])
+
+    def test_slug_lookup_shares_the_cached_page(self):
+        self.feed()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"product_slug": self.product.slug})
+        self.assertEqual(response.json()["count"], 3)
+
+    def test_moderation_and_edits_invalidate_the_feed(self):
+        self.feed()
+        self.client.force_authenticate(self.staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("review-moderate", args=[self.reviews[0].id]),
+                {"status": ProductReview.ModerationStatus.REJECTED},
+                format="json",
+            )
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.feed().json()["count"], 2)
+
+        self.reviews[1].body = "Edited"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reviews[1].save()
+        bodies = [r["body"] for r in self.feed().json()["results"]]
+        self.assertIn("Edited", bodies)
+
+    def test_product_and_author_renames_invalidate_the_feed(self):
+        ProductReview.objects.filter(pk=self.reviews[2].pk).update(user=self.author)
+        self.feed()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = "Reading lamp"
+            self.product.save()
+        results = self.feed().json()["results"]
+        self.assertEqual(results[0]["product"]["name"], "Reading lamp")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            self.feed()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.first_name = "Anna"
+            self.author.save()
+        names = {r["user"]["name"] for r in self.feed().json()["results"]}
+        self.assertIn("Anna", names)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.feed()
+        ProductReview.objects.create(
+            product=self.product,
+            user=self.author,
+            rating=3,
+            body="Pending",
+            moderation_status=ProductReview.ModerationStatus.PENDING,
+        )
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.feed().json()["count"], 4)
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.feed().json()["count"], 3)
+
+
+class RatingSummaryTests(APITestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user(
+            username="moderator", password="secret", is_staff=True
+        )
+        category = Category.objects.create(name="Kettles")
+        self.product = Product.objects.create(
+            category=category, name="Kettle", sku="K-1", price=Decimal("30.00")
+        )
+        self.url = reverse("product-review-summary", args=[self.product.slug])
+
+    def review(self, rating: int, status=ProductReview.ModerationStatus.APPROVED):
+        return ProductReview.objects.create(
+            product=self.product,
+            rating=rating,
+            body="Text",
+            author_name="Guest",
+            moderation_status=status,
+        )
+
+    def summary(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def histogram(self):
+        return list(self.summary()["histogram"].values())
+
+    def test_empty_product(self):
+        self.assertEqual(
+            self.summary(),
+            {
+                "product": {"id": self.product.id, "slug": self.product.slug},
+                "count": 0,
+                "average": None,
+                "histogram": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0},
+            },
+        )
+        missing = reverse("product-review-summary", args=["missing"])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_counters_follow_moderation_edits_and_deletes(self):
+        five = self.review(5)
+        self.review(4)
+        pending = self.review(1, ProductReview.ModerationStatus.PENDING)
+        self.assertEqual(self.histogram(), [0, 0, 0, 1, 1])
+
+        pending.mark_moderated(
+            status=ProductReview.ModerationStatus.APPROVED, moderator=self.staff
+        )
+        self.assertEqual(self.histogram(), [1, 0, 0, 1, 1])
+        self.assertEqual(self.summary()["average"], 3.33)
+
+        five.rating = 2
+        five.save()
+        self.assertEqual(self.histogram(), [1, 1, 0, 1, 0])
+
+        pending.mark_moderated(
+            status=ProductReview.ModerationStatus.REJECTED, moderator=self.staff
+        )
+        self.assertEqual(self.histogram(), [0, 1, 0, 1, 0])
+
+        five.delete()
+        self.assertEqual(self.histogram(), [0, 0, 0, 1, 0])
+        five.restore()
+        self.assertEqual(self.histogram(), [0, 1, 0, 1, 0])
+        five.hard_delete()
+        self.assertEqual(self.histogram(), [0, 0, 0, 1, 0])
+
+    def test_reviews_loaded_with_deferred_fields_are_recounted(self):
+        review = self.review(3)
+        partial = ProductReview.objects.only("id", "body").get(pk=review.pk)
+        partial.rating = 5
+        partial.save()
+        self.assertEqual(self.histogram(), [0, 0, 0, 0, 1])
+
+    def test_recount_repairs_drift_with_one_group_by(self):
+        self.review(5)
+        self.review(5)
+        ProductReview.objects.update(rating=3)
+        self.assertEqual(self.histogram(), [0, 0, 0, 0, 2])
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command("recount_review_ratings", stdout=out)
+        review_queries = [
+            q["sql"]
+            for q in queries.captured_queries
+            if 'FROM "shop_productreview"' in q["sql"]
+        ]
+        self.assertEqual(len(review_queries), 1)
+        self.assertIn("GROUP BY", review_queries[0])
+        self.assertIn(": 1", out.getvalue())
+        self.assertEqual(self.histogram(), [0, 0, 2, 0, 0])
+
+        out = StringIO()
+        call_command("recount_review_ratings", stdout=out)
+        self.assertIn(": 0", out.getvalue())
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class ReviewBulkModerationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = get_user_model().objects.create_user(
+            username="moderator", password="secret", is_staff=True, is_superuser=True
+        )
+        category = Category.objects.create(name="Mugs")
+        self.products = [
+            Product.objects.create(
+                category=category, name=f"Mug {index}", sku=f"M-{index}", price=1
+            )
+            for index in range(2)
+        ]
+        self.reviews = [
+            ProductReview.objects.create(
+                product=self.products[index % 2],
+                rating=index + 1,
+                body="Text",
+                author_name="Guest",
+                moderation_status=ProductReview.ModerationStatus.PENDING,
+            )
+            for index in range(4)
+        ]
+        self.url = reverse("review-bulk-moderate")
+
+    def histogram(self, product):
+        url = reverse("product-review-summary", args=[product.slug])
+        return list(self.client.get(url).json()["histogram"].values())
+
+    def feed_count(self, product):
+        return self.client.get(reverse("review-list"), {"product": product.id}).json()[
+            "count"
+        ]
+
+    def test_bulk_approve_updates_reviews_counters_and_feed(self):
+        self.assertEqual(self.feed_count(self.products[0]), 0)
+        ids = [review.id for review in self.reviews[:3]]
+        before = self.reviews[0].updated_at
+
+        self.client.force_authenticate(self.staff)
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    self.url,
+                    {"ids": [*ids, 999_999], "status": "approved", "note": "OK"},
+                    format="json",
+                )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {"status": "approved", "updated": 3, "not_found": [999_999]},
+        )
+        review_updates = [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith('UPDATE "shop_productreview"')
+        ]
+        self.assertEqual(len(review_updates), 1)
+
+        approved = ProductReview.objects.filter(pk__in=ids)
+        self.assertEqual(approved.count(), 3)
+        for review in approved:
+            self.assertEqual(review.moderated_by, self.staff)
+            self.assertEqual(review.moderation_note, "OK")
+            self.assertGreater(review.updated_at, before)
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.histogram(self.products[0]), [1, 0, 1, 0, 0])
+        self.assertEqual(self.histogram(self.products[1]), [0, 1, 0, 0, 0])
+        self.assertEqual(self.feed_count(self.products[0]), 2)
+
+    def test_validation_and_permissions(self):
+        payload = {"ids": [self.reviews[0].id], "status": "approved"}
+        self.assertEqual(
+            self.client.post(self.url, payload, format="json").status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.client.force_authenticate(self.staff)
+        response = self.client.post(
+            self.url, {**payload, "status": "spam"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(REVIEW_BULK_MODERATION_MAX_IDS=1):
+            response = self.client.post(
+                self.url, {**payload, "ids": [1, 2]}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_actions_use_bulk_moderation(self):
+        self.client.force_login(self.staff)
+        changelist = reverse("admin:shop_productreview_changelist")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                changelist,
+                {
+                    "action": "approve_reviews",
+                    "_selected_action": [review.id for review in self.reviews],
+                },
+            )
+        self.assertEqual(self.histogram(self.products[0]), [1, 0, 1, 0, 0])
+        self.assertEqual(self.histogram(self.products[1]), [0, 1, 0, 1, 0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                changelist,
+                {"action": "reject_reviews", "_selected_action": [self.reviews[0].id]},
+            )
+        self.assertEqual(self.histogram(self.products[0]), [0, 0, 1, 0, 0])
+        self.client.logout()
+        self.assertEqual(self.feed_count(self.products[0]), 1)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from content.models import Post
+from shop.models import (
+    Cart,
+    CartItem,
+    Category,
+    Order,
+    OrderItem,
+    Product,
+    ProductImage,
+    ProductReview,
+)
+
+
+class CachedFieldPlanSnapshotTests(APITestCase):
+    """Responses must not change when the serializer field plan cache is on."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@example.com", first_name="Buyer"
+        )
+        category = Category.objects.create(name="Audio", description="Sound")
+        self.product = Product.objects.create(
+            category=category,
+            name="Headphones",
+            sku="HP-001",
+            price=Decimal("129.90"),
+            stock=4,
+            short_description="Wireless",
+        )
+        ProductImage.objects.create(
+            product=self.product, image="products/hp.png", alt_text="HP", is_main=True
+        )
+        ProductReview.objects.create(
+            product=self.product,
+            user=self.user,
+            rating=4,
+            body="Solid",
+            moderation_status=ProductReview.ModerationStatus.APPROVED,
+        )
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
+        self.order = Order.objects.create(
+            user=self.user,
+            subtotal_amount=Decimal("129.90"),
+            total_amount=Decimal("129.90"),
+            customer_email=self.user.email,
+            shipping_full_name="Buyer",
+            shipping_address="Main street 1",
+            shipping_city="Moscow",
+        )
+        OrderItem.objects.create(
+            order=self.order,
+            product=self.product,
+            product_name=self.product.name,
+            unit_price=self.product.price,
+            quantity=1,
+            line_total=self.product.price,
+        )
+        self.post = Post.objects.create(title="News", body="Body", is_published=True)
+        self.post.tags.add("audio")
+
+    def _snapshot(self, url: str) -> bytes:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.content
+
+    def test_responses_match_plain_model_serializer(self):
+        self.client.force_authenticate(self.user)
+        urls = [
+            reverse("product-list"),
+            reverse("product-detail", args=[self.product.slug]),
+            reverse("category-list"),
+            reverse("cart-detail", args=[self.cart.id]),
+            reverse("order-list"),
+            reverse("review-list"),
+            reverse("post-list"),
+            reverse("post-detail", args=[self.post.slug]),
+        ]
+        for url in urls:
+            with override_settings(SERIALIZER_FIELD_PLAN_CACHE=False):
+                expected = self._snapshot(url)
+            with self.subTest(url=url):
+                # The first cached pass records the plan, the second replays it.
+                self.assertEqual(self._snapshot(url), expected)
+                self.assertEqual(self._snapshot(url), expected)
@@ -8,7 +8,9 @@ from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg, Count, Q, Sum
+from django.db.models import Avg, Count, OuterRef, Prefetch, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
@@ -19,17 +21,41 @@ from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from . import navigation, review_feed
 from .filters import ProductFilter
-from .models import Cart, CartItem, Category, Order, OrderItem, Product, ProductReview
+from .inventory import StockUpdate, apply_price_stock_updates
+from .models import (
+    Cart,
+    CartItem,
+    Category,
+    Order,
+    OrderItem,
+    Product,
+    ProductImage,
+    ProductImport,
+    ProductRatingSummary,
+    ProductReview,
+)
+from .moderation import moderate_reviews
+from .order_export import (
+    OrderExportSerializer,
+    OrderFilterSerializer,
+    export_lines,
+    filter_orders,
+)
 from .permissions import IsAdminOrReadOnly, IsReviewAuthorOrStaff
 from .serializers import (
+    ORDER_SUMMARY_COLUMNS,
     CartItemSerializer,
     CartSerializer,
     CategorySerializer,
     OrderCreateSerializer,
     OrderSerializer,
+    OrderSummarySerializer,
     ProductReviewSerializer,
     ProductSerializer,
+    ProductStockUpdateSerializer,
+    ReviewBulkModerationSerializer,
 )
 from .utils import user_has_verified_purchase
 
@@ -42,6 +68,11 @@ class CategoryViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminOrReadOnly]
     lookup_field = "slug"
 
+    @action(detail=False, methods=["get"], permission_classes=[AllowAny])
+    def navigation(self, request, *args, **kwargs):
+        """Active categories as a tree with in-stock product counts and prices."""
+        return Response(navigation.get_tree())
+
 
 class ProductViewSet(viewsets.ModelViewSet):
     serializer_class = ProductSerializer
@@ -74,6 +105,73 @@ class ProductViewSet(viewsets.ModelViewSet):
             )
         )
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-update",
+        permission_classes=[IsAdminUser],
+    )
+    def bulk_update(self, request, *args, **kwargs):
+        """Apply a warehouse feed of ``{sku, price, stock}`` rows in one transaction."""
+        rows = request.data.get("items") if isinstance(request.data, dict) else None
+        if rows is None:
+            rows = request.data
+        if not isinstance(rows, list):
+            raise serializers.ValidationError({"items": "Expected a list of rows."})
+        limit = settings.PRODUCT_BULK_UPDATE_MAX_ROWS
+        if len(rows) > limit:
+            raise serializers.ValidationError(
+                {"items": f"At most {limit} rows per request."}
+            )
+
+        validator = ProductStockUpdateSerializer()
+        updates: list[StockUpdate] = []
+        results: list[dict] = []
+        for row in rows:
+            try:
+                data = validator.run_validation(row)
+            except serializers.ValidationError as exc:
+                sku = row.get("sku", "") if isinstance(row, dict) else ""
+                results.append({"sku": sku, "status": "invalid", "errors": exc.detail})
+                continue
+            updates.append(StockUpdate(**data))
+            results.append({"sku": data["sku"], "status": None})
+
+        statuses = apply_price_stock_updates(updates)
+        summary = dict.fromkeys(("updated", "unchanged", "not_found", "invalid"), 0)
+        for result in results:
+            if result["status"] is None:
+                result["status"] = statuses[result["sku"]]
+            summary[result["status"]] += 1
+        return Response({**summary, "results": results})
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="reviews/summary",
+        url_name="review-summary",
+        permission_classes=[AllowAny],
+    )
+    def review_summary(self, request, *args, **kwargs):
+        """Star histogram and average of approved reviews, read from the counters."""
+        product = get_object_or_404(
+            Product.objects.select_related("rating_summary"), slug=kwargs["slug"]
+        )
+        try:
+            ratings = product.rating_summary
+        except ProductRatingSummary.DoesNotExist:
+            ratings = ProductRatingSummary(product=product)
+        return Response(
+            {
+                "product": {"id": product.id, "slug": product.slug},
+                "count": ratings.count,
+                "average": ratings.average,
+                "histogram": {
+                    str(star): count for star, count in ratings.histogram.items()
+                },
+            }
+        )
+
 
 class CartViewSet(
     mixins.CreateModelMixin,
@@ -140,14 +238,38 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
             return [AllowAny()]
         if self.action in {"update", "partial_update", "destroy"}:
             return [IsAuthenticated(), IsReviewAuthorOrStaff()]
-        if self.action == "moderate":
+        if self.action in {"moderate", "bulk_moderate"}:
             return [IsAdminUser()]
         return [AllowAny()]
 
+    # Columns ProductReviewSerializer reads; product descriptions and user
+    # rows other than the display name are never loaded for a list page.
+    list_fields = (
+        "id",
+        "product_id",
+        "product__slug",
+        "product__name",
+        "user_id",
+        "user__username",
+        "user__first_name",
+        "user__last_name",
+        "rating",
+        "title",
+        "body",
+        "author_name",
+        "verified_purchase",
+        "moderation_status",
+        "moderation_note",
+        "created_at",
+        "updated_at",
+    )
+
     def get_queryset(self):
         qs = ProductReview.all_objects.filter(deleted_at__isnull=True).select_related(
             "product", "user"
         )
+        if self.action == "list":
+            qs = qs.only(*self.list_fields)
         request = self.request
         product_id = request.query_params.get("product")
         product_slug = request.query_params.get("product_slug")
@@ -167,6 +289,41 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
             visibility |= Q(user=request.user)
         return qs.filter(visibility).order_by("-created_at")
 
+    def _public_feed_product(self) -> int | None:
+        """Product id when the request is for the shared anonymous feed."""
+        request = self.request
+        params = request.query_params
+        if request.user.is_authenticated or not set(params) <= review_feed.FEED_PARAMS:
+            return None
+        product_id, product_slug = params.get("product"), params.get("product_slug")
+        if product_id and not product_slug:
+            return int(product_id) if product_id.isdigit() else None
+        if product_slug and not product_id:
+            return (
+                Product.all_objects.filter(slug=product_slug)
+                .values_list("id", flat=True)
+                .first()
+            )
+        return None
+
+    def list(self, request, *args, **kwargs):
+        product_id = self._public_feed_product()
+        page = request.query_params.get(self.paginator.page_query_param, "1")
+        if product_id is None or not page.isdigit() or int(page) < 1:
+            return super().list(request, *args, **kwargs)
+        page = int(page)
+        key = review_feed.page_key(product_id, page)
+        cached = review_feed.get_page(key)
+        if cached is not None:
+            return Response(
+                review_feed.paginated(
+                    request, page, self.paginator.get_page_size(request), cached
+                )
+            )
+        response = super().list(request, *args, **kwargs)
+        review_feed.store_page(key, response.data["count"], response.data["results"])
+        return response
+
     def perform_create(self, serializer):
         product = serializer.validated_data["product"]
         user = self.request.user if self.request.user.is_authenticated else None
@@ -231,6 +388,26 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(review)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["post"], url_path="bulk-moderate")
+    def bulk_moderate(self, request, *args, **kwargs):
+        """Approve or reject up to ``REVIEW_BULK_MODERATION_MAX_IDS`` reviews at once."""
+        payload = ReviewBulkModerationSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        ids = payload.validated_data["ids"]
+        moderated = moderate_reviews(
+            ProductReview.objects.with_unapproved().filter(pk__in=ids),
+            status=payload.validated_data["status"],
+            moderator=request.user,
+            note=payload.validated_data["note"],
+        )
+        return Response(
+            {
+                "status": payload.validated_data["status"],
+                "updated": len(moderated),
+                "not_found": [pk for pk in ids if pk not in moderated],
+            }
+        )
+
 
 class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = OrderSerializer
@@ -238,16 +415,26 @@ class OrderViewSet(viewsets.ModelViewSet):
     http_method_names = ["get", "post", "head", "options"]
 
     def get_queryset(self):
-        queryset = Order.objects.select_related("user").prefetch_related(
-            "items__product", "items__product__images"
-        )
+        if self.action == "list":
+            queryset = self._summaries()
+        else:
+            queryset = Order.objects.prefetch_related(
+                Prefetch("items", queryset=OrderItem.objects.order_by("pk"))
+            )
         user = self.request.user
         if user.is_authenticated:
             if user.is_staff:
-                return queryset
+                return self._staff_filtered(queryset)
             return queryset.filter(user=user)
         return Order.objects.none()
 
+    def _staff_filtered(self, queryset):
+        if self.action != "list":
+            return queryset
+        filters = OrderFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return filter_orders(queryset, **filters.validated_data)
+
     def get_permissions(self):
         if self.action == "create":
             return [AllowAny()]
@@ -256,8 +443,53 @@ class OrderViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == "create":
             return OrderCreateSerializer
+        if self.action == "list":
+            return OrderSummarySerializer
         return OrderSerializer
 
+    @staticmethod
+    def _summaries():
+        """Orders with ``items_count`` and the first item's main product image."""
+        items = OrderItem.objects.filter(order=OuterRef("pk")).order_by()
+        item_count = items.values("order").annotate(count=Count("pk")).values("count")
+        thumbnail = ProductImage.objects.filter(
+            product_id=OuterRef("first_product_id")
+        ).order_by("-is_main", "pk")
+        return (
+            Order.objects.only(*ORDER_SUMMARY_COLUMNS)
+            .annotate(
+                items_count=Coalesce(Subquery(item_count), 0),
+                first_product_id=Subquery(
+                    items.order_by("pk").values("product_id")[:1]
+                ),
+            )
+            .annotate(
+                thumbnail_image=Subquery(thumbnail.values("image")[:1]),
+                thumbnail_derivatives=Subquery(thumbnail.values("derivatives")[:1]),
+            )
+        )
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser])
+    def export(self, request, *args, **kwargs):
+        """Stream the filtered orders with their items as CSV or JSON Lines."""
+        params = OrderExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        fmt = filters.pop("export_format")
+        manager = (
+            Order.all_objects if filters.pop("include_archived") else Order.objects
+        )
+        response = StreamingHttpResponse(
+            export_lines(fmt, filter_orders(manager.all(), **filters)),
+            content_type=(
+                "application/x-ndjson; charset=utf-8"
+                if fmt == ProductImport.Format.JSONL
+                else "text/csv; charset=utf-8"
+            ),
+        )
+        response["Content-Disposition"] = f'attachment; filename="orders.{fmt}"'
+        return response
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -282,7 +514,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not order.customer_email:
             return
         try:
-            items = order.items.select_related("product").all()
+            items = order.items.order_by("pk")
             lines = [
                 f"- {item.product_name} x {item.quantity} - {item.line_total} {order.currency}"
                 for item in items
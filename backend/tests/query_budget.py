@@ -0,0 +1,184 @@
+"""
+Query-count budgets for API endpoints and admin changelists.
+
+``assert_max_queries`` records every SQL statement executed inside its block and
+fails with the offending SQL and the project frames that issued it when the
+number of queries exceeds the allowed budget. ``QUERY_BUDGETS`` pins the limits
+per endpoint, user role and page size so N+1 regressions fail the test run.
+"""
+
+from __future__ import annotations
+
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+ANONYMOUS = "anonymous"
+AUTHENTICATED = "authenticated"
+STAFF = "staff"
+ROLES = (ANONYMOUS, AUTHENTICATED, STAFF)
+
+# Number of rows rendered by the endpoint -> maximum number of SQL queries.
+# Budgets exclude transaction bookkeeping (savepoints) and the JWT user lookup,
+# since the tests authenticate through ``force_authenticate``.
+QUERY_BUDGETS: dict[str, dict[str, dict[int, int]]] = {
+    "category-list": {
+        ANONYMOUS: {1: 2, 12: 2},
+        AUTHENTICATED: {1: 2, 12: 2},
+        STAFF: {1: 2, 12: 2},
+    },
+    "product-list": {
+        ANONYMOUS: {1: 3, 12: 3},
+        # get_can_review/get_user_review still query per product.
+        AUTHENTICATED: {1: 5, 12: 27},
+        STAFF: {1: 5, 12: 27},
+    },
+    "product-detail": {
+        ANONYMOUS: {1: 2},
+        AUTHENTICATED: {1: 4},
+        STAFF: {1: 4},
+    },
+    "cart-detail": {
+        # Cart.subtotal re-queries items with their products.
+        ANONYMOUS: {1: 6, 12: 6},
+        AUTHENTICATED: {1: 8, 12: 30},
+        STAFF: {1: 8, 12: 30},
+    },
+    "cart-items-list": {
+        ANONYMOUS: {1: 3, 12: 3},
+        AUTHENTICATED: {1: 5, 12: 27},
+        STAFF: {1: 5, 12: 27},
+    },
+    # Summaries come from annotations; items are served from their snapshots.
+    "order-list": {
+        AUTHENTICATED: {1: 2, 12: 2},
+        STAFF: {1: 2, 12: 2},
+    },
+    "order-detail": {
+        AUTHENTICATED: {1: 2, 12: 2},
+        STAFF: {1: 2, 12: 2},
+    },
+    "review-list": {
+        ANONYMOUS: {1: 2, 12: 2},
+        AUTHENTICATED: {1: 2, 12: 2},
+        STAFF: {1: 2, 12: 2},
+    },
+    "stats-overview": {
+        STAFF: {1: 2, 12: 2},
+    },
+    "post-list": {
+        ANONYMOUS: {1: 3, 12: 3},
+        AUTHENTICATED: {1: 3, 12: 3},
+        STAFF: {1: 3, 12: 3},
+    },
+    "post-detail": {
+        ANONYMOUS: {1: 2},
+        AUTHENTICATED: {1: 2},
+        STAFF: {1: 2},
+    },
+    "me": {
+        AUTHENTICATED: {1: 1},
+        STAFF: {1: 1},
+    },
+}
+
+# Admin changelist (``admin:<app>_<model>_changelist``) -> rows -> max queries.
+# Includes the session and user lookups of the logged-in superuser.
+ADMIN_CHANGELIST_BUDGETS: dict[str, dict[int, int]] = {
+    "shop_product": {1: 7, 12: 7},
+    "shop_productimage": {1: 6, 12: 6},
+    "shop_cart": {1: 6, 12: 6},
+    "shop_cartitem": {1: 6, 12: 6},
+    "shop_order": {1: 6, 12: 6},
+    "shop_orderitem": {1: 6, 12: 6},
+    "shop_productreview": {1: 7, 12: 7},
+    "accounts_userprofile": {1: 6, 12: 6},
+}
+
+_IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+_THIS_FILE = Path(__file__).resolve()
+
+
+@dataclass
+class CapturedQuery:
+    sql: str
+    params: object
+    origin: list[str] = field(default_factory=list)
+
+    def format(self, index: int) -> str:
+        lines = [f"{index}. {self.sql}"]
+        if self.params:
+            lines.append(f"   params: {self.params!r}")
+        lines.extend(f"   at {frame}" for frame in self.origin)
+        return "\n".join(lines)
+
+
+def _project_origin(depth: int = 3) -> list[str]:
+    """Return the innermost project frames (outside site-packages) for a query."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    frames: list[str] = []
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        path = Path(frame.filename).resolve()
+        if path == _THIS_FILE or base_dir not in path.parents:
+            continue
+        if "site-packages" in path.parts:
+            continue
+        frames.append(
+            f"{path.relative_to(base_dir)}:{frame.lineno} in {frame.name}"
+            + (f" -> {frame.line}" if frame.line else "")
+        )
+        if len(frames) >= depth:
+            break
+    return frames
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` hook that keeps SQL with its call site."""
+
+    def __init__(self) -> None:
+        self.queries: list[CapturedQuery] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(_IGNORED_PREFIXES):
+            self.queries.append(
+                CapturedQuery(sql=sql, params=params, origin=_project_origin())
+            )
+        return execute(sql, params, many, context)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def report(self) -> str:
+        return "\n".join(
+            query.format(index) for index, query in enumerate(self.queries, start=1)
+        )
+
+
+@contextmanager
+def assert_max_queries(
+    limit: int, *, label: str = "", using: str = DEFAULT_DB_ALIAS
+) -> Iterator[QueryRecorder]:
+    """Fail when the wrapped block runs more than ``limit`` SQL queries."""
+    recorder = QueryRecorder()
+    with connections[using].execute_wrapper(recorder):
+        yield recorder
+    if len(recorder) > limit:
+        prefix = f"{label}: " if label else ""
+        raise AssertionError(
+            f"{prefix}{len(recorder)} queries executed, budget is {limit}.\n"
+            f"{recorder.report()}"
+        )
+
+
+def get_budget(endpoint: str, role: str, page_size: int) -> int:
+    try:
+        return QUERY_BUDGETS[endpoint][role][page_size]
+    except KeyError as exc:
+        raise KeyError(
+            f"No query budget for {endpoint!r} ({role}, {page_size} rows)."
+        ) from exc
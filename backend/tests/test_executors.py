@@ -0,0 +1,25 @@
+import threading
+
+from core.executors import BackgroundExecutor
+
+
+def test_racing_first_submits_share_one_pool(settings):
+    settings.PASSWORD_HASHING_WORKERS = 2
+    executor = BackgroundExecutor("test-pool", "PASSWORD_HASHING_WORKERS")
+    barrier = threading.Barrier(8)
+    futures = []
+
+    def submit():
+        barrier.wait()
+        futures.append(executor.submit(threading.current_thread))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    workers = {future.result() for future in futures}
+    assert len(futures) == 8
+    assert len(workers) <= 2
+    assert all(worker.name.startswith("test-pool") for worker in workers)
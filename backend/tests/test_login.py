@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import aauthenticate, get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+URL = reverse("token_obtain_pair")
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class LoginTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="Buyer@Example.com", password="secret-pass"
+        )
+
+    def login(self, username: str, password: str = "secret-pass"):
+        return self.client.post(
+            URL, {"username": username, "password": password}, format="json"
+        )
+
+    def test_email_login_resolves_user_with_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login("buyer@EXAMPLE.com")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertIn("access", response.data)
+        selects = [
+            q["sql"] for q in queries.captured_queries if q["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(len(selects), 1, selects)
+
+    def test_username_match_wins_over_email_match(self):
+        other = get_user_model().objects.create_user(
+            username="buyer@example.com", password="other-pass"
+        )
+        self.assertEqual(
+            self.login("buyer@example.com", "other-pass").status_code,
+            status.HTTP_200_OK,
+        )
+        other.refresh_from_db()
+        self.assertIsNotNone(other.last_login)
+        self.assertEqual(
+            self.login("buyer@example.com").status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_rejects_wrong_password_and_inactive_users(self):
+        self.assertEqual(self.login("buyer", "nope").status_code, 401)
+        self.assertEqual(self.login("ghost@example.com").status_code, 401)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.login("buyer").status_code, 401)
+
+    def test_last_login_is_written_once_per_interval(self):
+        self.login("buyer")
+        self.user.refresh_from_db()
+        first = self.user.last_login
+        self.assertIsNotNone(first)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.login("buyer")
+        self.assertFalse(
+            [q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        )
+
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            last_login=timezone.now() - timedelta(hours=1)
+        )
+        self.login("buyer")
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.last_login, first)
+
+    def test_session_login_uses_same_backend(self):
+        self.assertTrue(
+            self.client.login(username="BUYER@example.com", password="secret-pass")
+        )
+
+
+PBKDF2 = "accounts.hashers.PBKDF2PasswordHasher"
+SCRYPT = "accounts.hashers.ScryptPasswordHasher"
+
+
+@override_settings(
+    PASSWORD_PBKDF2_ITERATIONS=1000,
+    PASSWORD_SCRYPT_WORK_FACTOR=1024,
+    PASSWORD_HASHERS=[PBKDF2, SCRYPT],
+)
+class PasswordHasherTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@example.com", password="secret-pass"
+        )
+
+    def login(self):
+        return self.client.post(
+            URL, {"username": "buyer", "password": "secret-pass"}, format="json"
+        )
+
+    def test_login_upgrades_hash_to_preferred_hasher(self):
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+        with override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2]):
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith("scrypt$"))
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    def test_login_rehashes_when_cost_changes(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+    def test_async_authenticate_uses_hashing_pool(self):
+        user = async_to_sync(aauthenticate)(
+            username="BUYER@example.com", password="secret-pass"
+        )
+        self.assertEqual(user, self.user)
+        self.assertIsNone(
+            async_to_sync(aauthenticate)(username="buyer", password="wrong")
+        )
+
+    def test_registration_hashes_with_preferred_hasher(self):
+        with override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2]):
+            response = self.client.post(
+                reverse("register"),
+                {
+                    "username": "newcomer",
+                    "email": "newcomer@example.com",
+                    "password": "Str0ng-pass-42",
+                    "password_confirm": "Str0ng-pass-42",
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        user = get_user_model().objects.get(username="newcomer")
+        self.assertTrue(user.password.startswith("scrypt$"))
+        self.assertTrue(user.check_password("Str0ng-pass-42"))
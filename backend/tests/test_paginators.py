@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.paginators import EstimatedCountPaginator, estimated_count
+from shop.models import Category
+
+
+@override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        Category.objects.bulk_create(
+            Category(name=f"Category {index}", slug=f"c-{index}") for index in range(3)
+        )
+
+    def test_large_unfiltered_tables_use_the_estimate(self):
+        with mock.patch("core.paginators.estimated_count", return_value=5_000_000):
+            paginator = EstimatedCountPaginator(Category.objects.order_by("pk"), 2)
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, 5_000_000)
+            self.assertEqual(len(paginator.page(1).object_list), 2)
+
+    def test_small_tables_are_counted_exactly(self):
+        with mock.patch("core.paginators.estimated_count", return_value=10):
+            paginator = EstimatedCountPaginator(Category.objects.order_by("pk"), 2)
+            self.assertEqual(paginator.count, 3)
+
+    def test_estimates_need_an_unfiltered_postgresql_queryset(self):
+        self.assertIsNone(estimated_count(Category.objects.filter(name="x")))
+        self.assertIsNone(estimated_count([1, 2, 3]))
+        with mock.patch.object(connection, "vendor", "sqlite"):
+            self.assertIsNone(estimated_count(Category.objects.all()))
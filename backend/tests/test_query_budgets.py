@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from content.models import Post
+from shop.models import (
+    Cart,
+    CartItem,
+    Category,
+    Order,
+    OrderItem,
+    Product,
+    ProductImage,
+    ProductReview,
+)
+
+from .query_budget import (
+    ADMIN_CHANGELIST_BUDGETS,
+    ANONYMOUS,
+    QUERY_BUDGETS,
+    STAFF,
+    assert_max_queries,
+    get_budget,
+)
+
+pytestmark = pytest.mark.django_db
+
+BUDGET_CASES = [
+    (endpoint, role, size)
+    for endpoint, roles in QUERY_BUDGETS.items()
+    for role, sizes in roles.items()
+    for size in sizes
+]
+
+
+def _build_fixture(size: int) -> dict[str, object]:
+    """Create ``size`` rows for every list endpoint and return lookup keys."""
+    user_model = get_user_model()
+    buyer = user_model.objects.create_user(username="buyer", email="buyer@example.com")
+    staff = user_model.objects.create_user(
+        username="staff", email="staff@example.com", is_staff=True
+    )
+    products: list[Product] = []
+    for index in range(size):
+        category = Category.objects.create(name=f"Category {index}")
+        product = Product.objects.create(
+            category=category,
+            name=f"Product {index}",
+            sku=f"SKU-{index:04d}",
+            price=Decimal("100.00") + index,
+            stock=5,
+        )
+        ProductImage.objects.create(
+            product=product, image=f"products/{index}.png", is_main=True
+        )
+        ProductReview.objects.create(
+            product=product,
+            rating=5,
+            body="Great",
+            author_name="Guest",
+            moderation_status=ProductReview.ModerationStatus.APPROVED,
+        )
+        Post.objects.create(
+            title=f"Post {index}", body="Body", is_published=True
+        ).tags.add(f"tag-{index}")
+        products.append(product)
+
+    cart = Cart.objects.create(user=buyer)
+    orders: list[Order] = []
+    for product in products:
+        CartItem.objects.create(cart=cart, product=product, quantity=1)
+        order = Order.objects.create(
+            user=buyer,
+            status=Order.Status.PAID,
+            payment_status=Order.PaymentStatus.PAID,
+            subtotal_amount=product.price,
+            total_amount=product.price,
+            customer_email=buyer.email,
+            shipping_full_name="Buyer",
+            shipping_address="Main street 1",
+            shipping_city="Moscow",
+            placed_at=timezone.now(),
+        )
+        OrderItem.objects.create(
+            order=order,
+            product=product,
+            product_name=product.name,
+            unit_price=product.price,
+            quantity=1,
+            line_total=product.price,
+        )
+        orders.append(order)
+
+    # The detail order carries every product so its size matches the others.
+    detail_order = orders[0]
+    for product in products[1:]:
+        OrderItem.objects.create(
+            order=detail_order,
+            product=product,
+            product_name=product.name,
+            unit_price=product.price,
+            quantity=1,
+            line_total=product.price,
+        )
+
+    return {
+        "buyer": buyer,
+        "staff": staff,
+        "product": products[0],
+        "cart": cart,
+        "order": detail_order,
+        "post": Post.objects.first(),
+    }
+
+
+def _url(endpoint: str, fixture: dict[str, object]) -> str:
+    kwargs: dict[str, object] = {}
+    if endpoint == "product-detail":
+        kwargs = {"slug": fixture["product"].slug}
+    elif endpoint == "cart-detail":
+        kwargs = {"id": fixture["cart"].id}
+    elif endpoint == "cart-items-list":
+        kwargs = {"cart_id": fixture["cart"].id}
+    elif endpoint == "order-detail":
+        kwargs = {"pk": fixture["order"].pk}
+    elif endpoint == "post-detail":
+        kwargs = {"slug": fixture["post"].slug}
+    return reverse(endpoint, kwargs=kwargs)
+
+
+@pytest.mark.parametrize(
+    ("endpoint", "role", "size"),
+    BUDGET_CASES,
+    ids=[f"{endpoint}-{role}-{size}" for endpoint, role, size in BUDGET_CASES],
+)
+def test_endpoint_stays_within_query_budget(endpoint, role, size):
+    fixture = _build_fixture(size)
+    client = APIClient()
+    if role != ANONYMOUS:
+        client.force_authenticate(fixture["staff" if role == STAFF else "buyer"])
+    url = _url(endpoint, fixture)
+
+    with assert_max_queries(
+        get_budget(endpoint, role, size), label=f"GET {url} as {role}"
+    ):
+        response = client.get(url)
+
+    assert response.status_code == HTTPStatus.OK, response.content
+
+
+ADMIN_CASES = [
+    (changelist, size)
+    for changelist, sizes in ADMIN_CHANGELIST_BUDGETS.items()
+    for size in sizes
+]
+
+
+@pytest.mark.parametrize(
+    ("changelist", "size"),
+    ADMIN_CASES,
+    ids=[f"admin-{changelist}-{size}" for changelist, size in ADMIN_CASES],
+)
+def test_admin_changelist_stays_within_query_budget(changelist, size, settings):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+    _build_fixture(size)
+    client = Client()
+    client.force_login(
+        get_user_model().objects.create_superuser(
+            username="root", email="root@example.com", password="secret"
+        )
+    )
+    url = reverse(f"admin:{changelist}_changelist")
+
+    with assert_max_queries(
+        ADMIN_CHANGELIST_BUDGETS[changelist][size], label=f"GET {url}"
+    ):
+        response = client.get(url)
+
+    assert response.status_code == HTTPStatus.OK
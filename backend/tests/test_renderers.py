@@ -0,0 +1,72 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+PAYLOAD = {
+    "count": 1,
+    "results": [
+        {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "name": "Смартфон Nova X20\u2028",
+            "price": "45990.00",
+            "raw_total": Decimal("10.50"),
+            "average_rating": 4.67,
+            "placed_at": datetime(2025, 11, 5, 12, 30, 15, 120000, tzinfo=timezone.utc),
+            "delivery": date(2025, 11, 6),
+            "label": gettext_lazy("Active"),
+            "images": [],
+            "user_review": None,
+            "can_review": True,
+            7: "non-string key",
+        }
+    ],
+}
+
+
+def test_orjson_renderer_matches_drf_output():
+    assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+def test_orjson_renderer_output_decodes_to_the_drf_data():
+    data = {"small": 1e-5, "large": 1e20, "ratio": 2 / 3}
+    rendered = ORJSONRenderer().render(data)
+    assert json.loads(rendered) == json.loads(JSONRenderer().render(data))
+
+
+@pytest.mark.parametrize(
+    "value", [float("nan"), float("inf"), -float("inf"), Decimal("NaN")]
+)
+def test_orjson_renderer_rejects_non_finite_numbers_like_drf(value):
+    data = {"results": [{"average_rating": value, "image": None}]}
+    with pytest.raises(ValueError):
+        JSONRenderer().render(data)
+    with pytest.raises(ValueError):
+        ORJSONRenderer().render(data)
+
+
+def test_orjson_renderer_falls_back_for_indented_output():
+    expected = JSONRenderer().render(PAYLOAD, "application/json; indent=2")
+    assert ORJSONRenderer().render(PAYLOAD, "application/json; indent=2") == expected
+
+
+def test_orjson_parser_matches_drf_parser():
+    body = '{"name": "Кроссовки", "price": 4990.5, "tags": [1, 2]}'.encode()
+    assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+        io.BytesIO(body)
+    )
+
+
+def test_orjson_parser_rejects_invalid_json():
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(b'{"price": NaN}'))
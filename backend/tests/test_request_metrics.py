@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from core.cache import InstrumentedRedisCache
+from core.metrics import finish_request, registry, start_request
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def test_api_response_carries_server_timing(client):
+    response = client.get(reverse("product-list"))
+    assert response.status_code == HTTPStatus.OK
+    timing = response.headers["Server-Timing"]
+    for metric in ("total;dur=", "db;dur=", "render;dur=", "cache;desc="):
+        assert metric in timing
+
+
+def test_metrics_endpoint_aggregates_per_route(client, settings):
+    settings.METRICS_TOKEN = "scrape-me"
+    client.get(reverse("product-list"))
+    client.get(reverse("product-list"))
+
+    assert client.get(reverse("metrics")).status_code == HTTPStatus.FORBIDDEN
+    response = client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-me")
+
+    assert response.status_code == HTTPStatus.OK
+    body = response.content.decode()
+    assert (
+        'shopster_request_duration_seconds_count{route="product-list",method="GET"} 2'
+        in body
+    )
+    assert 'shopster_request_db_queries_bucket{route="product-list"' in body
+    assert 'route="metrics"' not in body
+
+
+def test_metrics_endpoint_allows_staff_without_token(client):
+    staff = get_user_model().objects.create_user(username="ops", is_staff=True)
+    client.force_login(staff)
+    response = client.get(reverse("metrics"))
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"].startswith("text/plain")
+
+
+def test_unreachable_cache_counts_a_miss_and_returns_the_default():
+    cache = InstrumentedRedisCache(
+        "redis://127.0.0.1:1/0",
+        {"OPTIONS": {"IGNORE_EXCEPTIONS": True, "SOCKET_CONNECT_TIMEOUT": 0.1}},
+    )
+    stats, token = start_request()
+    try:
+        assert cache.get("missing", default="fallback") == "fallback"
+    finally:
+        finish_request(token)
+    assert (stats.cache_hits, stats.cache_misses) == (0, 1)
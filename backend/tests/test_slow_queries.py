@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from core.slow_queries import SlowQueryRecorder, normalize_sql, slow_query_log
+from shop.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_log():
+    slow_query_log.clear()
+    yield
+    slow_query_log.clear()
+
+
+def test_normalize_sql_collapses_literals_and_placeholder_lists():
+    sql = (
+        'SELECT "shop_product"."id" FROM "shop_product" '
+        'WHERE "shop_product"."sku" = \'A-1\' AND "shop_product"."stock" > 10 '
+        'AND "shop_product"."id" IN (%s, %s, %s)'
+    )
+    assert normalize_sql(sql) == (
+        'SELECT "shop_product"."id" FROM "shop_product" '
+        'WHERE "shop_product"."sku" = ? AND "shop_product"."stock" > ? '
+        'AND "shop_product"."id" IN (...)'
+    )
+
+
+def test_recorder_keeps_queries_over_threshold_with_route(settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    request = RequestFactory().get(reverse("product-list"))
+    request.resolver_match = resolve(request.path)
+
+    with connection.execute_wrapper(SlowQueryRecorder(request)):
+        list(Product.objects.filter(stock__gt=0))
+
+    entry = slow_query_log.entries()[0]
+    assert entry.route == "product-list"
+    assert '"shop_product"."stock" > ?' in entry.normalized_sql
+    assert entry.call_site[0].startswith("tests/test_slow_queries.py")
+
+
+def test_admin_view_lists_entries_for_superusers(client, settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    with connection.execute_wrapper(SlowQueryRecorder()):
+        Product.objects.exists()
+    admin_user = get_user_model().objects.create_superuser(
+        username="root", email="root@example.com", password="secret"
+    )
+    client.force_login(admin_user)
+
+    response = client.get(reverse("admin-slow-queries"))
+
+    assert response.status_code == HTTPStatus.OK
+    assert "shop_product" in response.content.decode()
+
+
+def test_admin_view_requires_the_menu_link_permission(client):
+    staff = get_user_model().objects.create_user(
+        username="staff", password="secret", is_staff=True
+    )
+    client.force_login(staff)
+    assert client.get(reverse("admin-slow-queries")).status_code == (
+        HTTPStatus.FORBIDDEN
+    )
+
+    staff.user_permissions.add(Permission.objects.get(codename="view_user"))
+    assert client.get(reverse("admin-slow-queries")).status_code == HTTPStatus.OK
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+
+from content.models import Post
+from core import slugs
+from shop.models import Category, Product
+
+
+class SlugAllocatorTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Lamps")
+
+    def make_product(self, name: str, sku: str) -> Product:
+        return Product.objects.create(
+            category=self.category, name=name, sku=sku, price=Decimal("1")
+        )
+
+    def test_suffixes_resolved_with_one_query(self):
+        for index in range(5):
+            self.make_product("Desk lamp", f"L-{index}")
+        with self.assertNumQueries(1):
+            slug = slugs.allocate_slug(Product, "Desk lamp", fallback="product")
+        self.assertEqual(slug, "desk-lamp-6")
+
+    def test_soft_deleted_rows_keep_their_slug(self):
+        self.make_product("Desk lamp", "L-1").delete()
+        self.assertEqual(self.make_product("Desk lamp", "L-2").slug, "desk-lamp-2")
+
+    def test_categories_and_posts_are_deduplicated(self):
+        Category.objects.filter(pk=self.category.pk).update(slug="floor-lamps")
+        self.assertEqual(
+            Category.objects.create(name="Floor lamps").slug, "floor-lamps-2"
+        )
+        first = Post.objects.create(title="Hello", body="x")
+        second = Post.objects.create(title="Hello", body="y")
+        self.assertEqual((first.slug, second.slug), ("hello", "hello-2"))
+
+    def test_batch_mode_returns_distinct_slugs(self):
+        self.make_product("Desk lamp", "L-1")
+        with self.assertNumQueries(1):
+            result = slugs.allocate_slugs(
+                Product, ["Desk lamp", "Desk lamp", "Wall lamp", ""], fallback="product"
+            )
+        self.assertEqual(result[:3], ["desk-lamp-2", "desk-lamp-3", "wall-lamp"])
+        self.assertTrue(result[3].startswith("product-"))
+
+    def test_long_names_leave_room_for_suffix(self):
+        slug = slugs.allocate_slug(Product, "x" * 400, fallback="product")
+        self.assertLessEqual(len(slug) + slugs.SUFFIX_RESERVE, 255)
+
+    def test_save_retries_when_slug_is_taken_concurrently(self):
+        self.make_product("Desk lamp", "L-1")
+        real = slugs.allocate_slug
+        calls = []
+
+        def stale_then_real(*args, **kwargs):
+            calls.append(1)
+            return "desk-lamp" if len(calls) == 1 else real(*args, **kwargs)
+
+        with mock.patch.object(slugs, "allocate_slug", side_effect=stale_then_real):
+            product = self.make_product("Desk lamp", "L-2")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(product.slug, "desk-lamp-2")
+
+    def test_other_integrity_errors_are_not_retried(self):
+        self.make_product("Desk lamp", "L-1")
+        with mock.patch.object(
+            slugs, "allocate_slug", wraps=slugs.allocate_slug
+        ) as allocate:
+            with self.assertRaises(IntegrityError):
+                self.make_product("Other lamp", "L-1")
+        self.assertEqual(allocate.call_count, 1)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core import thumbnails
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CACHE_DIR = os.path.join(MEDIA_ROOT, "thumbs-cache")
+
+
+def png_bytes(width: int = 800, height: int = 600) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (220, 38, 38)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    THUMBNAIL_CACHE_DIR=CACHE_DIR,
+    THUMBNAIL_SIZES={(160, 160), (320, 240)},
+    THUMBNAIL_ACCEL_REDIRECT_PREFIX="",
+)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        thumbnails.reset_cache_state()
+        self.path = default_storage.save("products/lamp.png", ContentFile(png_bytes()))
+
+    def tearDown(self):
+        default_storage.delete(self.path)
+        thumbnails.reset_cache_state()
+
+    def get(self, size: str, path: str, **headers):
+        return self.client.get(f"/media/thumbs/{size}/{path}", headers=headers)
+
+    def test_renders_on_miss_and_serves_cache_on_hit(self):
+        response = self.get("320x240", self.path, Accept="image/webp,*/*")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertIn("Accept", response["Vary"])
+        with Image.open(BytesIO(b"".join(response.streaming_content))) as thumb:
+            self.assertEqual(thumb.size, (320, 240))
+
+        with mock.patch.object(thumbnails, "_render") as render:
+            response = self.get("320x240", self.path, Accept="image/webp,*/*")
+        self.assertEqual(response.status_code, 200)
+        render.assert_not_called()
+
+    def test_falls_back_to_source_format_without_webp(self):
+        response = self.get("160x160", self.path, Accept="image/*")
+        self.assertEqual(response["Content-Type"], "image/png")
+
+    def test_rejects_unknown_sizes_and_paths(self):
+        self.assertEqual(self.get("123x45", self.path).status_code, 404)
+        self.assertEqual(self.get("160x160", "products/missing.png").status_code, 404)
+        self.assertEqual(self.get("160x160", "products/../secret.png").status_code, 404)
+        self.assertEqual(self.get("160x160", "private/lamp.png").status_code, 404)
+
+    @override_settings(THUMBNAIL_ACCEL_REDIRECT_PREFIX="/_thumbs/")
+    def test_hits_can_be_handed_to_nginx(self):
+        response = self.get("160x160", self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["X-Accel-Redirect"].startswith("/_thumbs/"))
+        relative = response["X-Accel-Redirect"].removeprefix("/_thumbs/")
+        self.assertTrue((Path(CACHE_DIR) / relative).is_file())
+
+    def test_busy_resizer_returns_503(self):
+        slots = thumbnails._slots()
+        with override_settings(THUMBNAIL_RESIZE_WAIT_SECONDS=0):
+            with mock.patch.object(slots, "acquire", return_value=False):
+                response = self.get("160x160", self.path)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_racing_requests_share_one_set_of_resize_slots(self):
+        thumbnails.reset_cache_state()
+        barrier = threading.Barrier(8)
+        found = []
+
+        def take():
+            barrier.wait()
+            found.append(thumbnails._slots())
+
+        threads = [threading.Thread(target=take) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(slots) for slots in found}), 1)
+
+    def test_eviction_drops_least_recently_used_files(self):
+        first = thumbnails.get_thumbnail(self.path, 160, 160)
+        second = thumbnails.get_thumbnail(self.path, 320, 240)
+        os.utime(first.path, (1, 1))
+        remaining = thumbnails.evict(second.path.stat().st_size)
+        self.assertFalse(first.path.exists())
+        self.assertTrue(second.path.exists())
+        self.assertEqual(remaining, second.path.stat().st_size)
+
+    def test_cache_limit_triggers_eviction_on_write(self):
+        with override_settings(THUMBNAIL_CACHE_MAX_BYTES=1):
+            thumbnails.get_thumbnail(self.path, 160, 160)
+        self.assertEqual(list(Path(CACHE_DIR).rglob("*.png")), [])
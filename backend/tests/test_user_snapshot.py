@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.authentication import snapshot_key
+
+ME = reverse("me")
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@example.com", password="secret-pass"
+        )
+        self.user.profile.phone = "+7 900 000-00-00"
+        self.user.profile.save()
+        self.authorize()
+
+    def authorize(self, password: str = "secret-pass"):
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "buyer", "password": password},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.token = response.data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def test_me_is_served_from_snapshot_after_first_request(self):
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(ME)
+        self.assertEqual(len(queries.captured_queries), 1, queries.captured_queries)
+        self.assertIn("accounts_userprofile", queries.captured_queries[0]["sql"])
+
+        with self.assertNumQueries(0):
+            second = self.client.get(ME)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(second.data["profile"]["phone"], "+7 900 000-00-00")
+        self.assertIsNotNone(cache.get(snapshot_key(self.user.pk, 0)))
+
+    def test_profile_update_refreshes_snapshot_and_keeps_password(self):
+        self.client.get(ME)
+        response = self.client.patch(
+            ME,
+            {"first_name": "Anna", "profile": {"default_shipping_city": "Kazan"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["profile"]["default_shipping_city"], "Kazan")
+        refreshed = self.client.get(ME).data
+        self.assertEqual(refreshed["first_name"], "Anna")
+        self.assertEqual(refreshed["profile"]["default_shipping_city"], "Kazan")
+        self.assertEqual(refreshed["profile"]["phone"], "+7 900 000-00-00")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("secret-pass"))
+
+    def test_password_change_revokes_issued_tokens(self):
+        self.client.get(ME)
+        self.user.set_password("new-secret")
+        self.user.save()
+        self.assertEqual(self.client.get(ME).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.authorize("new-secret")
+        self.assertEqual(self.client.get(ME).status_code, status.HTTP_200_OK)
+
+    def test_deactivation_drops_snapshot(self):
+        self.client.get(ME)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(ME).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_session_me_uses_one_query(self):
+        self.client.credentials()
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(ME)
+        self.assertEqual(response.data["profile"]["phone"], "+7 900 000-00-00")
+        profile_queries = [
+            q for q in queries.captured_queries if "accounts_userprofile" in q["sql"]
+        ]
+        self.assertEqual(len(profile_queries), 1)
+        self.assertIn('FROM "auth_user"', profile_queries[0]["sql"])
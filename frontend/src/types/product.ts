@@ -54,6 +54,10 @@ export type Product = {
     image: string;
     alt_text: string;
     is_main: boolean;
+    sources?: Array<{
+      type: string;
+      srcset: string;
+    }>;
   }>;
   average_rating: number | null;
   reviews_count: number;